@@ -0,0 +1,70 @@
+"""
+Bulk admin actions - set-based activate/deactivate of users, IPOs, ETFs and commodities
+
+Selected rows are flipped with one UPDATE and audited with one
+bulk_create, in a single transaction. Rows already in the requested state
+are skipped. Research call transitions live in apps.research_calls.bulk.
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from apps.admin_panel.metrics import record_metric_deltas
+from apps.audit.models import AuditLog
+from apps.authentication.models import User
+from apps.market_data.models import ETF, IPO, Commodity
+
+# target -> (model, flag field, action -> flag value)
+BULK_FLAG_ACTIONS = {
+    'users': (User, 'is_active', {'activate': True, 'deactivate': False}),
+    'ipos': (IPO, 'is_listed', {'mark_listed': True, 'mark_upcoming': False}),
+    'etfs': (ETF, 'is_active', {'activate': True, 'deactivate': False}),
+    'commodities': (Commodity, 'is_active', {'activate': True, 'deactivate': False}),
+}
+
+
+@transaction.atomic
+def bulk_set_flag(target, object_ids, action, user, exclude_ids=()):
+    """
+    Set a target's flag field on many rows
+
+    Args:
+        target: BULK_FLAG_ACTIONS key
+        object_ids: Ids of the selected rows
+        action: One of the target's actions
+        user: Admin performing the action
+        exclude_ids: Ids that must not be changed (e.g. the admin's own account)
+
+    Returns:
+        dict: {'updated': int, 'skipped': int}
+    """
+    model, field, actions = BULK_FLAG_ACTIONS[target]
+    value = actions[action]
+    object_ids = set(object_ids)
+    objects = list(
+        model.objects.select_for_update()
+        .filter(id__in=object_ids - set(exclude_ids))
+        .exclude(**{field: value})
+        .order_by('id')
+    )
+    if not objects:
+        return {'updated': 0, 'skipped': len(object_ids)}
+
+    ids = [obj.id for obj in objects]
+    model.objects.filter(id__in=ids).update(**{field: value, 'updated_at': timezone.now()})
+    AuditLog.objects.bulk_create([
+        AuditLog(
+            user=user,
+            action='UPDATE',
+            model_name=model.__name__,
+            object_id=obj.id,
+            object_repr=str(obj)[:255],
+            changes_json={field: value, 'bulk': True},
+        )
+        for obj in objects
+    ])
+
+    if model is User:
+        # queryset.update() sends no signals
+        record_metric_deltas({'users:active': len(ids) if value else -len(ids)})
+
+    return {'updated': len(ids), 'skipped': len(object_ids) - len(ids)}
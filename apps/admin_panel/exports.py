@@ -0,0 +1,214 @@
+"""
+Admin exports - CSV/JSONL streams of admin lists and the audit log
+
+Each export reads its rows with keyset queries over the primary key
+(newest first), one chunk of values() tuples at a time, so neither the
+streaming response nor the background job ever holds more than a chunk in
+memory. Filters are the same ones the list views apply (see the filter_*
+functions). Large exports run as an ExportJob that writes a gzip file to
+storage for later download.
+"""
+import csv
+import gzip
+import json
+import os
+import tempfile
+
+from django.core.files import File
+from django.db.models import Q
+from django.utils import timezone
+
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'jsonl': ('application/x-ndjson', 'jsonl'),
+}
+
+
+def filter_calls(params, queryset=None):
+    """Apply the calls list filters (status, broker, search) from request-style params"""
+    from apps.research_calls.models import ResearchCall
+    from apps.research_calls.search import search_calls
+
+    if queryset is None:
+        queryset = ResearchCall.objects.all()
+    if params.get('status'):
+        queryset = queryset.filter(status=params['status'])
+    if params.get('broker'):
+        queryset = queryset.filter(broker_id=params['broker'])
+    if params.get('search'):
+        queryset = search_calls(queryset, params['search'])
+    return queryset
+
+
+def filter_users(params, queryset=None):
+    from apps.authentication.models import User
+
+    if queryset is None:
+        queryset = User.objects.all()
+    if params.get('role'):
+        queryset = queryset.filter(role=params['role'])
+    if params.get('search'):
+        search = params['search']
+        queryset = queryset.filter(
+            Q(email__icontains=search) |
+            Q(first_name__icontains=search) |
+            Q(last_name__icontains=search)
+        )
+    return queryset
+
+
+def filter_payments(params, queryset=None):
+    from apps.payments.models import Payment
+
+    if queryset is None:
+        queryset = Payment.objects.all()
+    if params.get('status'):
+        queryset = queryset.filter(status=params['status'])
+    if params.get('search'):
+        search = params['search']
+        queryset = queryset.filter(
+            Q(user__email__icontains=search) |
+            Q(receipt__icontains=search) |
+            Q(razorpay_order_id__icontains=search) |
+            Q(razorpay_payment_id__icontains=search)
+        )
+    return queryset
+
+
+def filter_audit_logs(params, queryset=None):
+    from apps.audit.models import AuditLog
+
+    if queryset is None:
+        queryset = AuditLog.objects.all()
+    for field in ('action', 'model_name', 'object_id', 'user'):
+        if params.get(field):
+            queryset = queryset.filter(**{field: params[field]})
+    return queryset
+
+
+# name -> (filter function, exported columns as values() paths)
+EXPORTS = {
+    'calls': (filter_calls, (
+        'id', 'symbol', 'exchange', 'instrument_type', 'broker__name', 'created_by__email', 'call_type',
+        'action', 'entry_price', 'target_1', 'target_2', 'target_3', 'stop_loss', 'status',
+        'published_at', 'closed_at', 'exit_price', 'actual_return_percentage', 'is_successful', 'created_at',
+    )),
+    'users': (filter_users, (
+        'id', 'email', 'first_name', 'last_name', 'mobile', 'role', 'is_active', 'is_email_verified',
+        'last_login_at', 'created_at',
+    )),
+    'payments': (filter_payments, (
+        'id', 'user__email', 'receipt', 'razorpay_order_id', 'razorpay_payment_id', 'amount', 'currency',
+        'status', 'payment_method', 'description', 'paid_at', 'created_at',
+    )),
+    'audit_logs': (filter_audit_logs, (
+        'id', 'user__email', 'action', 'model_name', 'object_id', 'object_repr', 'changes_json',
+        'ip_address', 'created_at',
+    )),
+}
+
+
+def iter_export_rows(name, params, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Rows of an export, newest first, read in keyset chunks
+
+    Args:
+        name: EXPORTS key
+        params: Filter parameters (request.GET or a saved dict)
+        chunk_size: Rows per query
+
+    Yields:
+        tuple: One value per column
+    """
+    filter_queryset, columns = EXPORTS[name]
+    queryset = filter_queryset(params).order_by('-pk').values_list('pk', *columns)
+    last_pk = None
+    while True:
+        chunk = queryset if last_pk is None else queryset.filter(pk__lt=last_pk)
+        rows = list(chunk[:chunk_size])
+        for row in rows:
+            yield row[1:]
+        if len(rows) < chunk_size:
+            return
+        last_pk = rows[-1][0]
+
+
+class _Echo:
+    """File-like object whose write() returns the line, for csv.writer"""
+
+    def write(self, value):
+        return value
+
+
+def _format_value(value):
+    if value is None:
+        return ''
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, default=str)
+    return value
+
+
+def export_lines(name, params, export_format):
+    """
+    Encoded lines of an export, header first for CSV
+
+    Yields:
+        str: One CSV or JSONL line
+    """
+    columns = EXPORTS[name][1]
+    headers = [column.replace('__', '_') for column in columns]
+    rows = iter_export_rows(name, params)
+
+    if export_format == 'jsonl':
+        for row in rows:
+            record = {
+                header: value.isoformat() if hasattr(value, 'isoformat') else value
+                for header, value in zip(headers, row)
+            }
+            yield json.dumps(record, default=str) + '\n'
+        return
+
+    writer = csv.writer(_Echo())
+    yield writer.writerow(headers)
+    for row in rows:
+        yield writer.writerow([_format_value(value) for value in row])
+
+
+def export_filename(name, export_format):
+    return f"{name}-{timezone.localtime():%Y%m%d-%H%M%S}.{EXPORT_FORMATS[export_format][1]}"
+
+
+def run_export_job(job):
+    """
+    Write an ExportJob's rows to a gzip file and attach it to the job
+
+    The file is streamed to a temporary file first, so memory use stays
+    constant whatever the number of rows.
+
+    Returns:
+        int: Number of rows written
+    """
+    job.status = 'RUNNING'
+    job.save(update_fields=['status'])
+
+    row_count = -1 if job.export_format == 'csv' else 0  # the CSV header is not a row
+    with tempfile.NamedTemporaryFile(suffix='.gz', delete=False) as tmp:
+        path = tmp.name
+    try:
+        with gzip.open(path, 'wt', encoding='utf-8', newline='') as output:
+            for line in export_lines(job.export, job.params, job.export_format):
+                output.write(line)
+                row_count += 1
+        with open(path, 'rb') as compressed:
+            job.file.save(export_filename(job.export, job.export_format) + '.gz', File(compressed), save=False)
+    finally:
+        os.remove(path)
+
+    job.status = 'DONE'
+    job.row_count = max(row_count, 0)
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'row_count', 'file', 'finished_at'])
+    return job.row_count
@@ -144,6 +144,22 @@ class ResearchCallForm(forms.ModelForm):
         return cleaned_data
 
 
+class ResearchCallImportForm(forms.Form):
+    """Upload form for bulk research call imports"""
+    
+    file = forms.FileField(help_text='CSV with a header row, or a JSON list of calls.')
+    skip_invalid = forms.BooleanField(
+        required=False,
+        label='Import valid rows even if some rows fail',
+    )
+
+    def clean_file(self):
+        upload = self.cleaned_data['file']
+        if not upload.name.lower().endswith(('.csv', '.json')):
+            raise forms.ValidationError('Upload a .csv or .json file.')
+        return upload
+
+
 class BrokerForm(forms.ModelForm):
     """Form for creating and editing brokers"""
     
@@ -0,0 +1,17 @@
+"""
+Django management command to rebuild the admin dashboard's daily rollups
+"""
+from django.core.management.base import BaseCommand
+
+from apps.admin_panel.rollups import ROLLUP_BACKFILL_DAYS, refresh_daily_rollups
+
+
+class Command(BaseCommand):
+    help = 'Recompute daily rollups for the admin dashboard charts (backfill on first deploy)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=ROLLUP_BACKFILL_DAYS, help='Days to recompute, ending today')
+
+    def handle(self, *args, **options):
+        written = refresh_daily_rollups(days=options['days'])
+        self.stdout.write(self.style.SUCCESS(f"✓ Wrote {written} rollup rows for the last {options['days']} days"))
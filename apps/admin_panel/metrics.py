@@ -0,0 +1,188 @@
+"""
+Admin metrics counters - dashboard totals without COUNT(*) queries
+
+Totals and per-status counts of users, calls, brokers, portfolios and
+watchlists live in the cache (Redis in production) and are adjusted with
+atomic INCR/DECR from model signals (see apps.admin_panel.signals) once
+the writing transaction commits. Signups are also counted per day, so the
+rolling 30-day figure is a sum of day buckets. Missing counters are
+rebuilt from the database on the next read, and the nightly reconciliation
+corrects drift from writes that bypass signals (queryset.update()).
+"""
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+METRICS_TTL = None  # kept until deleted; the nightly reconciliation corrects drift
+DAY_BUCKET_TTL = 35 * 86400  # day buckets outlive the 30-day window
+NEW_USERS_WINDOW_DAYS = 30
+
+CALL_STATUSES = (
+    'DRAFT', 'PENDING_APPROVAL', 'APPROVED', 'PUBLISHED', 'ACTIVE',
+    'TARGET_1_HIT', 'TARGET_2_HIT', 'TARGET_3_HIT', 'STOP_LOSS_HIT',
+    'MANUALLY_EXITED', 'EXPIRED', 'CLOSED',
+)
+
+METRIC_NAMES = (
+    'users', 'users:active',
+    'calls', *(f'calls:{status}' for status in CALL_STATUSES),
+    'brokers', 'brokers:active',
+    'portfolios', 'watchlists',
+)
+
+
+def metric_key(name):
+    return f'admin_metrics:{name}'
+
+
+def signup_key(day):
+    return f'admin_metrics:signups:{day.isoformat()}'
+
+
+def compute_metrics():
+    """
+    Count every metric from the database, one aggregate query per table
+
+    Returns:
+        dict: metric name -> count
+    """
+    from apps.authentication.models import User
+    from apps.brokers.models import Broker
+    from apps.portfolios.models import Portfolio
+    from apps.research_calls.models import ResearchCall
+    from apps.watchlists.models import Watchlist
+
+    users = User.objects.aggregate(total=Count('id'), active=Count('id', filter=Q(is_active=True)))
+    brokers = Broker.objects.aggregate(total=Count('id'), active=Count('id', filter=Q(is_active=True)))
+    by_status = dict(ResearchCall.objects.order_by().values('status').annotate(
+        count=Count('id')
+    ).values_list('status', 'count'))
+
+    metrics = {
+        'users': users['total'],
+        'users:active': users['active'],
+        'calls': sum(by_status.values()),
+        'brokers': brokers['total'],
+        'brokers:active': brokers['active'],
+        'portfolios': Portfolio.objects.count(),
+        'watchlists': Watchlist.objects.count(),
+    }
+    for status in CALL_STATUSES:
+        metrics[f'calls:{status}'] = by_status.get(status, 0)
+    return metrics
+
+
+def get_metrics():
+    """
+    All dashboard counters
+
+    Returns:
+        dict: metric name -> count, rebuilt from the database when any is missing
+    """
+    keys = {name: metric_key(name) for name in METRIC_NAMES}
+    cached = cache.get_many(keys.values())
+    if len(cached) < len(keys):
+        metrics = compute_metrics()
+        missing = {key: metrics[name] for name, key in keys.items() if key not in cached}
+        cache.set_many(missing, METRICS_TTL)
+        cached.update(missing)
+    return {name: max(cached[key], 0) for name, key in keys.items()}
+
+
+def get_daily_signups(days):
+    """
+    Signups per day for the last `days` days, today included
+
+    Returns:
+        dict: date -> signup count, oldest first
+    """
+    from apps.authentication.models import User
+
+    today = timezone.localdate()
+    dates = [today - timedelta(days=offset) for offset in range(days - 1, -1, -1)]
+    cached = cache.get_many([signup_key(day) for day in dates])
+    if len(cached) < len(dates):
+        counts = dict(User.objects.filter(created_at__date__gte=dates[0]).annotate(
+            day=TruncDate('created_at')
+        ).order_by().values('day').annotate(count=Count('id')).values_list('day', 'count'))
+        missing = {signup_key(day): counts.get(day, 0) for day in dates if signup_key(day) not in cached}
+        cache.set_many(missing, DAY_BUCKET_TTL)
+        cached.update(missing)
+    return {day: cached[signup_key(day)] for day in dates}
+
+
+def get_new_users_count(days=NEW_USERS_WINDOW_DAYS):
+    """Signups since midnight `days` days ago"""
+    return sum(get_daily_signups(days + 1).values())
+
+
+def adjust_metrics(deltas):
+    """
+    Atomically add to the counters that are cached
+
+    Missing counters are skipped; their next read rebuilds them from the
+    database, which already includes the change.
+
+    Args:
+        deltas: dict cache key -> change
+    """
+    for key, delta in deltas.items():
+        if not delta:
+            continue
+        try:
+            count = cache.incr(key, delta)
+        except ValueError:
+            continue
+        if count < 0:
+            cache.delete(key)
+
+
+def record_metric_deltas(deltas):
+    """
+    Apply metric changes once the current transaction commits
+
+    Args:
+        deltas: dict metric name -> change
+    """
+    deltas = {metric_key(name): delta for name, delta in deltas.items() if delta}
+    if deltas:
+        transaction.on_commit(lambda: adjust_metrics(deltas))
+
+
+def record_signups(created_ats):
+    """Count new users into their day buckets once the transaction commits"""
+    deltas = {}
+    for created_at in created_ats:
+        key = signup_key(timezone.localdate(created_at))
+        deltas[key] = deltas.get(key, 0) + 1
+    if deltas:
+        transaction.on_commit(lambda: adjust_metrics(deltas))
+
+
+def invalidate_metrics(names=METRIC_NAMES):
+    """Drop counters so the next read recounts them"""
+    cache.delete_many([metric_key(name) for name in names])
+
+
+def reconcile_metrics():
+    """
+    Correct cached counters that drifted from the database
+
+    Returns:
+        int: Number of counters corrected
+    """
+    actual = compute_metrics()
+    keys = {name: metric_key(name) for name in METRIC_NAMES}
+    cached = cache.get_many(keys.values())
+    fixes = {keys[name]: count for name, count in actual.items() if cached.get(keys[name]) != count}
+    if fixes:
+        cache.set_many(fixes, METRICS_TTL)
+
+    # Day buckets are rebuilt from the database on the next read
+    today = timezone.localdate()
+    cache.delete_many([signup_key(today - timedelta(days=offset)) for offset in range(NEW_USERS_WINDOW_DAYS + 1)])
+    return len(fixes)
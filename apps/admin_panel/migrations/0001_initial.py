@@ -0,0 +1,31 @@
+# Generated by Django 5.2.11 on 2026-10-18 10:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('metric', models.CharField(choices=[('SIGNUPS', 'Signups'), ('REVENUE', 'Captured Revenue'), ('PAYMENTS', 'Payments'), ('CALLS_CREATED', 'Calls Created'), ('CALLS_PUBLISHED', 'Calls Published'), ('CALLS_CLOSED', 'Calls Closed')], max_length=20)),
+                ('dimension', models.CharField(blank=True, default='', max_length=30)),
+                ('date', models.DateField()),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('amount', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'admin_daily_rollups',
+                'ordering': ['metric', 'date'],
+                'unique_together': {('metric', 'date', 'dimension')},
+            },
+        ),
+    ]
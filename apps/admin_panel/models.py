@@ -0,0 +1,73 @@
+"""
+Admin panel models - dashboard rollups and export jobs
+"""
+from django.db import models
+
+from apps.authentication.models import User
+
+
+class DailyRollup(models.Model):
+    """One day's count and amount of a metric, optionally split by a dimension"""
+
+    METRIC_CHOICES = [
+        ('SIGNUPS', 'Signups'),
+        ('REVENUE', 'Captured Revenue'),  # dimension: plan type
+        ('PAYMENTS', 'Payments'),  # dimension: payment status
+        ('CALLS_CREATED', 'Calls Created'),
+        ('CALLS_PUBLISHED', 'Calls Published'),
+        ('CALLS_CLOSED', 'Calls Closed'),
+    ]
+
+    metric = models.CharField(max_length=20, choices=METRIC_CHOICES)
+    dimension = models.CharField(max_length=30, blank=True, default='')
+    date = models.DateField()
+
+    count = models.PositiveIntegerField(default=0)
+    amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'admin_daily_rollups'
+        unique_together = [['metric', 'date', 'dimension']]
+        ordering = ['metric', 'date']
+
+    def __str__(self):
+        dimension = f" [{self.dimension}]" if self.dimension else ''
+        return f"{self.metric}{dimension} {self.date}: {self.count}"
+
+
+class ExportJob(models.Model):
+    """Background export of an admin list to a compressed file"""
+
+    STATUS_CHOICES = [
+        ('PENDING', 'Pending'),
+        ('RUNNING', 'Running'),
+        ('DONE', 'Done'),
+        ('FAILED', 'Failed'),
+    ]
+
+    FORMAT_CHOICES = [
+        ('csv', 'CSV'),
+        ('jsonl', 'JSON Lines'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='export_jobs')
+    export = models.CharField(max_length=30)  # apps.admin_panel.exports.EXPORTS key
+    export_format = models.CharField(max_length=10, choices=FORMAT_CHOICES, default='csv')
+    params = models.JSONField(default=dict, blank=True)
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='PENDING')
+    file = models.FileField(upload_to='exports/', null=True, blank=True)
+    row_count = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True, default='')
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'admin_export_jobs'
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.export} ({self.export_format}) - {self.status}"
@@ -0,0 +1,55 @@
+"""
+Keyset pagination for admin list views
+"""
+from django.core.exceptions import BadRequest
+
+from apps.core.pagination import (
+    ESTIMATE_COUNT_THRESHOLD,
+    InvalidCursor,
+    estimated_count,
+    paginate_keyset,
+    paginate_keyset_before,
+    paginate_ranked,
+)
+
+
+class KeysetPaginationMixin:
+    """
+    ListView mixin paging by ?cursor= / ?before= instead of ?page=
+
+    Pages seek on (keyset_field, id), newest first, so deep pages cost the
+    same as the first. The context's `paginator` is an EstimatedCount
+    (exact below count_threshold, otherwise estimated or capped) and
+    `page_query` holds the current filters for building page links.
+    Views whose results are relevance-ranked return True from is_ranked()
+    and seek on the ranking key instead (see paginate_ranked).
+    """
+    keyset_field = 'created_at'
+    count_threshold = ESTIMATE_COUNT_THRESHOLD
+
+    def is_ranked(self):
+        return False
+
+    def paginate_queryset(self, queryset, page_size):
+        cursor = self.request.GET.get('cursor')
+        before = self.request.GET.get('before')
+        try:
+            if self.is_ranked():
+                page = paginate_ranked(queryset, cursor, page_size, self.keyset_field, before=before)
+            elif before:
+                page = paginate_keyset_before(queryset, before, page_size, self.keyset_field)
+            else:
+                page = paginate_keyset(queryset, cursor, page_size, self.keyset_field)
+        except InvalidCursor as e:
+            raise BadRequest(str(e))
+
+        total = estimated_count(queryset, self.count_threshold)
+        return total, page, page.items, page.has_next or page.has_previous
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        query = self.request.GET.copy()
+        for key in ('cursor', 'before', 'page'):
+            query.pop(key, None)
+        context['page_query'] = query.urlencode()
+        return context
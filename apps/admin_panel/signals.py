@@ -0,0 +1,78 @@
+"""
+Admin panel signals for keeping the metrics counters current
+"""
+from django.db.models.signals import post_delete, post_init, post_save
+
+from apps.admin_panel.metrics import invalidate_metrics, record_metric_deltas, record_signups
+from apps.authentication.models import User
+from apps.brokers.models import Broker
+from apps.portfolios.models import Portfolio
+from apps.research_calls.models import ResearchCall
+from apps.watchlists.models import Watchlist
+
+
+def _user_metrics(user):
+    return {'users', 'users:active'} if user.is_active else {'users'}
+
+
+def _call_metrics(call):
+    return {'calls', f'calls:{call.status}'}
+
+
+def _broker_metrics(broker):
+    return {'brokers', 'brokers:active'} if broker.is_active else {'brokers'}
+
+
+# model -> (fields the metrics depend on, metrics an instance counts towards)
+TRACKED_MODELS = {
+    User: (('is_active',), _user_metrics),
+    ResearchCall: (('status',), _call_metrics),
+    Broker: (('is_active',), _broker_metrics),
+    Portfolio: ((), lambda portfolio: {'portfolios'}),
+    Watchlist: ((), lambda watchlist: {'watchlists'}),
+}
+
+
+def _current_metrics(instance):
+    """Metrics of an instance, or None when a tracked field was deferred"""
+    fields, metrics = TRACKED_MODELS[type(instance)]
+    if any(field not in instance.__dict__ for field in fields):
+        return None
+    return metrics(instance)
+
+
+def remember_metrics(sender, instance, **kwargs):
+    """Note what a loaded row counts towards, to diff against on save"""
+    instance._counted_metrics = _current_metrics(instance)
+
+
+def count_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    new = _current_metrics(instance)
+    old = set() if created else getattr(instance, '_counted_metrics', None)
+    if new is None or old is None:
+        # Deferred fields: the change is unknown, so recount on the next read
+        invalidate_metrics()
+    else:
+        deltas = {name: 1 for name in new - old}
+        deltas.update({name: -1 for name in old - new})
+        record_metric_deltas(deltas)
+    instance._counted_metrics = new
+
+    if created and sender is User:
+        record_signups([instance.created_at])
+
+
+def count_deleted(sender, instance, **kwargs):
+    metrics = getattr(instance, '_counted_metrics', None)
+    if metrics is None:
+        invalidate_metrics()
+    else:
+        record_metric_deltas({name: -1 for name in metrics})
+
+
+for model in TRACKED_MODELS:
+    post_init.connect(remember_metrics, sender=model, dispatch_uid=f'admin_metrics_init_{model.__name__}')
+    post_save.connect(count_saved, sender=model, dispatch_uid=f'admin_metrics_save_{model.__name__}')
+    post_delete.connect(count_deleted, sender=model, dispatch_uid=f'admin_metrics_delete_{model.__name__}')
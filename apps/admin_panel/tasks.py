@@ -0,0 +1,54 @@
+"""
+Celery tasks for the admin panel
+"""
+from celery import shared_task
+from django.utils import timezone
+import logging
+
+from apps.admin_panel.exports import run_export_job
+from apps.admin_panel.metrics import reconcile_metrics
+from apps.admin_panel.models import ExportJob
+from apps.admin_panel.rollups import ROLLUP_REFRESH_DAYS, refresh_daily_rollups
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def task_reconcile_admin_metrics():
+    """Correct admin dashboard counters that drifted from the database"""
+    logger.info("Executing periodic task: task_reconcile_admin_metrics")
+    try:
+        corrected = reconcile_metrics()
+        if corrected:
+            logger.info(f"Corrected {corrected} admin metrics counters")
+        return corrected
+    except Exception as e:
+        logger.error(f"Error in task_reconcile_admin_metrics: {e}")
+        return 0
+
+
+@shared_task
+def task_refresh_daily_rollups(days=ROLLUP_REFRESH_DAYS):
+    """Recompute the admin dashboard's daily rollups for the most recent days"""
+    logger.info(f"Executing periodic task: task_refresh_daily_rollups ({days} days)")
+    try:
+        return refresh_daily_rollups(days=days)
+    except Exception as e:
+        logger.error(f"Error in task_refresh_daily_rollups: {e}")
+        return 0
+
+
+@shared_task
+def task_run_export_job(job_id):
+    """Write a background export to a gzip file"""
+    job = ExportJob.objects.filter(pk=job_id, status='PENDING').first()
+    if job is None:
+        return 0
+    try:
+        rows = run_export_job(job)
+        logger.info(f"Export job {job_id} wrote {rows} {job.export} rows")
+        return rows
+    except Exception as e:
+        logger.error(f"Error in task_run_export_job ({job_id}): {e}")
+        ExportJob.objects.filter(pk=job_id).update(status='FAILED', error=str(e), finished_at=timezone.now())
+        return 0
@@ -0,0 +1,216 @@
+"""
+Tests for the admin panel dashboard, rollups, exports and list pages
+"""
+import csv
+import gzip
+import io
+import json
+import tempfile
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.admin_panel.exports import iter_export_rows
+from apps.admin_panel.metrics import compute_metrics, get_metrics, get_new_users_count, reconcile_metrics
+from apps.admin_panel.rollups import get_daily_series, get_monthly_totals, refresh_daily_rollups
+from apps.admin_panel.tasks import task_run_export_job
+from apps.admin_panel.views import UserListView
+from apps.core.pagination import estimated_count
+from apps.core.testing import AdminCallFixtureMixin
+from apps.payments.models import Payment
+from apps.research_calls.models import ResearchCall
+from apps.research_calls.services import approve_research_call
+
+User = get_user_model()
+
+
+class AdminMetricsTest(AdminCallFixtureMixin, TestCase):
+    """Test the incrementally maintained admin dashboard counters"""
+
+    def test_counters_follow_writes(self):
+        self.assertEqual(get_metrics()['users'], 2)
+        self.assertEqual(get_new_users_count(), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            call = self._create_call('PENDING_APPROVAL')
+        with self.captureOnCommitCallbacks(execute=True):
+            approve_research_call(call, self.admin)
+        with self.captureOnCommitCallbacks(execute=True):
+            self._create_call('ACTIVE').delete()
+        with self.captureOnCommitCallbacks(execute=True):
+            User.objects.create_user(
+                email='metrics-customer@example.com', first_name='New', last_name='Customer',
+                password='TestPass123!', is_active=False,
+            )
+
+        metrics = get_metrics()
+        self.assertEqual(metrics, compute_metrics())
+        self.assertEqual(metrics['calls:APPROVED'], 1)
+        self.assertEqual(metrics['calls:PENDING_APPROVAL'], 0)
+        self.assertEqual(metrics['users:active'], 2)
+        self.assertEqual(get_new_users_count(), 3)
+
+    def test_stats_api_reads_counters(self):
+        self._create_call('ACTIVE')
+        self.client.force_login(self.admin)
+        url = reverse('admin_panel:api_dashboard_stats')
+        self.assertEqual(self.client.get(reverse('admin_panel:dashboard')).status_code, 200)
+
+        # Session and user lookups only
+        with self.assertNumQueries(2):
+            data = self.client.get(url).json()
+        self.assertEqual(data['total_calls'], 1)
+        self.assertEqual(data['active_calls'], 1)
+
+    def test_reconcile_fixes_bulk_updates(self):
+        self._create_call('ACTIVE')
+        get_metrics()
+        # queryset.update() sends no signals
+        ResearchCall.objects.update(status='CLOSED')
+
+        self.assertEqual(reconcile_metrics(), 2)
+        self.assertEqual(get_metrics()['calls:CLOSED'], 1)
+        self.assertEqual(reconcile_metrics(), 0)
+
+
+class DailyRollupTests(TestCase):
+    """Test the daily rollups behind the admin charts"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='rollup@example.com',
+            password='StrongPass123!',
+            first_name='Rollup',
+            last_name='User',
+        )
+        self.today = timezone.localdate()
+        self.yesterday = self.today - timedelta(days=1)
+        for receipt, plan_type, amount, status in (
+            ('r1', 'PRO', 999, 'CAPTURED'),
+            ('r2', 'BASIC', 499, 'CAPTURED'),
+            ('r3', 'PRO', 999, 'FAILED'),
+        ):
+            Payment.objects.create(
+                user=self.user, amount=amount, description=plan_type, receipt=receipt,
+                status=status, metadata={'plan_type': plan_type},
+            )
+        # One capture landed yesterday
+        Payment.objects.filter(receipt='r2').update(created_at=timezone.now() - timedelta(days=1))
+
+    def test_refresh_rolls_up_recent_days(self):
+        refresh_daily_rollups(days=2)
+
+        revenue = get_daily_series('REVENUE', self.yesterday, self.today)
+        self.assertEqual(revenue[self.today]['amount'], Decimal('999'))
+        self.assertEqual(revenue[self.yesterday]['amount'], Decimal('499'))
+        self.assertEqual(get_daily_series('REVENUE', self.today, self.today, dimension='BASIC'), {})
+        self.assertEqual(get_daily_series('PAYMENTS', self.today, self.today, dimension='FAILED')[self.today]['count'], 1)
+        self.assertEqual(get_daily_series('SIGNUPS', self.today, self.today)[self.today]['count'], 1)
+
+        monthly = get_monthly_totals('REVENUE', self.yesterday, self.today)
+        self.assertEqual(sum(month['amount'] for month in monthly.values()), Decimal('1498'))
+
+    def test_refresh_replaces_moved_statuses(self):
+        refresh_daily_rollups(days=2)
+        Payment.objects.filter(receipt='r1').update(status='REFUNDED')
+        refresh_daily_rollups(days=1)
+
+        self.assertEqual(get_daily_series('REVENUE', self.today, self.today), {})
+        self.assertEqual(get_daily_series('PAYMENTS', self.today, self.today)[self.today]['count'], 2)
+        # Days outside the refreshed range are kept
+        self.assertEqual(get_daily_series('REVENUE', self.yesterday, self.yesterday)[self.yesterday]['amount'], Decimal('499'))
+
+
+class AdminExportTest(TestCase):
+    """Test streaming and background admin exports"""
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser(
+            email='exporter@example.com', first_name='Export', last_name='Admin', password='AdminPass123!',
+        )
+        for i in range(5):
+            User.objects.create_user(
+                email=f'customer{i}@example.com', first_name='Customer', last_name=str(i),
+                password='TestPass123!', role='CUSTOMER',
+            )
+        self.client.force_login(self.admin)
+
+    def test_rows_are_read_in_keyset_chunks(self):
+        ids = [row[0] for row in iter_export_rows('users', {'role': 'CUSTOMER'}, chunk_size=2)]
+        expected = list(User.objects.filter(role='CUSTOMER').order_by('-id').values_list('id', flat=True))
+        self.assertEqual(ids, expected)
+
+    def test_streams_filtered_csv_and_jsonl(self):
+        response = self.client.get('/admin-panel/exports/users/?role=CUSTOMER&search=customer1')
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        rows = list(csv.DictReader(io.StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual([row['email'] for row in rows], ['customer1@example.com'])
+
+        response = self.client.get('/admin-panel/exports/users/?format=jsonl&role=ADMIN')
+        records = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual([record['email'] for record in records], [self.admin.email])
+        self.assertEqual(self.client.get('/admin-panel/exports/secrets/').status_code, 404)
+
+    def test_background_export_writes_gzip(self):
+        with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root):
+            # Run the job inline instead of through the broker
+            with mock.patch.object(task_run_export_job, 'delay', side_effect=task_run_export_job) as delay:
+                with self.captureOnCommitCallbacks(execute=True):
+                    response = self.client.get('/admin-panel/exports/users/?background=1&role=CUSTOMER')
+            self.assertEqual(response.status_code, 202)
+            delay.assert_called_once_with(response.json()['job_id'])
+
+            status = self.client.get(response.json()['status_url']).json()
+            self.assertEqual((status['status'], status['row_count']), ('DONE', 5))
+
+            download = self.client.get(status['download_url'])
+            lines = gzip.decompress(b''.join(download.streaming_content)).decode().splitlines()
+            self.assertEqual(len(lines), 6)  # header + rows
+
+
+class AdminListPaginationTest(TestCase):
+    """Test keyset pages and estimated totals on admin lists"""
+
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_superuser(
+            email='lister@example.com', first_name='List', last_name='Admin', password='AdminPass123!',
+        )
+        for i in range(5):
+            User.objects.create_user(
+                email=f'member{i}@example.com', first_name='Member', last_name=str(i),
+                password='TestPass123!', role='CUSTOMER',
+            )
+        self.client.force_login(self.admin)
+
+    def test_pages_walk_forward_and_back(self):
+        expected = list(User.objects.filter(role='CUSTOMER').order_by('-created_at', '-id'))
+        with mock.patch.object(UserListView, 'paginate_by', 2):
+            response = self.client.get('/admin-panel/users/?role=CUSTOMER')
+            pages = [list(response.context['users'])]
+            while response.context['page_obj'].has_next:
+                response = self.client.get(
+                    f"/admin-panel/users/?{response.context['page_query']}&cursor={response.context['page_obj'].next_cursor}"
+                )
+                pages.append(list(response.context['users']))
+            self.assertEqual([user for page in pages for user in page], expected)
+            self.assertEqual(str(response.context['paginator']), '5')
+
+            response = self.client.get(
+                f"/admin-panel/users/?{response.context['page_query']}&before={response.context['page_obj'].previous_cursor}"
+            )
+            self.assertEqual(list(response.context['users']), pages[1])
+            self.assertEqual(self.client.get('/admin-panel/users/?cursor=bogus').status_code, 400)
+
+        for url in ('/admin-panel/calls/', '/admin-panel/calls/?search=tcs', '/admin-panel/payments/?status=FAILED'):
+            self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_totals_are_capped_past_the_threshold(self):
+        self.assertEqual(str(estimated_count(User.objects.filter(role='CUSTOMER'), threshold=3)), '3+')
+        self.assertEqual(str(estimated_count(User.objects.all(), threshold=10)), '6')
@@ -11,9 +11,15 @@ urlpatterns = [
     path('', views.AdminDashboardView.as_view(), name='dashboard'),
     path('api/stats/', views.AdminDashboardStatsAPIView.as_view(), name='api_dashboard_stats'),
     
+    # Exports
+    path('exports/jobs/<int:pk>/', views.ExportJobView.as_view(), name='export_job'),
+    path('exports/<slug:name>/', views.ExportView.as_view(), name='export'),
+    
     # Research Calls
     path('calls/', views.CallListView.as_view(), name='calls_list'),
     path('calls/create/', views.CallCreateView.as_view(), name='call_create'),
+    path('calls/bulk/', views.CallBulkActionView.as_view(), name='calls_bulk'),
+    path('calls/import/', views.CallImportView.as_view(), name='call_import'),
     path('calls/<int:pk>/', views.CallDetailView.as_view(), name='call_detail'),
     path('calls/<int:pk>/edit/', views.CallUpdateView.as_view(), name='call_update'),
     path('calls/<int:pk>/delete/', views.CallDeleteView.as_view(), name='call_delete'),
@@ -26,6 +32,7 @@ urlpatterns = [
     
     # Users
     path('users/', views.UserListView.as_view(), name='users_list'),
+    path('users/bulk/', views.BulkFlagView.as_view(target='users', list_url_name='admin_panel:users_list'), name='users_bulk'),
     path('users/<int:pk>/', views.UserDetailView.as_view(), name='user_detail'),
     path('users/<int:pk>/edit/', views.UserUpdateView.as_view(), name='user_update'),
     path('users/<int:pk>/delete/', views.UserDeleteView.as_view(), name='user_delete'),
@@ -52,18 +59,21 @@ urlpatterns = [
     
     # IPOs
     path('ipos/', views.IPOListView.as_view(), name='ipos_list'),
+    path('ipos/bulk/', views.BulkFlagView.as_view(target='ipos', list_url_name='admin_panel:ipos_list'), name='ipos_bulk'),
     path('ipos/create/', views.IPOCreateView.as_view(), name='ipo_create'),
     path('ipos/<int:pk>/edit/', views.IPOUpdateView.as_view(), name='ipo_update'),
     path('ipos/<int:pk>/delete/', views.IPODeleteView.as_view(), name='ipo_delete'),
     
     # Commodities
     path('commodities/', views.CommodityListView.as_view(), name='commodities_list'),
+    path('commodities/bulk/', views.BulkFlagView.as_view(target='commodities', list_url_name='admin_panel:commodities_list'), name='commodities_bulk'),
     path('commodities/create/', views.CommodityCreateView.as_view(), name='commodity_create'),
     path('commodities/<int:pk>/edit/', views.CommodityUpdateView.as_view(), name='commodity_update'),
     path('commodities/<int:pk>/delete/', views.CommodityDeleteView.as_view(), name='commodity_delete'),
     
     # ETFs
     path('etfs/', views.ETFListView.as_view(), name='etfs_list'),
+    path('etfs/bulk/', views.BulkFlagView.as_view(target='etfs', list_url_name='admin_panel:etfs_list'), name='etfs_bulk'),
     path('etfs/create/', views.ETFCreateView.as_view(), name='etf_create'),
     path('etfs/<int:pk>/edit/', views.ETFUpdateView.as_view(), name='etf_update'),
     path('etfs/<int:pk>/delete/', views.ETFDeleteView.as_view(), name='etf_delete'),
@@ -3,25 +3,35 @@ Admin Panel Views
 Comprehensive admin dashboard with CRUD operations for all entities
 """
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
-from django.views.generic import TemplateView, ListView, CreateView, UpdateView, DeleteView, DetailView
+from django.views.generic import TemplateView, ListView, CreateView, UpdateView, DeleteView, DetailView, FormView
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
-from django.urls import reverse_lazy
-from django.db.models import Count, Sum, Avg, Q
-from django.db.models.functions import TruncDate, TruncMonth
+from django.urls import reverse, reverse_lazy
+from django.utils.http import url_has_allowed_host_and_scheme
+from django.db.models import Count, Avg, Q
 from django.utils import timezone
-from datetime import timedelta
-from django.http import JsonResponse
+from datetime import date, timedelta
+from django.http import FileResponse, Http404, JsonResponse, StreamingHttpResponse
+from django.db import transaction
 from django.views import View
 import calendar
 from apps.authentication.models import User
 from apps.brokers.models import Broker
 from apps.research_calls.models import ResearchCall
+from apps.research_calls.services import get_closed_call_summary
 from apps.portfolios.models import Portfolio, PortfolioItem
 from apps.watchlists.models import Watchlist, WatchlistItem
 from apps.payments.models import Payment, SubscriptionPlan
 from apps.market_data.models import IPO, Commodity, ETF
-from .forms import ResearchCallForm, BrokerForm, UserForm, PortfolioForm, WatchlistForm, SubscriptionPlanForm, IPOForm, CommodityForm, ETFForm
+from .bulk import BULK_FLAG_ACTIONS, bulk_set_flag
+from .exports import (
+    EXPORT_FORMATS, EXPORTS, export_filename, export_lines, filter_calls, filter_payments, filter_users,
+)
+from .metrics import get_metrics, get_new_users_count
+from .models import ExportJob
+from .pagination import KeysetPaginationMixin
+from .rollups import get_daily_series, get_monthly_totals
+from .forms import ResearchCallForm, ResearchCallImportForm, BrokerForm, UserForm, PortfolioForm, WatchlistForm, SubscriptionPlanForm, IPOForm, CommodityForm, ETFForm
 
 
 class AdminRequiredMixin(UserPassesTestMixin):
@@ -42,32 +52,30 @@ class AdminDashboardView(LoginRequiredMixin, AdminRequiredMixin, TemplateView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         
-        today = timezone.now().date()
-        last_30_days = today - timedelta(days=30)
+        today = timezone.localdate()
+        metrics = get_metrics()
         
         # User statistics
-        context['total_users'] = User.objects.count()
-        context['active_users'] = User.objects.filter(is_active=True).count()
-        context['new_users_30d'] = User.objects.filter(created_at__gte=last_30_days).count()
+        context['total_users'] = metrics['users']
+        context['active_users'] = metrics['users:active']
+        context['new_users_30d'] = get_new_users_count()
         
         # Research call statistics
-        context['total_calls'] = ResearchCall.objects.count()
-        context['active_calls'] = ResearchCall.objects.filter(status='ACTIVE').count()
-        context['pending_calls'] = ResearchCall.objects.filter(status='PENDING_APPROVAL').count()
+        context['total_calls'] = metrics['calls']
+        context['active_calls'] = metrics['calls:ACTIVE']
+        context['pending_calls'] = metrics['calls:PENDING_APPROVAL']
         
         # Success rate
-        closed_calls = ResearchCall.objects.filter(status='CLOSED')
-        successful_calls = closed_calls.filter(actual_return_percentage__gt=0).count()
-        total_closed = closed_calls.count()
-        context['success_rate'] = (successful_calls / total_closed * 100) if total_closed > 0 else 0
+        context['closed_summary'] = get_closed_call_summary()
+        context['success_rate'] = context['closed_summary']['accuracy']
         
         # Broker statistics
-        context['total_brokers'] = Broker.objects.count()
-        context['active_brokers'] = Broker.objects.filter(is_active=True).count()
+        context['total_brokers'] = metrics['brokers']
+        context['active_brokers'] = metrics['brokers:active']
         
         # Portfolio statistics
-        context['total_portfolios'] = Portfolio.objects.count()
-        context['total_watchlists'] = Watchlist.objects.count()
+        context['total_portfolios'] = metrics['portfolios']
+        context['total_watchlists'] = metrics['watchlists']
         
         # Top brokers by accuracy
         context['top_brokers'] = Broker.objects.filter(
@@ -80,56 +88,36 @@ class AdminDashboardView(LoginRequiredMixin, AdminRequiredMixin, TemplateView):
         ).order_by('-created_at')[:10]
         
         # Pending approvals — count for stats card, queryset for table loop
-        pending_qs = ResearchCall.objects.filter(
+        context['pending_approvals'] = metrics['calls:PENDING_APPROVAL']
+        context['pending_approvals_list'] = ResearchCall.objects.filter(
             status='PENDING_APPROVAL'
-        ).select_related('broker', 'created_by').order_by('-created_at')
-        context['pending_approvals'] = pending_qs.count()
-        context['pending_approvals_list'] = pending_qs[:20]
+        ).select_related('broker', 'created_by').order_by('-created_at')[:20]
 
         # Chart 1: User registrations over last 7 days
-        last_7_days = today - timedelta(days=7)
-        user_growth = User.objects.filter(created_at__gte=last_7_days) \
-            .annotate(date=TruncDate('created_at')) \
-            .values('date') \
-            .annotate(count=Count('id')) \
-            .order_by('date')
-            
-        dates_7d = [(today - timedelta(days=i)).strftime('%b %d') for i in range(6, -1, -1)]
-        counts_dict = {item['date'].strftime('%b %d'): item['count'] for item in user_growth if item['date']}
-        context['user_growth_labels'] = dates_7d
-        context['user_growth_data'] = [counts_dict.get(d, 0) for d in dates_7d]
+        days_7d = [today - timedelta(days=i) for i in range(6, -1, -1)]
+        signups = get_daily_series('SIGNUPS', days_7d[0], today)
+        context['user_growth_labels'] = [day.strftime('%b %d') for day in days_7d]
+        context['user_growth_data'] = [signups.get(day, {}).get('count', 0) for day in days_7d]
 
         # Chart 2: Research calls by status
-        calls_by_status = ResearchCall.objects.values('status').annotate(count=Count('id'))
-        status_dict = {item['status']: item['count'] for item in calls_by_status}
         context['calls_status_labels'] = ['Active', 'Pending', 'Closed', 'Rejected']
         context['calls_status_data'] = [
-            status_dict.get('ACTIVE', 0),
-            status_dict.get('PENDING_APPROVAL', 0),
-            status_dict.get('CLOSED', 0),
-            status_dict.get('REJECTED', 0)
+            metrics['calls:ACTIVE'],
+            metrics['calls:PENDING_APPROVAL'],
+            metrics['calls:CLOSED'],
+            metrics.get('calls:REJECTED', 0)
         ]
 
         # Chart 3: Payment Revenue (Last 6 Months)
-        six_months_ago = today - timedelta(days=180)
-        revenue_data_qs = Payment.objects.filter(created_at__gte=six_months_ago, status='CAPTURED') \
-            .annotate(month=TruncMonth('created_at')) \
-            .values('month') \
-            .annotate(total=Sum('amount')) \
-            .order_by('month')
-            
-        months_6m_labels = []
+        months_6m = []
         for i in range(5, -1, -1):
             m = (today.month - i - 1) % 12 + 1
             y = today.year + ((today.month - i - 1) // 12)
-            months_6m_labels.append(f"{calendar.month_abbr[m]} {y}")
+            months_6m.append((y, m))
             
-        rev_dict = {
-            f"{calendar.month_abbr[item['month'].month]} {item['month'].year}": float(item['total']) 
-            for item in revenue_data_qs if item['month']
-        }
-        context['revenue_labels'] = months_6m_labels
-        context['revenue_data'] = [rev_dict.get(label, 0.0) for label in months_6m_labels]
+        revenue = get_monthly_totals('REVENUE', date(*months_6m[0], 1), today)
+        context['revenue_labels'] = [f"{calendar.month_abbr[m]} {y}" for y, m in months_6m]
+        context['revenue_data'] = [float(revenue.get(month, {}).get('amount', 0)) for month in months_6m]
 
         return context
 
@@ -138,30 +126,148 @@ class AdminDashboardStatsAPIView(LoginRequiredMixin, AdminRequiredMixin, View):
     """API endpoint to fetch live stats for admin dashboard auto-refresh"""
     
     def get(self, request, *args, **kwargs):
-        today = timezone.now().date()
-        last_30_days = today - timedelta(days=30)
-        
-        total_closed = ResearchCall.objects.filter(status='CLOSED').count()
-        successful_calls = ResearchCall.objects.filter(status='CLOSED', actual_return_percentage__gt=0).count()
-        success_rate = (successful_calls / total_closed * 100) if total_closed > 0 else 0
+        metrics = get_metrics()
+        success_rate = get_closed_call_summary()['accuracy']
         
         data = {
-            'total_users': User.objects.count(),
-            'new_users_30d': User.objects.filter(created_at__gte=last_30_days).count(),
-            'total_calls': ResearchCall.objects.count(),
-            'active_calls': ResearchCall.objects.filter(status='ACTIVE').count(),
-            'pending_calls': ResearchCall.objects.filter(status='PENDING_APPROVAL').count(),
+            'total_users': metrics['users'],
+            'new_users_30d': get_new_users_count(),
+            'total_calls': metrics['calls'],
+            'active_calls': metrics['calls:ACTIVE'],
+            'pending_calls': metrics['calls:PENDING_APPROVAL'],
             'success_rate': round(success_rate, 1),
-            'total_brokers': Broker.objects.count(),
-            'total_portfolios': Portfolio.objects.count(),
-            'total_watchlists': Watchlist.objects.count(),
+            'total_brokers': metrics['brokers'],
+            'total_portfolios': metrics['portfolios'],
+            'total_watchlists': metrics['watchlists'],
         }
         return JsonResponse(data)
 
 
+# ─── Exports ───────────────────────────────
+
+class ExportView(LoginRequiredMixin, AdminRequiredMixin, View):
+    """
+    Stream an admin list as CSV or JSONL, filtered like the list view.
+    With ?background=1 the export runs as a job that writes a gzip file.
+    """
+
+    def get(self, request, name):
+        if name not in EXPORTS:
+            raise Http404('Unknown export')
+        export_format = request.GET.get('format', 'csv')
+        if export_format not in EXPORT_FORMATS:
+            return JsonResponse({'error': f'Unsupported format: {export_format}'}, status=400)
+        params = {
+            key: value for key, value in request.GET.items()
+            if key not in ('format', 'background', 'page')
+        }
+
+        if request.GET.get('background'):
+            from .tasks import task_run_export_job
+
+            job = ExportJob.objects.create(
+                user=request.user, export=name, export_format=export_format, params=params,
+            )
+            transaction.on_commit(lambda: task_run_export_job.delay(job.id))
+            return JsonResponse({
+                'job_id': job.id,
+                'status': job.status,
+                'status_url': reverse('admin_panel:export_job', args=[job.id]),
+            }, status=202)
+
+        response = StreamingHttpResponse(
+            export_lines(name, params, export_format),
+            content_type=EXPORT_FORMATS[export_format][0],
+        )
+        response['Content-Disposition'] = f'attachment; filename="{export_filename(name, export_format)}"'
+        return response
+
+
+class ExportJobView(LoginRequiredMixin, AdminRequiredMixin, View):
+    """Status of a background export; ?download=1 returns the finished file"""
+
+    def get(self, request, pk):
+        job = get_object_or_404(ExportJob, pk=pk, user=request.user)
+        if request.GET.get('download'):
+            if job.status != 'DONE' or not job.file:
+                raise Http404('Export is not ready')
+            return FileResponse(job.file.open('rb'), as_attachment=True, filename=job.file.name.rsplit('/', 1)[-1])
+
+        return JsonResponse({
+            'job_id': job.id,
+            'export': job.export,
+            'status': job.status,
+            'row_count': job.row_count,
+            'error': job.error,
+            'download_url': f"{reverse('admin_panel:export_job', args=[job.id])}?download=1" if job.status == 'DONE' else None,
+        })
+
+
+# ─── Bulk Actions ───────────────────────────────
+
+class BulkActionMixin:
+    """Selected ids and the return URL of a list page's bulk action form"""
+    list_url_name = None
+    
+    def get_selected_ids(self):
+        return {int(value) for value in self.request.POST.getlist('ids') if value.isdigit()}
+    
+    def get_return_url(self):
+        next_url = self.request.POST.get('next', '')
+        if url_has_allowed_host_and_scheme(next_url, allowed_hosts={self.request.get_host()}):
+            return next_url
+        return reverse(self.list_url_name)
+
+
+class CallBulkActionView(LoginRequiredMixin, AdminRequiredMixin, BulkActionMixin, View):
+    """Approve, publish, close or delete the selected research calls"""
+    list_url_name = 'admin_panel:calls_list'
+    
+    def post(self, request):
+        from apps.research_calls.bulk import BULK_ACTIONS, bulk_delete_calls, bulk_transition_calls
+        
+        call_ids = self.get_selected_ids()
+        action = request.POST.get('action')
+        if action not in BULK_ACTIONS or not call_ids:
+            messages.error(request, 'Select research calls and an action.')
+            return redirect(self.get_return_url())
+        
+        if action == 'delete':
+            result = bulk_delete_calls(call_ids, request.user)
+            messages.success(request, f"Deleted {result['deleted']} research calls.")
+        else:
+            result = bulk_transition_calls(
+                call_ids, action, request.user, reason=request.POST.get('reason', 'Closed by admin'),
+            )
+            messages.success(request, f"{action.title()}: {result['updated']} research calls updated.")
+        if result['skipped']:
+            messages.warning(request, f"{result['skipped']} selected calls were skipped.")
+        return redirect(self.get_return_url())
+
+
+class BulkFlagView(LoginRequiredMixin, AdminRequiredMixin, BulkActionMixin, View):
+    """Activate/deactivate (or list/unlist) the selected rows of a list page"""
+    target = None
+    
+    def post(self, request):
+        object_ids = self.get_selected_ids()
+        action = request.POST.get('action')
+        if action not in BULK_FLAG_ACTIONS[self.target][2] or not object_ids:
+            messages.error(request, 'Select rows and an action.')
+            return redirect(self.get_return_url())
+        
+        # Admins cannot deactivate their own account
+        exclude_ids = {request.user.id} if self.target == 'users' else ()
+        result = bulk_set_flag(self.target, object_ids, action, request.user, exclude_ids=exclude_ids)
+        messages.success(request, f"{action.replace('_', ' ').title()}: {result['updated']} updated.")
+        if result['skipped']:
+            messages.warning(request, f"{result['skipped']} selected rows were skipped.")
+        return redirect(self.get_return_url())
+
+
 # ─── Research Calls Management ────────────────────────────────
 
-class CallListView(LoginRequiredMixin, AdminRequiredMixin, ListView):
+class CallListView(LoginRequiredMixin, AdminRequiredMixin, KeysetPaginationMixin, ListView):
     """List all research calls with filters"""
     model = ResearchCall
     template_name = 'admin_panel/calls/list.html'
@@ -170,22 +276,11 @@ class CallListView(LoginRequiredMixin, AdminRequiredMixin, ListView):
     
     def get_queryset(self):
         queryset = ResearchCall.objects.select_related('broker', 'created_by').order_by('-created_at')
-        
-        status = self.request.GET.get('status')
-        broker_id = self.request.GET.get('broker')
-        search = self.request.GET.get('search')
-        
-        if status:
-            queryset = queryset.filter(status=status)
-        if broker_id:
-            queryset = queryset.filter(broker_id=broker_id)
-        if search:
-            queryset = queryset.filter(
-                Q(symbol__icontains=search) | 
-                Q(broker__name__icontains=search)
-            )
-        
-        return queryset
+        return filter_calls(self.request.GET, queryset)
+    
+    def is_ranked(self):
+        # Searches are ordered by relevance, which has no stable key to seek on
+        return bool(self.request.GET.get('search'))
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -239,6 +334,35 @@ class CallDetailView(LoginRequiredMixin, AdminRequiredMixin, DetailView):
     context_object_name = 'call'
 
 
+class CallImportView(LoginRequiredMixin, AdminRequiredMixin, FormView):
+    """Bulk import research calls from a CSV/JSON upload"""
+    form_class = ResearchCallImportForm
+    template_name = 'admin_panel/calls/import.html'
+    success_url = reverse_lazy('admin_panel:calls_list')
+    
+    def form_valid(self, form):
+        from apps.research_calls.imports import import_research_calls, parse_call_file
+        
+        try:
+            rows = parse_call_file(form.cleaned_data['file'])
+        except ValueError as e:
+            form.add_error('file', str(e))
+            return self.form_invalid(form)
+        
+        result = import_research_calls(
+            rows,
+            created_by=self.request.user,
+            skip_invalid=form.cleaned_data['skip_invalid'],
+        )
+        if result['errors'] and not result['created']:
+            return self.render_to_response(self.get_context_data(form=form, result=result))
+        
+        messages.success(self.request, f"Imported {result['created']} of {result['total']} research calls.")
+        if result['errors']:
+            messages.warning(self.request, f"{len(result['errors'])} invalid rows were skipped.")
+        return super().form_valid(form)
+
+
 # ─── Broker Management ───────────────────────────────────────
 
 class BrokerListView(LoginRequiredMixin, AdminRequiredMixin, ListView):
@@ -296,7 +420,7 @@ class BrokerUpdateView(LoginRequiredMixin, AdminRequiredMixin, UpdateView):
 
 # ─── User Management ─────────────────────────────────────────
 
-class UserListView(LoginRequiredMixin, AdminRequiredMixin, ListView):
+class UserListView(LoginRequiredMixin, AdminRequiredMixin, KeysetPaginationMixin, ListView):
     """List all users"""
     model = User
     template_name = 'admin_panel/users/list.html'
@@ -304,20 +428,7 @@ class UserListView(LoginRequiredMixin, AdminRequiredMixin, ListView):
     paginate_by = 20
     
     def get_queryset(self):
-        queryset = User.objects.order_by('-created_at')
-        role = self.request.GET.get('role')
-        search = self.request.GET.get('search')
-        
-        if role:
-            queryset = queryset.filter(role=role)
-        if search:
-            queryset = queryset.filter(
-                Q(email__icontains=search) | 
-                Q(first_name__icontains=search) | 
-                Q(last_name__icontains=search)
-            )
-        
-        return queryset
+        return filter_users(self.request.GET, User.objects.order_by('-created_at'))
 
 
 class UserDetailView(LoginRequiredMixin, AdminRequiredMixin, DetailView):
@@ -487,7 +598,7 @@ class SubscriptionPlanDeleteView(LoginRequiredMixin, AdminRequiredMixin, DeleteV
 
 # ─── Payment Management (Read-Only) ──────────────────────────
 
-class PaymentListView(LoginRequiredMixin, AdminRequiredMixin, ListView):
+class PaymentListView(LoginRequiredMixin, AdminRequiredMixin, KeysetPaginationMixin, ListView):
     """List all payments"""
     model = Payment
     template_name = 'admin_panel/payments/list.html'
@@ -496,20 +607,7 @@ class PaymentListView(LoginRequiredMixin, AdminRequiredMixin, ListView):
     
     def get_queryset(self):
         queryset = Payment.objects.select_related('user').order_by('-created_at')
-        status = self.request.GET.get('status')
-        search = self.request.GET.get('search')
-        
-        if status:
-            queryset = queryset.filter(status=status)
-        if search:
-            queryset = queryset.filter(
-                Q(user__email__icontains=search) |
-                Q(receipt__icontains=search) |
-                Q(razorpay_order_id__icontains=search) |
-                Q(razorpay_payment_id__icontains=search)
-            )
-        
-        return queryset
+        return filter_payments(self.request.GET, queryset)
 
 
 class PaymentDetailView(LoginRequiredMixin, AdminRequiredMixin, DetailView):
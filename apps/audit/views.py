@@ -3,10 +3,17 @@ Views for the audit app.
 Provides read-only access to AuditLog records via REST API.
 Admin users can see all logs; customers see only their own.
 """
-from rest_framework import generics, permissions, filters
+from rest_framework import generics, permissions
 from django_filters.rest_framework import DjangoFilterBackend
 from apps.audit.models import AuditLog
 from apps.audit.serializers import AuditLogSerializer
+from apps.core.pagination import KeysetPagination
+
+
+class AuditLogPagination(KeysetPagination):
+    """Newest-first cursor pages over the (-created_at) indexes"""
+    field = 'created_at'
+    page_size = 20
 
 
 class IsAdminUser(permissions.BasePermission):
@@ -19,15 +26,14 @@ class IsAdminUser(permissions.BasePermission):
 class AuditLogListView(generics.ListAPIView):
     """
     GET /api/audit/logs/
-    Admin-only. Returns full paginated audit log list.
-    Supports filtering by action, model_name, and ordering by created_at.
+    Admin-only. Returns the audit log newest first, paged by ?cursor=.
+    Supports filtering by action, model_name and object_id.
     """
     serializer_class = AuditLogSerializer
     permission_classes = [IsAdminUser]
-    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
+    pagination_class = AuditLogPagination
+    filter_backends = [DjangoFilterBackend]
     filterset_fields = ['action', 'model_name', 'object_id']
-    ordering_fields = ['created_at']
-    ordering = ['-created_at']
 
     def get_queryset(self):
         return AuditLog.objects.select_related('user').all()
@@ -46,12 +52,11 @@ class AuditLogDetailView(generics.RetrieveAPIView):
 class MyAuditLogListView(generics.ListAPIView):
     """
     GET /api/audit/my-logs/
-    Authenticated users can see their own audit trail.
+    Authenticated users can see their own audit trail, newest first.
     """
     serializer_class = AuditLogSerializer
     permission_classes = [permissions.IsAuthenticated]
-    filter_backends = [filters.OrderingFilter]
-    ordering = ['-created_at']
+    pagination_class = AuditLogPagination
 
     def get_queryset(self):
         return AuditLog.objects.filter(user=self.request.user).select_related('user')
@@ -67,6 +67,7 @@ class User(AbstractBaseUser, PermissionsMixin):
             models.Index(fields=['email']),
             models.Index(fields=['role']),
             models.Index(fields=['is_active']),
+            models.Index(fields=['created_at']),
         ]
         verbose_name = 'User'
         verbose_name_plural = 'Users'
@@ -2,11 +2,12 @@
 Authentication utilities for token generation and email
 """
 import secrets
-from django.core.mail import send_mail
 from django.conf import settings
 from django.template.loader import render_to_string
 from django.utils.html import strip_tags
 
+from apps.notifications.outbox import enqueue_email
+
 
 def generate_verification_token():
     """Generate a secure random token for email verification"""
@@ -15,7 +16,7 @@ def generate_verification_token():
 
 def send_verification_email(user, token):
     """
-    Send email verification link to user
+    Queue the email verification link for user
     
     Args:
         user: User instance
@@ -30,19 +31,12 @@ def send_verification_email(user, token):
     })
     plain_message = strip_tags(html_message)
     
-    send_mail(
-        subject,
-        plain_message,
-        settings.DEFAULT_FROM_EMAIL,
-        [user.email],
-        html_message=html_message,
-        fail_silently=False,
-    )
+    enqueue_email(user.email, subject, plain_message, html_body=html_message, idempotency_key=f'verify:{token}')
 
 
 def send_password_reset_email(user, token):
     """
-    Send password reset link to user
+    Queue the password reset link for user
     
     Args:
         user: User instance
@@ -57,19 +51,12 @@ def send_password_reset_email(user, token):
     })
     plain_message = strip_tags(html_message)
     
-    send_mail(
-        subject,
-        plain_message,
-        settings.DEFAULT_FROM_EMAIL,
-        [user.email],
-        html_message=html_message,
-        fail_silently=False,
-    )
+    enqueue_email(user.email, subject, plain_message, html_body=html_message, idempotency_key=f'reset:{token}')
 
 
 def send_welcome_email(user):
     """
-    Send welcome email to newly registered user
+    Queue the welcome email for a newly registered user
     
     Args:
         user: User instance
@@ -81,11 +68,4 @@ def send_welcome_email(user):
     })
     plain_message = strip_tags(html_message)
     
-    send_mail(
-        subject,
-        plain_message,
-        settings.DEFAULT_FROM_EMAIL,
-        [user.email],
-        html_message=html_message,
-        fail_silently=False,
-    )
+    enqueue_email(user.email, subject, plain_message, html_body=html_message, idempotency_key=f'welcome:{user.pk}')
@@ -31,8 +31,8 @@ class BrokerAdmin(admin.ModelAdmin):
 
 @admin.register(BrokerPerformanceMetrics)
 class BrokerPerformanceMetricsAdmin(admin.ModelAdmin):
-    list_display = ('broker', 'metric_date', 'accuracy_percentage', 'total_closed_calls', 'successful_calls')
-    list_filter = ('metric_date', 'broker')
+    list_display = ('broker', 'metric_date', 'window_days', 'accuracy_percentage', 'total_closed_calls', 'successful_calls')
+    list_filter = ('window_days', 'metric_date', 'broker')
     search_fields = ('broker__name',)
     readonly_fields = ('created_at', 'updated_at')
     date_hierarchy = 'metric_date'
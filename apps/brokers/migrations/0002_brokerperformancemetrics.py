@@ -0,0 +1,72 @@
+# Generated by Django 5.2.11 on 2026-10-18 09:12
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('brokers', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BrokerPerformanceMetrics',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('metric_date', models.DateField(db_index=True)),
+                ('window_days', models.PositiveSmallIntegerField(choices=[(7, '7 Days'), (30, '30 Days'), (90, '90 Days'), (365, '365 Days')], default=30)),
+                ('total_closed_calls', models.IntegerField(default=0)),
+                ('successful_calls', models.IntegerField(default=0)),
+                ('accuracy_percentage', models.DecimalField(decimal_places=2, default=0.0, max_digits=5)),
+                ('avg_return_percentage', models.DecimalField(decimal_places=2, default=0.0, max_digits=10)),
+                ('intraday_accuracy', models.DecimalField(blank=True, decimal_places=2, max_digits=5, null=True)),
+                ('swing_accuracy', models.DecimalField(blank=True, decimal_places=2, max_digits=5, null=True)),
+                ('shortterm_accuracy', models.DecimalField(blank=True, decimal_places=2, max_digits=5, null=True)),
+                ('longterm_accuracy', models.DecimalField(blank=True, decimal_places=2, max_digits=5, null=True)),
+                ('intraday_avg_return', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('swing_avg_return', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('shortterm_avg_return', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('longterm_avg_return', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'broker_performance_metrics',
+                'ordering': ['-metric_date'],
+            },
+        ),
+        migrations.RenameIndex(
+            model_name='broker',
+            new_name='app_brokers_slug_cb123b_idx',
+            old_name='brokers_slug_73e412_idx',
+        ),
+        migrations.RenameIndex(
+            model_name='broker',
+            new_name='app_brokers_is_acti_e4aaea_idx',
+            old_name='brokers_is_acti_d92321_idx',
+        ),
+        migrations.RenameIndex(
+            model_name='broker',
+            new_name='app_brokers_overall_478b8e_idx',
+            old_name='brokers_overall_419c1c_idx',
+        ),
+        migrations.AddField(
+            model_name='brokerperformancemetrics',
+            name='broker',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='performance_metrics', to='brokers.broker'),
+        ),
+        migrations.AddIndex(
+            model_name='brokerperformancemetrics',
+            index=models.Index(fields=['broker', '-metric_date'], name='broker_perf_broker__3f5d4d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='brokerperformancemetrics',
+            index=models.Index(fields=['broker', 'window_days', '-metric_date'], name='broker_perf_broker__0c9e61_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='brokerperformancemetrics',
+            unique_together={('broker', 'metric_date', 'window_days')},
+        ),
+    ]
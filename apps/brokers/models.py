@@ -58,12 +58,20 @@ class Broker(models.Model):
 class BrokerPerformanceMetrics(models.Model):
     """Daily performance metrics for brokers"""
     
+    WINDOW_CHOICES = [
+        (7, '7 Days'),
+        (30, '30 Days'),
+        (90, '90 Days'),
+        (365, '365 Days'),
+    ]
+    
     broker = models.ForeignKey(
         Broker, 
         on_delete=models.CASCADE, 
         related_name='performance_metrics'
     )
     metric_date = models.DateField(db_index=True)
+    window_days = models.PositiveSmallIntegerField(choices=WINDOW_CHOICES, default=30)
     
     # Overall Metrics
     total_closed_calls = models.IntegerField(default=0)
@@ -88,11 +96,12 @@ class BrokerPerformanceMetrics(models.Model):
     
     class Meta:
         db_table = 'broker_performance_metrics'
-        unique_together = [['broker', 'metric_date']]
+        unique_together = [['broker', 'metric_date', 'window_days']]
         indexes = [
             models.Index(fields=['broker', '-metric_date']),
+            models.Index(fields=['broker', 'window_days', '-metric_date']),
         ]
         ordering = ['-metric_date']
     
     def __str__(self):
-        return f"{self.broker.name} - {self.metric_date}"
+        return f"{self.broker.name} - {self.metric_date} ({self.window_days}d)"
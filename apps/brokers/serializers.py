@@ -11,10 +11,11 @@ class BrokerPerformanceMetricsSerializer(serializers.ModelSerializer):
     class Meta:
         model = BrokerPerformanceMetrics
         fields = [
-            'id', 'metric_date',
+            'id', 'metric_date', 'window_days',
             'total_closed_calls', 'successful_calls', 'accuracy_percentage',
             'avg_return_percentage',
             'intraday_accuracy', 'swing_accuracy', 'shortterm_accuracy', 'longterm_accuracy',
+            'intraday_avg_return', 'swing_avg_return', 'shortterm_avg_return', 'longterm_avg_return',
             'created_at',
         ]
         read_only_fields = fields
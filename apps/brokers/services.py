@@ -1,11 +1,25 @@
 """
 Broker services - Business logic for broker operations
 """
-from django.db import transaction
+from django.db import connection, transaction
+from django.db.models import Avg, Count, Q
 from apps.brokers.models import Broker, BrokerPerformanceMetrics
 from apps.research_calls.models import ResearchCall
+from apps.research_calls.services import WIN_FILTER
 from django.utils import timezone
 from datetime import timedelta
+from decimal import Decimal
+
+
+METRIC_WINDOWS = (7, 30, 90, 365)
+
+# Metric column prefix -> ResearchCall.call_type
+CALL_TYPE_BUCKETS = {
+    'intraday': 'INTRADAY',
+    'swing': 'SWING',
+    'shortterm': 'SHORT_TERM',
+    'longterm': 'LONG_TERM',
+}
 
 
 def calculate_broker_accuracy(broker, days=30):
@@ -14,18 +28,17 @@ def calculate_broker_accuracy(broker, days=30):
     
     Args:
         broker: Broker instance
-        days: Number of days to look back
+        days: Number of days to look back (None for the broker's lifetime)
     
     Returns:
         dict: Accuracy metrics
     """
-    cutoff_date = timezone.now() - timedelta(days=days)
-    
     closed_calls = ResearchCall.objects.filter(
         broker=broker,
         status='CLOSED',
-        closed_at__gte=cutoff_date
     )
+    if days is not None:
+        closed_calls = closed_calls.filter(closed_at__gte=timezone.now() - timedelta(days=days))
     
     total_closed = closed_calls.count()
     if total_closed == 0:
@@ -36,7 +49,8 @@ def calculate_broker_accuracy(broker, days=30):
             'avg_return': 0,
         }
     
-    successful_calls = closed_calls.filter(is_successful=True).count()
+    # A win is a positive realised return, as in the rollup and closed-call summary
+    successful_calls = closed_calls.filter(WIN_FILTER).count()
     accuracy = (successful_calls / total_closed) * 100
     
     # Calculate average return
@@ -59,14 +73,15 @@ def update_broker_metrics(broker):
     Args:
         broker: Broker instance
     """
-    metrics = calculate_broker_accuracy(broker, days=365)  # Last year
+    metrics = calculate_broker_accuracy(broker, days=None)  # Lifetime, like the other Broker columns
     
     broker.overall_accuracy = metrics['accuracy_percentage']
+    broker.total_calls_closed = metrics['total_calls']
     broker.total_calls_published = ResearchCall.objects.filter(
         broker=broker,
         status__in=['ACTIVE', 'CLOSED']
     ).count()
-    broker.save(update_fields=['overall_accuracy', 'total_calls_published', 'updated_at'])
+    broker.save(update_fields=['overall_accuracy', 'total_calls_closed', 'total_calls_published', 'updated_at'])
     
     return broker
 
@@ -86,3 +101,136 @@ def get_top_brokers(limit=10):
         is_verified=True,
         total_calls_published__gte=10  # Minimum 10 calls
     ).order_by('-overall_accuracy')[:limit]
+
+
+def _percentage(part, whole):
+    if not whole:
+        return None
+    return Decimal(part * 100 / whole).quantize(Decimal('0.01'))
+
+
+def _round(value):
+    if value is None:
+        return None
+    return Decimal(value).quantize(Decimal('0.01'))
+
+
+def _window_aggregates(cutoff):
+    """
+    One grouped, conditional-aggregate query over calls closed since cutoff
+    (all closed calls when cutoff is None).
+
+    Returns:
+        dict: broker_id -> aggregate row
+    """
+    aggregates = {
+        'total_closed': Count('id'),
+        'successful': Count('id', filter=WIN_FILTER),
+        'avg_return': Avg('actual_return_percentage'),
+    }
+    for prefix, call_type in CALL_TYPE_BUCKETS.items():
+        type_filter = Q(call_type=call_type)
+        aggregates[f'{prefix}_total'] = Count('id', filter=type_filter)
+        aggregates[f'{prefix}_wins'] = Count('id', filter=type_filter & WIN_FILTER)
+        aggregates[f'{prefix}_avg'] = Avg('actual_return_percentage', filter=type_filter)
+
+    calls = ResearchCall.objects.filter(status='CLOSED')
+    if cutoff is not None:
+        calls = calls.filter(closed_at__gte=cutoff)
+    rows = calls.order_by().values('broker_id').annotate(**aggregates)
+
+    return {row['broker_id']: row for row in rows}
+
+
+def _metrics_from_row(broker_id, metric_date, window_days, row):
+    metrics = BrokerPerformanceMetrics(
+        broker_id=broker_id,
+        metric_date=metric_date,
+        window_days=window_days,
+        total_closed_calls=row['total_closed'],
+        successful_calls=row['successful'],
+        accuracy_percentage=_percentage(row['successful'], row['total_closed']) or Decimal('0.00'),
+        avg_return_percentage=_round(row['avg_return']) or Decimal('0.00'),
+    )
+    for prefix in CALL_TYPE_BUCKETS:
+        setattr(metrics, f'{prefix}_accuracy', _percentage(row[f'{prefix}_wins'], row[f'{prefix}_total']))
+        setattr(metrics, f'{prefix}_avg_return', _round(row[f'{prefix}_avg']))
+    return metrics
+
+
+def _upsert_metrics(rows):
+    update_fields = [
+        'total_closed_calls', 'successful_calls', 'accuracy_percentage', 'avg_return_percentage',
+        'updated_at',
+    ]
+    for prefix in CALL_TYPE_BUCKETS:
+        update_fields += [f'{prefix}_accuracy', f'{prefix}_avg_return']
+
+    kwargs = {'update_conflicts': True, 'update_fields': update_fields}
+    # MySQL's ON DUPLICATE KEY UPDATE does not take a conflict target
+    if connection.features.supports_update_conflicts_with_target:
+        kwargs['unique_fields'] = ['broker', 'metric_date', 'window_days']
+
+    BrokerPerformanceMetrics.objects.bulk_create(rows, batch_size=500, **kwargs)
+
+
+def rollup_broker_performance(metric_date=None, windows=METRIC_WINDOWS):
+    """
+    Nightly rollup of BrokerPerformanceMetrics for every broker.
+    
+    Runs one grouped query per window (broken down by call type) and writes
+    the results with a bulk upsert keyed on (broker, metric_date, window_days).
+    Brokers with no closed calls in a window get a zeroed row so readers can
+    rely on a row existing for every active broker. The denormalized
+    accuracy/return/count columns on Broker are refreshed from one more
+    grouped query over all closed calls, so they stay lifetime figures like
+    total_calls_published; windowed figures are read from the metrics rows.
+    
+    Args:
+        metric_date: Date the snapshot is recorded against (defaults to today)
+        windows: Look-back windows in days
+    
+    Returns:
+        int: Number of metric rows written
+    """
+    now = timezone.now()
+    metric_date = metric_date or timezone.localdate()
+    broker_ids = list(Broker.objects.filter(is_active=True).values_list('id', flat=True))
+
+    empty_row = {'total_closed': 0, 'successful': 0, 'avg_return': None}
+    for prefix in CALL_TYPE_BUCKETS:
+        empty_row.update({f'{prefix}_total': 0, f'{prefix}_wins': 0, f'{prefix}_avg': None})
+
+    rows = []
+    for window_days in windows:
+        aggregates = _window_aggregates(now - timedelta(days=window_days))
+        for broker_id in broker_ids:
+            rows.append(_metrics_from_row(
+                broker_id, metric_date, window_days, aggregates.get(broker_id, empty_row)
+            ))
+    lifetime = _window_aggregates(None)
+
+    published_counts = dict(
+        ResearchCall.objects.filter(
+            broker_id__in=broker_ids,
+            status__in=['ACTIVE', 'CLOSED'],
+        ).order_by().values('broker_id').annotate(total=Count('id')).values_list('broker_id', 'total')
+    )
+
+    with transaction.atomic():
+        _upsert_metrics(rows)
+
+        brokers = list(Broker.objects.filter(id__in=broker_ids))
+        for broker in brokers:
+            row = lifetime.get(broker.id, empty_row)
+            broker.total_calls_published = published_counts.get(broker.id, 0)
+            broker.total_calls_closed = row['total_closed']
+            broker.overall_accuracy = _percentage(row['successful'], row['total_closed']) or Decimal('0.00')
+            broker.avg_return_percentage = _round(row['avg_return']) or Decimal('0.00')
+        Broker.objects.bulk_update(
+            brokers,
+            ['total_calls_published', 'overall_accuracy', 'avg_return_percentage', 'total_calls_closed'],
+            batch_size=500,
+        )
+
+    return len(rows)
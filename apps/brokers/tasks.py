@@ -0,0 +1,22 @@
+"""
+Celery tasks for broker performance rollups
+"""
+from celery import shared_task
+import logging
+
+from apps.brokers.services import rollup_broker_performance
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def task_rollup_broker_performance():
+    """Nightly 7/30/90/365-day BrokerPerformanceMetrics rollup"""
+    logger.info("Executing periodic task: task_rollup_broker_performance")
+    try:
+        written = rollup_broker_performance()
+        logger.info(f"Wrote {written} broker performance metric rows")
+        return written
+    except Exception as e:
+        logger.error(f"Error in task_rollup_broker_performance: {e}")
+        return 0
@@ -0,0 +1,97 @@
+"""
+Tests for broker performance rollups.
+"""
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.brokers.models import Broker, BrokerPerformanceMetrics
+from apps.brokers.services import calculate_broker_accuracy, rollup_broker_performance
+from apps.research_calls.models import ResearchCall
+
+User = get_user_model()
+
+
+class BrokerRollupTest(TestCase):
+    """Test the multi-window BrokerPerformanceMetrics rollup."""
+
+    def setUp(self):
+        self.analyst = User.objects.create_user(
+            email='analyst@example.com',
+            first_name='Test',
+            last_name='Analyst',
+            password='TestPass123!',
+            role='ANALYST',
+        )
+        self.broker = Broker.objects.create(name='Rollup Broker', slug='rollup-broker')
+        self.idle_broker = Broker.objects.create(name='Idle Broker', slug='idle-broker')
+
+    def _closed_call(self, call_type, actual_return, closed_days_ago):
+        return ResearchCall.objects.create(
+            symbol='RELIANCE',
+            created_by=self.analyst,
+            broker=self.broker,
+            action='BUY',
+            call_type=call_type,
+            entry_price=Decimal('2500.00'),
+            target_1=Decimal('2700.00'),
+            stop_loss=Decimal('2400.00'),
+            status='CLOSED',
+            actual_return_percentage=Decimal(actual_return),
+            closed_at=timezone.now() - timedelta(days=closed_days_ago),
+        )
+
+    def test_rollup_computes_each_window(self):
+        self._closed_call('INTRADAY', '4.00', 2)
+        self._closed_call('INTRADAY', '-2.00', 3)
+        self._closed_call('LONG_TERM', '10.00', 60)
+
+        written = rollup_broker_performance()
+
+        self.assertEqual(written, 8)  # 2 brokers x 4 windows
+        weekly = BrokerPerformanceMetrics.objects.get(broker=self.broker, window_days=7)
+        self.assertEqual(weekly.total_closed_calls, 2)
+        self.assertEqual(weekly.successful_calls, 1)
+        self.assertEqual(weekly.accuracy_percentage, Decimal('50.00'))
+        self.assertEqual(weekly.intraday_accuracy, Decimal('50.00'))
+        self.assertEqual(weekly.intraday_avg_return, Decimal('1.00'))
+        self.assertIsNone(weekly.longterm_accuracy)
+
+        quarterly = BrokerPerformanceMetrics.objects.get(broker=self.broker, window_days=90)
+        self.assertEqual(quarterly.total_closed_calls, 3)
+        self.assertEqual(quarterly.longterm_accuracy, Decimal('100.00'))
+
+        idle = BrokerPerformanceMetrics.objects.get(broker=self.idle_broker, window_days=30)
+        self.assertEqual(idle.total_closed_calls, 0)
+
+        self.broker.refresh_from_db()
+        self.assertEqual(self.broker.total_calls_closed, 3)
+        self.assertEqual(self.broker.total_calls_published, 3)
+
+    def test_broker_columns_are_lifetime(self):
+        self._closed_call('SWING', '5.00', 10)
+        self._closed_call('SWING', '-5.00', 500)
+
+        rollup_broker_performance()
+
+        yearly = BrokerPerformanceMetrics.objects.get(broker=self.broker, window_days=365)
+        self.assertEqual(yearly.total_closed_calls, 1)
+        self.broker.refresh_from_db()
+        self.assertEqual(self.broker.total_calls_closed, 2)
+        self.assertEqual(self.broker.total_calls_published, 2)
+        self.assertEqual(self.broker.overall_accuracy, Decimal('50.00'))
+        self.assertEqual(calculate_broker_accuracy(self.broker, days=None)['accuracy_percentage'], 50.0)
+
+    def test_rollup_upserts_same_day(self):
+        self._closed_call('SWING', '5.00', 1)
+        rollup_broker_performance()
+        self._closed_call('SWING', '-5.00', 1)
+        rollup_broker_performance()
+
+        self.assertEqual(BrokerPerformanceMetrics.objects.filter(broker=self.broker).count(), 4)
+        weekly = BrokerPerformanceMetrics.objects.get(broker=self.broker, window_days=7)
+        self.assertEqual(weekly.total_closed_calls, 2)
+        self.assertEqual(weekly.swing_accuracy, Decimal('50.00'))
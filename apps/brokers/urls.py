@@ -11,6 +11,7 @@ urlpatterns = [
     path('', views.BrokerListView.as_view(), name='broker-list'),
     path('<int:pk>/', views.BrokerDetailView.as_view(), name='broker-detail'),
     path('<int:pk>/metrics/', views.BrokerPerformanceMetricsView.as_view(), name='broker-metrics'),
+    path('<int:pk>/summary/', views.BrokerPerformanceSummaryView.as_view(), name='broker-summary'),
 
     # Admin endpoints
     path('admin/', views.AdminBrokerListCreateView.as_view(), name='admin-broker-list'),
@@ -3,7 +3,10 @@ Views for the brokers app.
 Public: List and detail of active brokers.
 Admin: Full CRUD and performance metrics.
 """
+from django.shortcuts import get_object_or_404
 from rest_framework import generics, permissions, filters
+from rest_framework.response import Response
+from rest_framework.views import APIView
 from django_filters.rest_framework import DjangoFilterBackend
 from apps.brokers.models import Broker, BrokerPerformanceMetrics
 from apps.brokers.serializers import (
@@ -53,18 +56,40 @@ class BrokerDetailView(generics.RetrieveAPIView):
 
 class BrokerPerformanceMetricsView(generics.ListAPIView):
     """
-    GET /api/brokers/<pk>/metrics/
-    Performance metrics history for a broker (authenticated users only).
+    GET /api/brokers/<pk>/metrics/?window=30
+    Precomputed performance metrics history for a broker (authenticated users only).
+    `window` selects the rollup window in days (7, 30, 90 or 365; default 30).
     """
     serializer_class = BrokerPerformanceMetricsSerializer
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
+        window = self.request.query_params.get('window', '30')
+        valid_windows = {str(days) for days, _ in BrokerPerformanceMetrics.WINDOW_CHOICES}
+        if window not in valid_windows:
+            window = '30'
         return BrokerPerformanceMetrics.objects.filter(
-            broker_id=self.kwargs['pk']
+            broker_id=self.kwargs['pk'],
+            window_days=int(window),
         ).order_by('-metric_date')[:30]  # Last 30 records
 
 
+class BrokerPerformanceSummaryView(APIView):
+    """
+    GET /api/brokers/<pk>/summary/
+    Closed-call performance summary for a broker: totals, win rate,
+    average/best/worst return and accuracy by call type and instrument.
+    """
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request, pk):
+        from apps.research_calls.services import get_closed_call_summary
+
+        broker = get_object_or_404(Broker, pk=pk, is_active=True)
+        summary = get_closed_call_summary(broker_id=broker.pk)
+        return Response({'broker': broker.pk, **summary})
+
+
 # ─── Admin CRUD Views ───────────────────────────────────────────────────────
 
 class AdminBrokerListCreateView(generics.ListCreateAPIView):
@@ -0,0 +1,452 @@
+"""
+Keyset (cursor) pagination for newest-first listings
+
+Pages are fetched with a "seek" condition on (sort_field, id) instead of
+OFFSET, so page N costs the same as page 1 and walks the composite
+(status, published_at) style indexes directly. Cursors are opaque,
+URL-safe tokens carrying the last row's sort key. List totals come from
+cached, capped or statistics-based counts instead of a COUNT(*) per page.
+"""
+import base64
+import hashlib
+import json
+
+from django.core.cache import cache
+from django.core.exceptions import BadRequest
+from django.db import connection
+from django.db.models import F, Q
+from django.http import JsonResponse
+from django.template.loader import render_to_string
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ParseError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+DEFAULT_PAGE_SIZE = 24
+MAX_PAGE_SIZE = 100
+COUNT_CACHE_TTL = 120  # 2 min
+ESTIMATE_COUNT_THRESHOLD = 10000
+
+
+class InvalidCursor(ValueError):
+    """Raised when a cursor token cannot be decoded"""
+
+
+class KeysetPage:
+    """One page of a keyset-paginated queryset"""
+
+    def __init__(self, items, next_cursor=None, previous_cursor=None):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+
+def encode_cursor(value, pk):
+    """Encode a (sort value, id) pair as an opaque cursor token"""
+    if hasattr(value, 'isoformat'):
+        value = value.isoformat()
+    payload = json.dumps([value, pk], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """
+    Decode a cursor token back into a (sort value, id) pair
+
+    Raises:
+        InvalidCursor: If the token is malformed
+    """
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        value, pk = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        pk = int(pk)
+    except (ValueError, TypeError):
+        raise InvalidCursor(f'Invalid cursor: {token}')
+    if isinstance(value, str):
+        parsed = parse_datetime(value)
+        if parsed is None:
+            raise InvalidCursor(f'Invalid cursor: {token}')
+        value = parsed
+    return value, pk
+
+
+def get_page_size(request, default=DEFAULT_PAGE_SIZE):
+    """Read ?page_size= from the request, clamped to MAX_PAGE_SIZE"""
+    try:
+        size = int(request.GET.get('page_size', default))
+    except (TypeError, ValueError):
+        return default
+    return max(1, min(size, MAX_PAGE_SIZE))
+
+
+def paginate_keyset(queryset, cursor=None, page_size=DEFAULT_PAGE_SIZE, field='published_at'):
+    """
+    Return the page of rows after a cursor, newest first
+
+    Rows are ordered by (field DESC, id DESC). Rows with a NULL sort field
+    are left out so the ordering stays index-friendly on every backend.
+
+    Args:
+        queryset: QuerySet to paginate (its own ordering is replaced)
+        cursor: Cursor token from the previous page (None for the first page)
+        page_size: Rows per page
+        field: Non-unique sort field, tie-broken by id
+
+    Returns:
+        KeysetPage: Items plus the cursor of the next page (None on the last page)
+
+    Raises:
+        InvalidCursor: If the cursor is malformed
+    """
+    queryset = queryset.filter(**{f'{field}__isnull': False}).order_by(f'-{field}', '-id')
+    if cursor:
+        value, pk = decode_cursor(cursor)
+        queryset = queryset.filter(Q(**{f'{field}__lt': value}) | Q(**{field: value, 'id__lt': pk}))
+
+    # One extra row tells us whether another page exists without a COUNT
+    rows = list(queryset[:page_size + 1])
+    items = rows[:page_size]
+    next_cursor = None
+    if len(rows) > page_size:
+        last = items[-1]
+        next_cursor = encode_cursor(getattr(last, field), last.pk)
+    previous_cursor = None
+    if cursor and items:
+        previous_cursor = encode_cursor(getattr(items[0], field), items[0].pk)
+    return KeysetPage(items, next_cursor, previous_cursor)
+
+
+def paginate_keyset_before(queryset, cursor, page_size=DEFAULT_PAGE_SIZE, field='published_at'):
+    """
+    Return the page of rows before a cursor (the newer rows), newest first
+
+    The seek runs in ascending order from the cursor and the page is
+    reversed, so stepping back costs the same as stepping forward.
+
+    Args:
+        queryset: QuerySet to paginate (its own ordering is replaced)
+        cursor: previous_cursor of the page being left
+        page_size: Rows per page
+        field: Non-unique sort field, tie-broken by id
+
+    Returns:
+        KeysetPage: Items plus the cursors of the neighbouring pages
+
+    Raises:
+        InvalidCursor: If the cursor is malformed
+    """
+    value, pk = decode_cursor(cursor)
+    queryset = queryset.filter(**{f'{field}__isnull': False}).order_by(field, 'id').filter(
+        Q(**{f'{field}__gt': value}) | Q(**{field: value, 'id__gt': pk})
+    )
+
+    rows = list(queryset[:page_size + 1])
+    items = rows[:page_size][::-1]
+    if not items:
+        return KeysetPage([])
+    first, last = items[0], items[-1]
+    previous_cursor = encode_cursor(getattr(first, field), first.pk) if len(rows) > page_size else None
+    return KeysetPage(items, encode_cursor(getattr(last, field), last.pk), previous_cursor)
+
+
+RANK_FIELDS = ('symbol_rank', 'text_rank')
+
+
+def encode_ranked_cursor(row, field):
+    """Encode a ranked row's full sort key (ranks, sort field, id) as a cursor token"""
+    value = getattr(row, field)
+    if hasattr(value, 'isoformat'):
+        value = value.isoformat()
+    payload = [*(getattr(row, rank) for rank in RANK_FIELDS), value, row.pk]
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(',', ':')).encode()).decode().rstrip('=')
+
+
+def decode_ranked_cursor(token):
+    """
+    Decode a ranked cursor token into (symbol_rank, text_rank, sort value, id)
+
+    Raises:
+        InvalidCursor: If the token is malformed
+    """
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        symbol_rank, text_rank, value, pk = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        symbol_rank, text_rank, pk = int(symbol_rank), float(text_rank), int(pk)
+    except (ValueError, TypeError):
+        raise InvalidCursor(f'Invalid cursor: {token}')
+    if value is not None:
+        value = parse_datetime(value) if isinstance(value, str) else None
+        if value is None:
+            raise InvalidCursor(f'Invalid cursor: {token}')
+    return symbol_rank, text_rank, value, pk
+
+
+def _ranked_seek(cursor, field, after):
+    """Rows after (or before) a ranked cursor in (ranks DESC, field DESC NULLS LAST, id DESC) order"""
+    symbol_rank, text_rank, value, pk = decode_ranked_cursor(cursor)
+    op = 'lt' if after else 'gt'
+    if value is None:
+        # NULL sort values come last, ordered by id
+        tail = Q(**{f'{field}__isnull': True, f'id__{op}': pk})
+        if not after:
+            tail |= Q(**{f'{field}__isnull': False})
+    else:
+        tail = Q(**{f'{field}__{op}': value}) | Q(**{field: value, f'id__{op}': pk})
+        if after:
+            tail |= Q(**{f'{field}__isnull': True})
+    return (
+        Q(**{f'symbol_rank__{op}': symbol_rank})
+        | Q(symbol_rank=symbol_rank, **{f'text_rank__{op}': text_rank})
+        | (Q(symbol_rank=symbol_rank, text_rank=text_rank) & tail)
+    )
+
+
+def paginate_ranked(queryset, cursor=None, page_size=DEFAULT_PAGE_SIZE, field='published_at', before=None):
+    """
+    Page relevance-ranked search results, best matches first
+
+    The queryset must be annotated with symbol_rank and text_rank (see
+    apps.research_calls.search.search_calls). Pages seek on the whole
+    ranking key (symbol_rank, text_rank, field, id), so every match is
+    reachable, not just the first page.
+
+    Args:
+        queryset: Ranked queryset (its own ordering is replaced)
+        cursor: next_cursor of the previous page (None for the first page)
+        page_size: Rows per page
+        field: Sort field after the ranks, tie-broken by id
+        before: previous_cursor of the page being left, to step back instead
+
+    Returns:
+        KeysetPage: Items plus the cursors of the neighbouring pages
+
+    Raises:
+        InvalidCursor: If a cursor is malformed
+    """
+    if before:
+        queryset = queryset.order_by(*RANK_FIELDS, F(field).asc(nulls_first=True), 'id').filter(
+            _ranked_seek(before, field, after=False)
+        )
+        rows = list(queryset[:page_size + 1])
+        items = rows[:page_size][::-1]
+        if not items:
+            return KeysetPage([])
+        previous_cursor = encode_ranked_cursor(items[0], field) if len(rows) > page_size else None
+        return KeysetPage(items, encode_ranked_cursor(items[-1], field), previous_cursor)
+
+    queryset = queryset.order_by(*(f'-{rank}' for rank in RANK_FIELDS), F(field).desc(nulls_last=True), '-id')
+    if cursor:
+        queryset = queryset.filter(_ranked_seek(cursor, field, after=True))
+    rows = list(queryset[:page_size + 1])
+    items = rows[:page_size]
+    next_cursor = encode_ranked_cursor(items[-1], field) if len(rows) > page_size else None
+    previous_cursor = encode_ranked_cursor(items[0], field) if cursor and items else None
+    return KeysetPage(items, next_cursor, previous_cursor)
+
+
+def paginate_request(request, queryset, ranked=False, field='published_at'):
+    """
+    Page a queryset from the request's ?cursor= and ?page_size= parameters
+
+    Args:
+        request: HttpRequest
+        queryset: QuerySet to paginate
+        ranked: Page a relevance-ranked search queryset on its ranking key
+        field: Sort field for keyset pagination
+
+    Returns:
+        KeysetPage
+
+    Raises:
+        BadRequest: If the cursor is malformed
+    """
+    page_size = get_page_size(request)
+    cursor = request.GET.get('cursor')
+    try:
+        if ranked:
+            return paginate_ranked(queryset, cursor, page_size, field)
+        return paginate_keyset(queryset, cursor, page_size, field)
+    except InvalidCursor as e:
+        raise BadRequest(str(e))
+
+
+class KeysetPagination(BasePagination):
+    """
+    DRF pagination over paginate_keyset
+
+    Responses carry {'next', 'next_cursor', 'results'} and no total count.
+    Subclasses set `field` (the newest-first sort field) and `page_size`.
+    """
+    field = 'published_at'
+    page_size = DEFAULT_PAGE_SIZE
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        try:
+            self.page = paginate_keyset(
+                queryset,
+                request.query_params.get('cursor'),
+                get_page_size(request, self.page_size),
+                self.field,
+            )
+        except InvalidCursor as e:
+            raise ParseError(str(e))
+        return self.page.items
+
+    def get_next_link(self):
+        if not self.page.has_next:
+            return None
+        return replace_query_param(self.request.build_absolute_uri(), 'cursor', self.page.next_cursor)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'next_cursor': self.page.next_cursor,
+            'results': data,
+        })
+
+
+def cached_count(queryset, timeout=COUNT_CACHE_TTL):
+    """
+    COUNT(*) for a queryset, cached by its SQL
+
+    Totals on list pages only need to be roughly current, so the same
+    filter combination is counted at most once per timeout.
+
+    Args:
+        queryset: QuerySet to count
+        timeout: Cache timeout in seconds
+
+    Returns:
+        int: Row count
+    """
+    sql = str(queryset.order_by().query)
+    cache_key = f'keyset_count:{hashlib.md5(sql.encode()).hexdigest()}'
+    count = cache.get(cache_key)
+    if count is None:
+        count = queryset.count()
+        cache.set(cache_key, count, timeout)
+    return count
+
+
+class EstimatedCount:
+    """A list total that may be estimated (~N) or capped (N+)"""
+
+    def __init__(self, count, estimated=False, capped=False):
+        self.count = count
+        self.estimated = estimated
+        self.capped = capped
+
+    def __int__(self):
+        return self.count
+
+    def __str__(self):
+        if self.capped:
+            return f'{self.count:,}+'
+        if self.estimated:
+            return f'~{self.count:,}'
+        return f'{self.count:,}'
+
+
+def table_row_estimate(model):
+    """
+    Row count of a model's table from the database statistics
+
+    Returns:
+        int: Estimated rows, or None on backends without cheap statistics
+    """
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'mysql':
+            cursor.execute(
+                'SELECT TABLE_ROWS FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s',
+                [table],
+            )
+        elif connection.vendor == 'postgresql':
+            cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE relname = %s', [table])
+        else:
+            return None
+        row = cursor.fetchone()
+    if not row or row[0] is None or row[0] < 0:
+        return None
+    return int(row[0])
+
+
+def estimated_count(queryset, threshold=ESTIMATE_COUNT_THRESHOLD, timeout=COUNT_CACHE_TTL):
+    """
+    Total for a list page without an unbounded COUNT(*)
+
+    Unfiltered querysets over large tables report the table statistics.
+    Everything else is counted up to `threshold` rows (a COUNT over a
+    LIMIT subquery, cached by SQL), and reported as "threshold+" past it.
+
+    Args:
+        queryset: QuerySet being listed
+        threshold: Rows above which totals are estimated or capped
+        timeout: Cache timeout of counted totals
+
+    Returns:
+        EstimatedCount
+    """
+    queryset = queryset.order_by()
+    if not queryset.query.where:
+        estimate = table_row_estimate(queryset.model)
+        if estimate is not None and estimate > threshold:
+            return EstimatedCount(estimate, estimated=True)
+
+    sql = str(queryset.query)
+    cache_key = f'keyset_count:{threshold}:{hashlib.md5(sql.encode()).hexdigest()}'
+    count = cache.get(cache_key)
+    if count is None:
+        count = queryset.values('pk')[:threshold + 1].count()
+        cache.set(cache_key, count, timeout)
+    if count > threshold:
+        return EstimatedCount(threshold, capped=True)
+    return EstimatedCount(count)
+
+
+def wants_fragment(request):
+    """True when the request asks for the next page as a JSON fragment"""
+    return (
+        request.GET.get('format') == 'json'
+        or request.headers.get('x-requested-with') == 'XMLHttpRequest'
+    )
+
+
+def fragment_response(request, page, template_name, context=None, items_name='calls'):
+    """
+    Render a page of items with a partial template for infinite scroll
+
+    Args:
+        request: HttpRequest
+        page: KeysetPage to render
+        template_name: Partial template rendering just the items
+        context: Extra template context
+        items_name: Context name the partial loops over
+
+    Returns:
+        JsonResponse: {'html', 'next_cursor', 'has_next'}
+    """
+    context = dict(context or {})
+    context[items_name] = page.items
+    html = render_to_string(template_name, context, request=request)
+    return JsonResponse({
+        'html': html,
+        'next_cursor': page.next_cursor,
+        'has_next': page.has_next,
+    })
@@ -0,0 +1,35 @@
+"""
+Shared test fixtures
+"""
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+
+from apps.brokers.models import Broker
+from apps.research_calls.models import ResearchCall
+
+User = get_user_model()
+
+
+class AdminCallFixtureMixin:
+    """An analyst, a superuser and a broker, plus a research call factory"""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.analyst = User.objects.create_user(
+            email='fixture-analyst@example.com', first_name='Fixture', last_name='Analyst',
+            password='TestPass123!', role='ANALYST',
+        )
+        self.admin = User.objects.create_superuser(
+            email='fixture-admin@example.com', first_name='Admin', last_name='User', password='AdminPass123!',
+        )
+        self.broker = Broker.objects.create(name='Fixture Broker', slug='fixture-broker')
+
+    def _create_call(self, status='ACTIVE', **fields):
+        fields = {
+            'symbol': 'TCS', 'action': 'BUY', 'call_type': 'SHORT_TERM', 'entry_price': Decimal('3500.00'),
+            'target_1': Decimal('3700.00'), 'stop_loss': Decimal('3400.00'), 'timeframe_days': 30, **fields,
+        }
+        return ResearchCall.objects.create(created_by=self.analyst, broker=self.broker, status=status, **fields)
@@ -7,6 +7,8 @@ from django.http import JsonResponse
 from django.views import View
 from django.utils import timezone
 from django.core.cache import cache
+from apps.notifications.counters import get_unread_count
+from apps.research_calls.sentiment import get_sentiment, get_sentiment_breakdown
 
 logger = logging.getLogger(__name__)
 
@@ -16,7 +18,8 @@ class CustomerDashboardSummaryView(View):
     GET /api/dashboard/customer-summary/
     Returns counts-only KPI data for the customer dashboard.
     No external API calls. Uses .count() instead of loading rows.
-    Cached per-user for 60s.
+    Cached per-user for 60s; the unread count and sentiment are read from
+    their live counters. ?breakdown=1 adds sentiment per call type and sector.
     """
 
     def get(self, request):
@@ -25,18 +28,23 @@ class CustomerDashboardSummaryView(View):
 
         user = request.user
         cache_key = f'dashboard_summary:{user.pk}'
-        cached = cache.get(cache_key)
-        if cached:
-            return JsonResponse(cached)
-
-        data = self._build_summary(user)
-        cache.set(cache_key, data, 60)
+        data = cache.get(cache_key)
+        if not data:
+            data = self._build_summary(user)
+            cache.set(cache_key, data, 60)
+        data = {**data, 'unread_notifications': get_unread_count(user.pk)}
+        if request.GET.get('breakdown'):
+            breakdown = get_sentiment_breakdown()
+            data['sentiment'] = breakdown['overall']
+            data['sentiment_by_call_type'] = breakdown['by_call_type']
+            data['sentiment_by_sector'] = breakdown['by_sector']
+        else:
+            data['sentiment'] = get_sentiment()
         return JsonResponse(data)
 
     def _build_summary(self, user):
         from apps.portfolios.models import Portfolio, PortfolioItem
         from apps.research_calls.models import ResearchCall
-        from apps.notifications.models import Notification
 
         # Active portfolio positions (count only)
         active_positions = 0
@@ -58,20 +66,9 @@ class CustomerDashboardSummaryView(View):
             published_at__lt=day_end,
         ).count()
 
-        # Unread notifications (count only)
-        unread_count = Notification.objects.filter(
-            user=user, is_read=False
-        ).count()
-
-        # Sentiment (lightweight, counts only)
-        from services.recommendation_service import get_market_sentiment
-        sentiment = get_market_sentiment()
-
         return {
             'active_positions': active_positions,
             'today_calls_count': today_calls_count,
-            'unread_notifications': unread_count,
-            'sentiment': sentiment,
         }
 
 
@@ -0,0 +1,306 @@
+"""
+Recommendation engine - offline-scored top-N research calls per user
+
+A periodic task builds, in a handful of queries:
+- a sparse user x symbol/sector affinity matrix from watchlists and open
+  portfolio positions
+- symbol-symbol co-occurrence (cosine over the users that follow both)
+- broker accuracy priors, shrunk towards 50% for brokers with few calls
+- recent portfolio additions per call (trending)
+
+Each user is scored only against the ACTIVE calls that match their
+symbols, their sectors or symbols co-occurring with theirs (looked up in
+symbol and sector indexes), plus the best calls by user-independent score,
+which are the only others that can reach their top-N. The top
+RECOMMENDATIONS_TOP_N are written to the cache in batches as they are
+computed, as (call id, score, type, reason) tuples, next to a global
+ranking for users without history. Each recommended call is cached under
+its own key, so serving reads the user's list and then only the calls
+it shows.
+"""
+import math
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db.models import Count
+from django.utils import timezone
+
+RECOMMENDATIONS_TOP_N = 20
+RECOMMENDATIONS_TTL = 3 * 3600  # outlives a few missed runs of the periodic task
+GLOBAL_KEY = 'recommendations:global'
+WRITE_BATCH_SIZE = 500
+
+# Affinity per followed call, by source
+WATCHLIST_WEIGHT = 1.0
+PORTFOLIO_WEIGHT = 2.0
+
+# Score components
+SYMBOL_WEIGHT = 3.0
+SECTOR_WEIGHT = 1.5
+CO_OCCURRENCE_WEIGHT = 2.0
+BROKER_PRIOR_WEIGHT = 1.0
+TRENDING_WEIGHT = 0.5
+
+PRIOR_STRENGTH = 10  # calls' worth of a 50% prior in each broker's accuracy
+TRENDING_DAYS = 7
+MAX_USER_SYMBOLS = 50  # bounds the co-occurrence pairs a single user adds
+
+
+def user_key(user_id):
+    return f'recommendations:user:{user_id}'
+
+
+def call_key(call_id):
+    return f'recommendations:call:{call_id}'
+
+
+def broker_priors():
+    """
+    Accuracy of each active broker as a 0-1 prior
+
+    Returns:
+        dict: broker id -> (prior, broker name, overall accuracy)
+    """
+    from apps.brokers.models import Broker
+
+    priors = {}
+    for broker_id, name, accuracy, published in Broker.objects.filter(is_active=True).values_list(
+        'id', 'name', 'overall_accuracy', 'total_calls_published',
+    ):
+        accuracy = float(accuracy or 0)
+        prior = (accuracy * published + 50 * PRIOR_STRENGTH) / (published + PRIOR_STRENGTH) / 100
+        priors[broker_id] = (prior, name, accuracy)
+    return priors
+
+
+def build_affinities():
+    """
+    Sparse user x symbol/sector affinity matrix
+
+    Returns:
+        tuple: (affinities, followed) where affinities is user id ->
+            {('symbol' | 'sector', value): weight} and followed is user id ->
+            ids of the calls already in the user's watchlists or portfolios
+    """
+    from apps.portfolios.models import PortfolioItem
+    from apps.watchlists.models import WatchlistItem
+
+    affinities = defaultdict(Counter)
+    followed = defaultdict(set)
+    sources = (
+        (WatchlistItem.objects.filter(is_active=True).values_list(
+            'watchlist__user_id', 'research_call_id', 'research_call__symbol', 'research_call__sector',
+        ), WATCHLIST_WEIGHT),
+        (PortfolioItem.objects.filter(status='ACTIVE').values_list(
+            'portfolio__user_id', 'research_call_id', 'research_call__symbol', 'research_call__sector',
+        ), PORTFOLIO_WEIGHT),
+    )
+    for rows, weight in sources:
+        for user_id, call_id, symbol, sector in rows.iterator():
+            followed[user_id].add(call_id)
+            affinities[user_id][('symbol', symbol)] += weight
+            if sector:
+                affinities[user_id][('sector', sector)] += weight
+    return affinities, followed
+
+
+def build_co_occurrence(affinities):
+    """
+    Symbol-symbol similarity from users following both
+
+    Returns:
+        dict: symbol -> {other symbol: cosine similarity}
+    """
+    pair_counts = Counter()
+    symbol_counts = Counter()
+    for user_affinity in affinities.values():
+        symbols = sorted(
+            (value for kind, value in user_affinity if kind == 'symbol'),
+            key=lambda symbol: -user_affinity[('symbol', symbol)],
+        )[:MAX_USER_SYMBOLS]
+        symbol_counts.update(symbols)
+        for i, first in enumerate(symbols):
+            for second in symbols[i + 1:]:
+                pair_counts[(first, second)] += 1
+
+    similar = defaultdict(dict)
+    for (first, second), count in pair_counts.items():
+        similarity = count / math.sqrt(symbol_counts[first] * symbol_counts[second])
+        similar[first][second] = similarity
+        similar[second][first] = similarity
+    return similar
+
+
+def trending_scores():
+    """Recent portfolio additions per call, scaled to 0-1"""
+    from apps.portfolios.models import PortfolioItem
+
+    counts = dict(PortfolioItem.objects.filter(
+        created_at__gte=timezone.now() - timedelta(days=TRENDING_DAYS),
+    ).order_by().values('research_call').annotate(
+        total=Count('id'),
+    ).values_list('research_call', 'total'))
+    top = max(counts.values(), default=0)
+    return {call_id: count / top for call_id, count in counts.items()} if top else {}
+
+
+def _base_scores(candidates, priors, trending):
+    """Score and reason of each candidate that does not depend on the user"""
+    base = {}
+    for call in candidates:
+        prior, broker_name, accuracy = priors.get(call.broker_id, (0.5, call.broker.name, 0))
+        prior_score = BROKER_PRIOR_WEIGHT * prior
+        trend_score = TRENDING_WEIGHT * trending.get(call.id, 0)
+        if trend_score > prior_score:
+            reason = ('trending', 'Trending — popular among investors')
+        else:
+            reason = ('top_broker', f'From {broker_name} ({accuracy:g}% accuracy)')
+        base[call.id] = (prior_score + trend_score, max(prior_score, trend_score), *reason)
+    return base
+
+
+def _user_candidates(user_affinity, followed_ids, by_symbol, by_sector, similar, ranked):
+    """
+    Calls that can reach a user's top-N
+
+    A call matching none of the user's symbols, sectors or co-occurring
+    symbols scores its base score only, so beyond the matches only the
+    first TOP_N (plus the followed calls skipped) of the base ranking count.
+    """
+    candidates = {}
+    for kind, value in user_affinity:
+        index = by_symbol if kind == 'symbol' else by_sector
+        for call in index.get(value, ()):
+            candidates[call.id] = call
+        if kind == 'symbol':
+            for other in similar.get(value, ()):
+                for call in by_symbol.get(other, ()):
+                    candidates[call.id] = call
+    for call in ranked[:RECOMMENDATIONS_TOP_N + len(followed_ids)]:
+        candidates[call.id] = call
+    return [call for call_id, call in candidates.items() if call_id not in followed_ids]
+
+
+def _score_user(user_affinity, candidates, base, similar):
+    """Top-N (call id, score, type, reason) of one user among their candidates"""
+    user_symbols = {value: weight for (kind, value), weight in user_affinity.items() if kind == 'symbol'}
+    total = sum(user_affinity.values()) or 1
+
+    scored = []
+    for call in candidates:
+        score, best, kind, reason = base[call.id]
+
+        symbol_score = SYMBOL_WEIGHT * user_affinity.get(('symbol', call.symbol), 0) / total
+        sector_score = SECTOR_WEIGHT * user_affinity.get(('sector', call.sector), 0) / total if call.sector else 0
+        related = similar.get(call.symbol, {})
+        contributions = {
+            symbol: related[symbol] * weight for symbol, weight in user_symbols.items() if symbol in related
+        }
+        co_score = CO_OCCURRENCE_WEIGHT * sum(contributions.values()) / total
+
+        if symbol_score > best:
+            best, kind, reason = symbol_score, 'symbol_match', f'You follow {call.symbol}'
+        if sector_score > best:
+            best, kind, reason = sector_score, 'sector_match', f'In your preferred sector: {call.sector}'
+        if co_score > best:
+            co_symbol = max(contributions, key=contributions.get)
+            kind, reason = 'similar', f'Followed by investors who track {co_symbol}'
+        scored.append((call.id, round(score + symbol_score + sector_score + co_score, 4), kind, reason))
+
+    scored.sort(key=lambda entry: (-entry[1], -entry[0]))
+    return scored[:RECOMMENDATIONS_TOP_N]
+
+
+def _write_batch(entries, calls, written_call_ids):
+    """Cache a batch of top-N lists, after the calls they point at"""
+    call_ids = {call_id for top in entries.values() for call_id, *_ in top} - written_call_ids
+    # Calls go first so no list points at a call missing from the cache
+    cache.set_many({call_key(call_id): calls[call_id] for call_id in call_ids}, RECOMMENDATIONS_TTL)
+    written_call_ids.update(call_ids)
+    cache.set_many(entries, RECOMMENDATIONS_TTL)
+
+
+def compute_recommendations():
+    """
+    Score the candidate ACTIVE calls of every user with history and cache the top-N
+
+    Returns:
+        int: Number of users with personal recommendations
+    """
+    from apps.research_calls.models import ResearchCall
+
+    calls = {call.id: call for call in ResearchCall.objects.filter(status='ACTIVE').select_related('broker')}
+    base = _base_scores(calls.values(), broker_priors(), trending_scores())
+    ranked = sorted(calls.values(), key=lambda call: (-base[call.id][0], -call.id))
+    global_top = [
+        (call.id, round(base[call.id][0], 4), base[call.id][2], base[call.id][3])
+        for call in ranked[:RECOMMENDATIONS_TOP_N]
+    ]
+
+    by_symbol = defaultdict(list)
+    by_sector = defaultdict(list)
+    for call in calls.values():
+        by_symbol[call.symbol].append(call)
+        if call.sector:
+            by_sector[call.sector].append(call)
+
+    affinities, followed = build_affinities()
+    similar = build_co_occurrence(affinities)
+
+    written_call_ids = set()
+    _write_batch({GLOBAL_KEY: global_top}, calls, written_call_ids)
+    batch = {}
+    for user_id, user_affinity in affinities.items():
+        candidates = _user_candidates(user_affinity, followed[user_id], by_symbol, by_sector, similar, ranked)
+        batch[user_key(user_id)] = _score_user(user_affinity, candidates, base, similar)
+        if len(batch) >= WRITE_BATCH_SIZE:
+            _write_batch(batch, calls, written_call_ids)
+            batch = {}
+    if batch:
+        _write_batch(batch, calls, written_call_ids)
+    return len(affinities)
+
+
+def _fallback_recommendations(limit):
+    """Cold cache: active calls of the most accurate brokers, one query"""
+    from apps.research_calls.models import ResearchCall
+
+    calls = ResearchCall.objects.filter(
+        status='ACTIVE',
+        broker__is_active=True,
+    ).select_related('broker').order_by('-broker__overall_accuracy', '-published_at')[:limit]
+    return [
+        {
+            'call': call,
+            'reason': f"From {call.broker.name} ({call.broker.overall_accuracy}% accuracy)",
+            'type': 'top_broker',
+            'score': float(call.broker.overall_accuracy or 0),
+        }
+        for call in calls
+    ]
+
+
+def get_recommendations(user, limit=6):
+    """
+    Precomputed recommendations of a user
+
+    Users without history get the global ranking; before the first run of
+    the periodic task, the top brokers' active calls.
+
+    Returns:
+        list: dicts with call, reason, type and score, best first
+    """
+    key = user_key(user.pk)
+    cached = cache.get_many([key, GLOBAL_KEY])
+    entries = cached.get(key, cached.get(GLOBAL_KEY))
+    if entries is None:
+        return _fallback_recommendations(limit)
+
+    entries = entries[:limit]
+    calls = cache.get_many([call_key(call_id) for call_id, *_ in entries])
+    return [
+        {'call': calls[call_key(call_id)], 'reason': reason, 'type': kind, 'score': score}
+        for call_id, score, kind, reason in entries
+        if call_key(call_id) in calls
+    ]
@@ -0,0 +1,38 @@
+"""
+Dashboard signals for dropping cached snapshot blocks
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from apps.brokers.models import Broker
+from apps.dashboard.snapshot import invalidate_market_block, invalidate_user_blocks
+from apps.portfolios.models import Portfolio, PortfolioItem
+from apps.research_calls.models import ResearchCall
+from apps.watchlists.models import Watchlist, WatchlistItem
+
+
+@receiver(post_save, sender=ResearchCall)
+@receiver(post_delete, sender=ResearchCall)
+@receiver(post_save, sender=Broker)
+def market_changed(sender, **kwargs):
+    """Calls and brokers feed the shared market block"""
+    invalidate_market_block()
+
+
+@receiver(post_save, sender=Portfolio)
+@receiver(post_delete, sender=Portfolio)
+@receiver(post_save, sender=Watchlist)
+@receiver(post_delete, sender=Watchlist)
+def owner_changed(sender, instance, **kwargs):
+    invalidate_user_blocks([instance.user_id])
+
+
+@receiver(post_save, sender=PortfolioItem)
+@receiver(post_delete, sender=PortfolioItem)
+def portfolio_item_changed(sender, instance, **kwargs):
+    invalidate_user_blocks(Portfolio.objects.filter(pk=instance.portfolio_id).values_list('user_id', flat=True))
+
+
+@receiver(post_save, sender=WatchlistItem)
+@receiver(post_delete, sender=WatchlistItem)
+def watchlist_item_changed(sender, instance, **kwargs):
+    invalidate_user_blocks(Watchlist.objects.filter(pk=instance.watchlist_id).values_list('user_id', flat=True))
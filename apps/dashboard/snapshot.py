@@ -0,0 +1,108 @@
+"""
+Customer dashboard snapshot - the dashboard's context from two cached blocks
+
+The market block (today's calls, broker leaderboard, sentiment) is the
+same for every customer and is built once per MARKET_BLOCK_TTL. The user
+block (portfolio totals, watchlist, recommendations) is built per user
+and dropped by portfolio, watchlist and position-alert events (see
+apps.dashboard.signals). A warm dashboard is one get_many round trip.
+"""
+from django.core.cache import cache
+from django.utils import timezone
+
+MARKET_BLOCK_KEY = 'dashboard:market'
+MARKET_BLOCK_TTL = 60  # today's calls and sentiment; also dropped when a call or broker changes
+USER_BLOCK_TTL = 300  # bounds staleness of the mark-to-market totals (bulk updates send no signals)
+TODAY_CALLS_LIMIT = 8
+TOP_BROKERS_LIMIT = 4
+WATCHLIST_LIMIT = 5
+RECOMMENDATIONS_LIMIT = 6
+
+
+def user_block_key(user_id):
+    return f'dashboard:user:{user_id}'
+
+
+def build_market_block():
+    """Market-wide part of the dashboard"""
+    from apps.brokers.models import Broker
+    from apps.research_calls.models import ResearchCall
+    from services.recommendation_service import get_market_sentiment
+
+    now = timezone.localtime()
+    day_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    day_end = day_start + timezone.timedelta(days=1)
+    today_calls = ResearchCall.objects.filter(
+        status='ACTIVE',
+        published_at__gte=day_start,
+        published_at__lt=day_end,
+    ).select_related('broker', 'created_by').order_by('-published_at')[:TODAY_CALLS_LIMIT]
+
+    # Leaderboard reads the denormalized columns kept by the nightly rollup
+    top_brokers = Broker.objects.filter(
+        total_calls_published__gt=0,
+    ).order_by('-overall_accuracy')[:TOP_BROKERS_LIMIT]
+
+    return {
+        'today_calls': list(today_calls),
+        'top_brokers': list(top_brokers),
+        'sentiment': get_market_sentiment(),
+    }
+
+
+def build_user_block(user):
+    """Per-user part of the dashboard"""
+    from apps.portfolios.models import Portfolio
+    from apps.watchlists.models import WatchlistItem
+    from services.recommendation_service import get_user_recommendations
+
+    # active_positions is kept on Portfolio, so no COUNT over the items
+    portfolio = Portfolio.objects.filter(user=user).order_by('id').first()
+    watchlist_items = WatchlistItem.objects.filter(
+        watchlist__user=user,
+    ).select_related('research_call')[:WATCHLIST_LIMIT]
+
+    return {
+        'portfolio': portfolio,
+        'active_items_count': portfolio.active_positions if portfolio else 0,
+        'watchlist_items': list(watchlist_items),
+        'recommendations': get_user_recommendations(user, limit=RECOMMENDATIONS_LIMIT),
+    }
+
+
+def get_dashboard_snapshot(user):
+    """
+    Template context of the customer dashboard
+
+    Both blocks are read with one get_many; only the missing ones are built.
+
+    Args:
+        user: Customer
+
+    Returns:
+        dict: today_calls, top_brokers, sentiment, portfolio,
+            active_items_count, watchlist_items and recommendations
+    """
+    user_key = user_block_key(user.pk)
+    blocks = cache.get_many([MARKET_BLOCK_KEY, user_key])
+
+    market = blocks.get(MARKET_BLOCK_KEY)
+    if market is None:
+        market = build_market_block()
+        cache.set(MARKET_BLOCK_KEY, market, MARKET_BLOCK_TTL)
+
+    personal = blocks.get(user_key)
+    if personal is None:
+        personal = build_user_block(user)
+        cache.set(user_key, personal, USER_BLOCK_TTL)
+
+    return {**market, **personal}
+
+
+def invalidate_market_block():
+    cache.delete(MARKET_BLOCK_KEY)
+
+
+def invalidate_user_blocks(user_ids):
+    """Drop the per-user blocks of the given users"""
+    cache.delete_many([user_block_key(user_id) for user_id in user_ids])
@@ -0,0 +1,22 @@
+"""
+Celery tasks for the customer dashboard
+"""
+from celery import shared_task
+import logging
+
+from apps.dashboard.recommendations import compute_recommendations
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def task_compute_recommendations():
+    """Score and cache the top-N recommended calls of every user"""
+    logger.info("Executing periodic task: task_compute_recommendations")
+    try:
+        users = compute_recommendations()
+        logger.info(f"Computed recommendations for {users} users")
+        return users
+    except Exception as e:
+        logger.error(f"Error in task_compute_recommendations: {e}")
+        return 0
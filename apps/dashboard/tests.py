@@ -0,0 +1,112 @@
+"""
+Tests for the customer dashboard and recommendations
+"""
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+
+from apps.brokers.models import Broker
+from apps.dashboard.recommendations import compute_recommendations
+from apps.portfolios.services import add_to_portfolio
+from apps.research_calls.models import ResearchCall
+from apps.watchlists.models import Watchlist, WatchlistItem
+from services.recommendation_service import get_user_recommendations
+
+User = get_user_model()
+
+
+class DashboardSnapshotTest(TestCase):
+    """Test the cached customer dashboard snapshot"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            email='dashboard@example.com', first_name='Test', last_name='Customer',
+            password='TestPass123!', role='CUSTOMER',
+        )
+        analyst = User.objects.create_user(
+            email='dashboard-analyst@example.com', first_name='Analyst', last_name='User',
+            password='TestPass123!', role='ANALYST',
+        )
+        broker = Broker.objects.create(name='Dashboard Broker', slug='dashboard-broker')
+        self.call = ResearchCall.objects.create(
+            symbol='TCS', created_by=analyst, broker=broker, action='BUY', call_type='SHORT_TERM',
+            entry_price=Decimal('3500.00'), target_1=Decimal('3700.00'), stop_loss=Decimal('3400.00'),
+            timeframe_days=30, status='ACTIVE',
+        )
+
+    def test_warm_dashboard_skips_the_database(self):
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get('/app/').status_code, 200)
+
+        # Only the session, user and subscription lookups remain
+        with self.assertNumQueries(3):
+            response = self.client.get('/app/')
+        self.assertEqual(list(response.context['today_calls']), [])
+        self.assertEqual(response.context['active_items_count'], 0)
+
+    def test_position_change_drops_user_block(self):
+        self.client.force_login(self.user)
+        self.client.get('/app/')
+
+        add_to_portfolio(user=self.user, research_call=self.call, entry_price=Decimal('3500.00'), quantity=10)
+        response = self.client.get('/app/')
+        self.assertEqual(response.context['active_items_count'], 1)
+        self.assertEqual(response.context['portfolio'].active_positions, 1)
+
+
+class RecommendationEngineTest(TestCase):
+    """Test the offline-scored recommendations"""
+
+    def setUp(self):
+        cache.clear()
+        analyst = User.objects.create_user(
+            email='reco-analyst@example.com', first_name='Analyst', last_name='User',
+            password='TestPass123!', role='ANALYST',
+        )
+        self.broker = Broker.objects.create(name='Reco Broker', slug='reco-broker')
+        self.calls = {
+            symbol: ResearchCall.objects.create(
+                symbol=symbol, sector=sector, created_by=analyst, broker=self.broker, action='BUY',
+                call_type='SHORT_TERM', entry_price=Decimal('100.00'), target_1=Decimal('110.00'),
+                stop_loss=Decimal('95.00'), timeframe_days=30, status='ACTIVE',
+            )
+            for symbol, sector in (('TCS', 'IT'), ('INFY', 'IT'), ('HDFCBANK', 'Banking'))
+        }
+        self.investor = self._customer('reco-investor@example.com')
+        self.follower = self._customer('reco-follower@example.com')
+        for symbol in ('TCS', 'INFY'):
+            add_to_portfolio(
+                user=self.investor, research_call=self.calls[symbol], entry_price=Decimal('100.00'), quantity=1,
+            )
+        watchlist = Watchlist.objects.create(user=self.follower)
+        WatchlistItem.objects.create(watchlist=watchlist, research_call=self.calls['TCS'])
+
+    def _customer(self, email):
+        return User.objects.create_user(
+            email=email, first_name='Test', last_name='Customer', password='TestPass123!', role='CUSTOMER',
+        )
+
+    def test_scores_similar_calls_and_serves_from_cache(self):
+        self.assertEqual(compute_recommendations(), 2)
+
+        with self.assertNumQueries(0):
+            recommendations = get_user_recommendations(self.follower)
+        symbols = [rec['call'].symbol for rec in recommendations]
+        # Already-followed calls are left out; the same-sector peer ranks first
+        self.assertEqual(symbols, ['INFY', 'HDFCBANK'])
+        self.assertEqual(recommendations[0]['type'], 'sector_match')
+        self.assertEqual([rec['call'].symbol for rec in get_user_recommendations(self.follower, limit=1)], ['INFY'])
+
+        newcomer = self._customer('reco-new@example.com')
+        with self.assertNumQueries(0):
+            cold = get_user_recommendations(newcomer)
+        self.assertEqual(len(cold), 3)
+
+    def test_cold_cache_falls_back_to_top_brokers(self):
+        with self.assertNumQueries(1):
+            recommendations = get_user_recommendations(self.follower, limit=2)
+        self.assertEqual(len(recommendations), 2)
+        self.assertEqual(recommendations[0]['type'], 'top_broker')
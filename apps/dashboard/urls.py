@@ -15,6 +15,7 @@ urlpatterns = [
 
     # New market sections
     path('sip/', views.sip_view, name='sip'),
+    path('sip/projection/', views.sip_projection_view, name='sip_projection'),
     path('mutual-funds/', views.mutual_funds_view, name='mutual_funds'),
     path('etf/', views.etf_view, name='etf'),
     path('bonds/', views.bonds_view, name='bonds'),
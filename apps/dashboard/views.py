@@ -2,12 +2,13 @@
 Views for dashboard and home page — powered by live market data services
 """
 from django.shortcuts import render, redirect
+from django.http import JsonResponse
 from django.contrib.auth.decorators import login_required
-from django.db.models import Count, Avg, Q
-from django.utils import timezone
+from django.db.models import Avg, Q
 
 from apps.research_calls.models import ResearchCall
 from apps.brokers.models import Broker
+from apps.core.pagination import fragment_response, paginate_request, wants_fragment
 
 
 def landing_page_view(request):
@@ -39,54 +40,9 @@ def dashboard_home_view(request):
     # If user hits /app/ directly, ensure they are logged in (handled by decorator)
     
     if request.user.role == 'CUSTOMER':
-        from apps.portfolios.models import Portfolio, PortfolioItem
-        from services.recommendation_service import get_user_recommendations, get_market_sentiment
-
-        now = timezone.localtime()
-        day_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-        day_end = day_start + timezone.timedelta(days=1)
-        today_calls = ResearchCall.objects.filter(
-            status='ACTIVE',
-            published_at__gte=day_start,
-            published_at__lt=day_end,
-        ).select_related('broker', 'created_by').order_by('-published_at')[:8]
-
-        try:
-            portfolio = Portfolio.objects.get(user=request.user)
-            active_items_count = PortfolioItem.objects.filter(
-                portfolio=portfolio, status='ACTIVE'
-            ).count()
-        except Portfolio.DoesNotExist:
-            portfolio = None
-            active_items_count = 0
-
-        top_brokers = Broker.objects.annotate(
-            total_calls=Count('research_calls'),
-        ).filter(total_calls__gt=0).order_by('-overall_accuracy')[:4]
-
-        # Recommendations
-        recommendations = get_user_recommendations(request.user, limit=6)
-        sentiment = get_market_sentiment()
-        
-        # Watchlist
-        from apps.watchlists.models import Watchlist, WatchlistItem
-        try:
-            watchlist = Watchlist.objects.get(user=request.user)
-            watchlist_items = WatchlistItem.objects.filter(
-                watchlist=watchlist
-            ).select_related('research_call')[:5]
-        except Watchlist.DoesNotExist:
-            watchlist_items = []
-
-        context = {
-            'today_calls': today_calls,
-            'portfolio': portfolio,
-            'active_items_count': active_items_count,
-            'top_brokers': top_brokers,
-            'recommendations': recommendations,
-            'sentiment': sentiment,
-            'watchlist_items': watchlist_items,
-        }
+        from apps.dashboard.snapshot import get_dashboard_snapshot
+
+        context = get_dashboard_snapshot(request.user)
         return render(request, 'dashboard/customer_dashboard.html', context)
     elif request.user.role == 'ADMIN':
         # Redirect to admin panel which uses AdminDashboardView with full stats context
@@ -151,6 +107,23 @@ def sip_view(request):
     return render(request, 'markets/sip.html', context)
 
 
+def sip_projection_view(request):
+    """Monte Carlo SIP calculator (JSON): ?fund=<index>&amount=&years="""
+    from services.sip_mf_etf_service import get_top_sip_funds
+    from services.projection_service import get_sip_projection
+
+    funds = get_top_sip_funds()
+    try:
+        fund = funds[int(request.GET.get('fund', 0))]
+        amount = float(request.GET.get('amount', fund['min_sip']))
+        years = int(request.GET.get('years', 10))
+        projection = get_sip_projection(fund, amount, years)
+    except (IndexError, ValueError) as e:
+        return JsonResponse({'error': str(e) or 'Invalid parameters'}, status=400)
+
+    return JsonResponse({'fund': fund['name'], **projection})
+
+
 def mutual_funds_view(request):
     """Mutual Funds section"""
     from services.sip_mf_etf_service import get_top_mutual_funds
@@ -209,11 +182,15 @@ def trades_dashboard_view(request):
     elif tab == 'intraday':
         calls = calls.filter(call_type='INTRADAY')
 
-    calls = calls.order_by('-published_at')
+    page = paginate_request(request, calls)
+    if wants_fragment(request):
+        return fragment_response(request, page, 'trades/partials/trade_rows.html')
+
     brokers = Broker.objects.filter(is_active=True)
 
     context = {
-        'calls': calls,
+        'calls': page.items,
+        'next_cursor': page.next_cursor,
         'brokers': brokers,
         'active_tab': tab,
     }
@@ -256,10 +233,10 @@ def recently_listed_view(request):
 
 
 def top_brokers_view(request):
-    """Top Performing Brokers by accuracy"""
-    top_brokers = Broker.objects.annotate(
-        total_calls=Count('research_calls'),
-    ).filter(total_calls__gt=0).order_by('-overall_accuracy')[:20]
+    """Top Performing Brokers by accuracy (precomputed by the nightly rollup)"""
+    top_brokers = Broker.objects.filter(
+        total_calls_published__gt=0,
+    ).order_by('-overall_accuracy')[:20]
     context = {
         'top_brokers': top_brokers,
     }
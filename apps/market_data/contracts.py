@@ -0,0 +1,317 @@
+"""
+Derivatives contract master - trading symbol parsing and bulk loading
+
+Trading symbols follow the exchange conventions:
+    NIFTY24JUNFUT          monthly future
+    NIFTY24JUN23500CE      monthly option
+    NIFTY2461323500CE      weekly option (yy, month 1-9/O/N/D, dd)
+    GOLD24AUGFUT           MCX commodity future
+
+The contract file is the exchange/broker instruments dump (CSV); any file
+with the same columns can stand in for it locally.
+"""
+import calendar
+import csv
+import io
+import re
+from datetime import date, datetime, timedelta
+from decimal import Decimal, InvalidOperation
+
+from django.db import connection
+
+from apps.market_data.models import DerivativeContract
+
+CONTRACT_LOAD_CHUNK_SIZE = 1000
+
+COMMODITY_EXCHANGES = ('MCX', 'NCDEX')
+
+# NSE monthly contracts expire on the last Thursday of the month
+MONTHLY_EXPIRY_WEEKDAY = 3
+
+MONTHS = {name.upper(): number for number, name in enumerate(calendar.month_abbr) if name}
+WEEKLY_MONTHS = {**{str(number): number for number in range(1, 10)}, 'O': 10, 'N': 11, 'D': 12}
+
+MONTHLY_RE = re.compile(
+    r'^(?P<underlying>[A-Z][A-Z0-9&-]*?)(?P<year>\d{2})(?P<month>' + '|'.join(MONTHS) + r')'
+    r'(?:(?P<strike>\d+(?:\.\d+)?)(?P<option_type>CE|PE)|FUT)$'
+)
+WEEKLY_RE = re.compile(
+    r'^(?P<underlying>[A-Z][A-Z&-]*?)(?P<year>\d{2})(?P<month>[1-9OND])(?P<day>\d{2})'
+    r'(?P<strike>\d+(?:\.\d+)?)(?P<option_type>CE|PE)$'
+)
+
+# Instrument codes used by exchange and broker contract files
+INSTRUMENT_CODES = {
+    'FUTIDX': 'FUTURES', 'FUTSTK': 'FUTURES', 'FUT': 'FUTURES', 'FUTURES': 'FUTURES',
+    'OPTIDX': 'OPTIONS', 'OPTSTK': 'OPTIONS', 'CE': 'OPTIONS', 'PE': 'OPTIONS', 'OPTIONS': 'OPTIONS',
+    'FUTCOM': 'COMMODITY', 'OPTFUT': 'COMMODITY', 'OPTCOM': 'COMMODITY', 'COMMODITY': 'COMMODITY',
+}
+
+COLUMN_ALIASES = {
+    'trading_symbol': ('trading_symbol', 'tradingsymbol', 'symbol'),
+    'underlying': ('underlying', 'name'),
+    'exchange': ('exchange', 'segment'),
+    'instrument_type': ('instrument_type', 'instrument'),
+    'expiry': ('expiry', 'expiry_date'),
+    'strike': ('strike', 'strike_price'),
+    'option_type': ('option_type',),
+    'lot_size': ('lot_size', 'lotsize', 'market_lot'),
+}
+
+EXPIRY_FORMATS = ('%Y-%m-%d', '%d-%b-%Y', '%d%b%Y', '%d/%m/%Y')
+
+
+def last_weekday_of_month(year, month, weekday=MONTHLY_EXPIRY_WEEKDAY):
+    """Date of the last given weekday (Mon=0) in a month"""
+    last_day = date(year, month, calendar.monthrange(year, month)[1])
+    return last_day - timedelta(days=(last_day.weekday() - weekday) % 7)
+
+
+def contract_instrument_type(exchange, option_type=None):
+    """Map a contract to the ResearchCall instrument type it belongs to"""
+    if exchange in COMMODITY_EXCHANGES:
+        return 'COMMODITY'
+    return 'OPTIONS' if option_type else 'FUTURES'
+
+
+def parse_trading_symbol(symbol, exchange='NFO'):
+    """
+    Parse a derivatives trading symbol into its contract fields
+
+    Args:
+        symbol: Trading symbol, e.g. NIFTY24JUN23500CE
+        exchange: Exchange the contract trades on (MCX/NCDEX mean commodity)
+
+    Returns:
+        dict: Contract fields, or None if the symbol is not a derivative
+    """
+    symbol = (symbol or '').strip().upper()
+    exchange = (exchange or 'NFO').upper()
+
+    match = WEEKLY_RE.match(symbol)
+    if match:
+        year = 2000 + int(match['year'])
+        try:
+            expiry = date(year, WEEKLY_MONTHS[match['month']], int(match['day']))
+        except ValueError:
+            match = None
+    if not match:
+        match = MONTHLY_RE.match(symbol)
+        if not match:
+            return None
+        year = 2000 + int(match['year'])
+        month = MONTHS[match['month']]
+        # MCX expiry days vary by commodity; leave them to the contract file
+        expiry = None if exchange in COMMODITY_EXCHANGES else last_weekday_of_month(year, month)
+
+    option_type = match['option_type']
+    return {
+        'trading_symbol': symbol,
+        'exchange': exchange if exchange in COMMODITY_EXCHANGES else 'NFO',
+        'instrument_type': contract_instrument_type(exchange, option_type),
+        'underlying': match['underlying'],
+        'expiry': expiry,
+        'strike': Decimal(match['strike']) if match['strike'] else None,
+        'option_type': option_type,
+    }
+
+
+def _column(row, field):
+    for alias in COLUMN_ALIASES[field]:
+        value = row.get(alias)
+        if value not in (None, ''):
+            return str(value).strip()
+    return ''
+
+
+def _parse_expiry(value):
+    for fmt in EXPIRY_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def _contract_from_row(row):
+    """Build an unsaved DerivativeContract from a contract file row (None if unusable)"""
+    row = {(key or '').strip().lower(): value for key, value in row.items()}
+    trading_symbol = _column(row, 'trading_symbol').upper()
+    if not trading_symbol:
+        return None
+
+    exchange = _column(row, 'exchange').upper() or 'NFO'
+    parsed = parse_trading_symbol(trading_symbol, exchange) or {}
+
+    option_type = _column(row, 'option_type').upper() or parsed.get('option_type')
+    code = _column(row, 'instrument_type').upper()
+    if code in ('CE', 'PE'):
+        option_type = code
+    if option_type not in ('CE', 'PE'):
+        option_type = None
+
+    instrument_type = INSTRUMENT_CODES.get(code) or parsed.get('instrument_type')
+    if exchange in COMMODITY_EXCHANGES:
+        instrument_type = 'COMMODITY'
+    if not instrument_type:
+        return None
+
+    try:
+        strike = Decimal(_column(row, 'strike')) if _column(row, 'strike') else parsed.get('strike')
+    except InvalidOperation:
+        strike = parsed.get('strike')
+    # Exchange files use 0 / -1 as the strike of futures
+    if strike is not None and strike <= 0:
+        strike = None
+
+    lot_size = _column(row, 'lot_size')
+    return DerivativeContract(
+        trading_symbol=trading_symbol,
+        exchange=exchange,
+        instrument_type=instrument_type,
+        underlying=(_column(row, 'underlying') or parsed.get('underlying') or trading_symbol).upper(),
+        expiry=_parse_expiry(_column(row, 'expiry')) or parsed.get('expiry'),
+        strike=strike,
+        option_type=option_type,
+        lot_size=int(float(lot_size)) if lot_size else None,
+    )
+
+
+def parse_contract_file(fileobj):
+    """
+    Parse a contract master CSV into unsaved DerivativeContracts
+
+    Args:
+        fileobj: File-like object (bytes or text)
+
+    Returns:
+        tuple: (list of DerivativeContract, number of skipped rows)
+    """
+    content = fileobj.read()
+    if isinstance(content, bytes):
+        content = content.decode('utf-8-sig')
+
+    contracts = {}
+    skipped = 0
+    for row in csv.DictReader(io.StringIO(content)):
+        contract = _contract_from_row(row)
+        if contract is None:
+            skipped += 1
+            continue
+        contracts[contract.trading_symbol] = contract
+    return list(contracts.values()), skipped
+
+
+def load_contracts(contracts, chunk_size=CONTRACT_LOAD_CHUNK_SIZE):
+    """
+    Bulk upsert contracts keyed on trading_symbol
+
+    Args:
+        contracts: Unsaved DerivativeContract instances
+        chunk_size: Rows per INSERT
+
+    Returns:
+        int: Number of contracts written
+    """
+    kwargs = {
+        'update_conflicts': True,
+        'update_fields': [
+            'exchange', 'instrument_type', 'underlying', 'expiry', 'strike', 'option_type',
+            'lot_size', 'updated_at',
+        ],
+    }
+    # MySQL's ON DUPLICATE KEY UPDATE does not take a conflict target
+    if connection.features.supports_update_conflicts_with_target:
+        kwargs['unique_fields'] = ['trading_symbol']
+
+    DerivativeContract.objects.bulk_create(contracts, batch_size=chunk_size, **kwargs)
+    return len(contracts)
+
+
+def resolve_contract(symbol, exchange='NSE', instrument_type='EQUITY'):
+    """
+    Find (or create from the symbol) the contract a call's symbol refers to
+
+    Args:
+        symbol: Call symbol
+        exchange: Call exchange
+        instrument_type: Call instrument type
+
+    Returns:
+        DerivativeContract or None
+    """
+    parsed = parse_trading_symbol(symbol, exchange)
+    if parsed is None and instrument_type == 'EQUITY':
+        return None
+
+    contract = DerivativeContract.objects.filter(trading_symbol=(symbol or '').strip().upper()).first()
+    if contract is not None or parsed is None:
+        return contract
+
+    trading_symbol = parsed.pop('trading_symbol')
+    contract, _ = DerivativeContract.objects.get_or_create(trading_symbol=trading_symbol, defaults=parsed)
+    return contract
+
+
+def get_contract_lookup(symbols):
+    """
+    Map symbols to contracts with a single query
+
+    Args:
+        symbols: Iterable of upper-cased symbols
+
+    Returns:
+        dict: trading_symbol -> (contract id, instrument_type)
+    """
+    return {
+        trading_symbol: (contract_id, instrument_type)
+        for contract_id, trading_symbol, instrument_type in DerivativeContract.objects.filter(
+            trading_symbol__in=set(symbols),
+        ).values_list('id', 'trading_symbol', 'instrument_type')
+    }
+
+
+def link_calls_to_contracts(queryset=None, chunk_size=CONTRACT_LOAD_CHUNK_SIZE):
+    """
+    Attach contract master rows to research calls that have none
+
+    Matches on trading symbol and also corrects the call's instrument_type,
+    so the trade tabs can filter on it directly.
+
+    Args:
+        queryset: ResearchCall queryset to link (all unlinked calls by default)
+        chunk_size: Calls per bulk update
+
+    Returns:
+        int: Number of calls linked
+    """
+    from apps.research_calls.models import ResearchCall
+
+    if queryset is None:
+        queryset = ResearchCall.objects.all()
+    queryset = queryset.filter(contract__isnull=True)
+
+    linked = 0
+    batch = []
+    for call in queryset.only('id', 'symbol', 'instrument_type').iterator(chunk_size=chunk_size):
+        batch.append(call)
+        if len(batch) >= chunk_size:
+            linked += _link_batch(batch)
+            batch = []
+    if batch:
+        linked += _link_batch(batch)
+    return linked
+
+
+def _link_batch(calls):
+    from apps.research_calls.models import ResearchCall
+
+    lookup = get_contract_lookup(call.symbol for call in calls)
+    matched = []
+    for call in calls:
+        if call.symbol in lookup:
+            call.contract_id, call.instrument_type = lookup[call.symbol]
+            matched.append(call)
+    if matched:
+        ResearchCall.objects.bulk_update(matched, ['contract', 'instrument_type'])
+    return len(matched)
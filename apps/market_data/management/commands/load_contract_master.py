@@ -0,0 +1,35 @@
+"""
+Django management command to bulk load the derivatives contract master
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.market_data.contracts import (
+    CONTRACT_LOAD_CHUNK_SIZE,
+    link_calls_to_contracts,
+    load_contracts,
+    parse_contract_file,
+)
+
+
+class Command(BaseCommand):
+    help = 'Load futures/options/commodity contracts from an exchange contract file (CSV)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Contract file (CSV with trading symbol, expiry, strike, lot size...)')
+        parser.add_argument('--chunk-size', type=int, default=CONTRACT_LOAD_CHUNK_SIZE, help='Rows per INSERT')
+        parser.add_argument('--no-link', action='store_true', help='Do not link existing research calls to contracts')
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['path'], 'rb') as fileobj:
+                contracts, skipped = parse_contract_file(fileobj)
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(f'Loading {len(contracts)} contracts ({skipped} rows skipped)...')
+        loaded = load_contracts(contracts, chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f'✓ Loaded {loaded} contracts'))
+
+        if not options['no_link']:
+            linked = link_calls_to_contracts(chunk_size=options['chunk_size'])
+            self.stdout.write(self.style.SUCCESS(f'✓ Linked {linked} research calls'))
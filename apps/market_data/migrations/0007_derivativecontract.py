@@ -0,0 +1,33 @@
+# Generated by Django 5.2.11 on 2026-10-18 12:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('market_data', '0006_alter_marketindex_symbol_gainerslosers'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DerivativeContract',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('trading_symbol', models.CharField(max_length=50, unique=True)),
+                ('exchange', models.CharField(default='NFO', max_length=10)),
+                ('instrument_type', models.CharField(choices=[('FUTURES', 'Futures'), ('OPTIONS', 'Options'), ('COMMODITY', 'Commodity')], max_length=20)),
+                ('underlying', models.CharField(max_length=50)),
+                ('expiry', models.DateField(blank=True, null=True)),
+                ('strike', models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True)),
+                ('option_type', models.CharField(blank=True, choices=[('CE', 'Call'), ('PE', 'Put')], max_length=2, null=True)),
+                ('lot_size', models.PositiveIntegerField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'derivative_contracts',
+                'ordering': ['underlying', 'expiry', 'strike'],
+                'indexes': [models.Index(fields=['instrument_type', 'underlying', 'expiry'], name='derivative__instrum_031993_idx'), models.Index(fields=['underlying', 'expiry', 'option_type', 'strike'], name='derivative__underly_6a7a3d_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.11 on 2026-10-18 16:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('market_data', '0007_derivativecontract'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyBar',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('symbol', models.CharField(max_length=30)),
+                ('trade_date', models.DateField()),
+                ('open', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('high', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('low', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('close', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('volume', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'daily_bars',
+                'ordering': ['symbol', 'trade_date'],
+                'indexes': [models.Index(fields=['trade_date'], name='daily_bars_trade_d_173a6f_idx')],
+                'unique_together': {('symbol', 'trade_date')},
+            },
+        ),
+    ]
@@ -207,3 +207,60 @@ class GainersLosers(models.Model):
 
     def __str__(self):
         return f"{self.symbol} [{self.category}] {self.change_pct}%"
+
+
+class DerivativeContract(models.Model):
+    """Contract master for futures, options and commodity contracts"""
+
+    INSTRUMENT_TYPE_CHOICES = [
+        ('FUTURES',   'Futures'),
+        ('OPTIONS',   'Options'),
+        ('COMMODITY', 'Commodity'),
+    ]
+
+    OPTION_TYPE_CHOICES = [
+        ('CE', 'Call'),
+        ('PE', 'Put'),
+    ]
+
+    trading_symbol  = models.CharField(max_length=50, unique=True)
+    exchange        = models.CharField(max_length=10, default='NFO')
+    instrument_type = models.CharField(max_length=20, choices=INSTRUMENT_TYPE_CHOICES)
+    underlying      = models.CharField(max_length=50)
+    expiry          = models.DateField(null=True, blank=True)
+    strike          = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)
+    option_type     = models.CharField(max_length=2, choices=OPTION_TYPE_CHOICES, null=True, blank=True)
+    lot_size        = models.PositiveIntegerField(null=True, blank=True)
+    updated_at      = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'derivative_contracts'
+        ordering = ['underlying', 'expiry', 'strike']
+        indexes = [
+            models.Index(fields=['instrument_type', 'underlying', 'expiry']),
+            models.Index(fields=['underlying', 'expiry', 'option_type', 'strike']),
+        ]
+
+    def __str__(self):
+        return self.trading_symbol
+
+
+class DailyBar(models.Model):
+    """End-of-day OHLCV bar for a stock or index (index codes as in MarketIndex)"""
+
+    symbol     = models.CharField(max_length=30)
+    trade_date = models.DateField()
+    open       = models.DecimalField(max_digits=12, decimal_places=2)
+    high       = models.DecimalField(max_digits=12, decimal_places=2)
+    low        = models.DecimalField(max_digits=12, decimal_places=2)
+    close      = models.DecimalField(max_digits=12, decimal_places=2)
+    volume     = models.BigIntegerField(default=0)
+
+    class Meta:
+        db_table = 'daily_bars'
+        ordering = ['symbol', 'trade_date']
+        unique_together = [('symbol', 'trade_date')]
+        indexes = [models.Index(fields=['trade_date'])]
+
+    def __str__(self):
+        return f"{self.symbol} {self.trade_date} {self.close}"
@@ -2,8 +2,9 @@
 Market Data services using infrastructure client
 """
 from decimal import Decimal
-from apps.market_data.models import MarketIndex, StockPrice, PopularStock, GainersLosers
+from apps.market_data.models import MarketIndex, StockPrice, PopularStock, GainersLosers, DailyBar
 from infrastructure.market_data_client import MarketDataClient
+from django.db import connection
 from django.utils import timezone
 from django.core.cache import cache
 import logging
@@ -18,6 +19,8 @@ CACHE_TTL_GAINERS  = 300   # 5 min
 CACHE_TTL_ACTIVE   = 300   # 5 min
 CACHE_TTL_TICKER   = 180   # 3 min
 
+DAILY_BAR_CHUNK_SIZE = 1000
+
 
 def fetch_stock_price(symbol):
     """
@@ -26,6 +29,60 @@ def fetch_stock_price(symbol):
     return client.fetch_stock_price(symbol)
 
 
+def get_quote_snapshot(symbols, refresh=False):
+    """
+    Latest price for each symbol as one in-memory snapshot
+
+    Args:
+        symbols: Iterable of stock symbols
+        refresh: Fetch live prices in one batched request first; symbols
+            without a live price fall back to the stored StockPrice rows
+
+    Returns:
+        dict: symbol -> Decimal price
+    """
+    symbols = set(symbols)
+    quotes = client.fetch_quotes(sorted(symbols)) if refresh and symbols else {}
+
+    missing = symbols - set(quotes)
+    if missing:
+        stored = StockPrice.objects.filter(symbol__in=missing).order_by(
+            'symbol', '-updated_at'
+        ).values_list('symbol', 'current_price')
+        for symbol, price in stored:
+            quotes.setdefault(symbol, price)
+    return quotes
+
+
+def store_daily_bars(symbols, period='1y', chunk_size=DAILY_BAR_CHUNK_SIZE):
+    """
+    Download daily bars for symbols and bulk upsert them into DailyBar
+
+    Args:
+        symbols: Iterable of stock symbols or index codes
+        period: History to fetch; re-fetched days overwrite the stored bars
+        chunk_size: Rows per INSERT
+
+    Returns:
+        int: Number of bars written
+    """
+    kwargs = {
+        'update_conflicts': True,
+        'update_fields': ['open', 'high', 'low', 'close', 'volume'],
+    }
+    # MySQL's ON DUPLICATE KEY UPDATE does not take a conflict target
+    if connection.features.supports_update_conflicts_with_target:
+        kwargs['unique_fields'] = ['symbol', 'trade_date']
+
+    rows = [
+        DailyBar(symbol=symbol, trade_date=day, open=open_, high=high, low=low, close=close, volume=volume)
+        for symbol, bars in client.fetch_daily_bars(sorted(set(symbols)), period).items()
+        for day, open_, high, low, close, volume in bars
+    ]
+    DailyBar.objects.bulk_create(rows, batch_size=chunk_size, **kwargs)
+    return len(rows)
+
+
 def update_index_prices():
     """Update all market indices using infrastructure client"""
     updated_count = 0
@@ -0,0 +1,53 @@
+"""
+Websocket consumer for real-time notifications
+"""
+import asyncio
+import json
+
+import redis.asyncio as aioredis
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncWebsocketConsumer
+from django.conf import settings
+
+from apps.notifications.counters import get_unread_count
+from apps.notifications.push import user_channel
+
+
+class NotificationConsumer(AsyncWebsocketConsumer):
+    """
+    WS /ws/notifications/
+    Sends the unread count on connect, then relays each notification
+    published on the user's Redis channel.
+    """
+
+    async def connect(self):
+        user = self.scope.get('user')
+        if user is None or not user.is_authenticated:
+            await self.close()
+            return
+
+        await self.accept()
+        count = await database_sync_to_async(get_unread_count)(user.id)
+        await self.send(text_data=json.dumps({'type': 'unread_count', 'unread_count': count}))
+
+        self.listener = None
+        if getattr(settings, 'NOTIFICATION_PUSH_URL', ''):
+            self.listener = asyncio.create_task(self.relay(user.id))
+
+    async def disconnect(self, code):
+        listener = getattr(self, 'listener', None)
+        if listener is not None:
+            listener.cancel()
+
+    async def relay(self, user_id):
+        client = aioredis.Redis.from_url(settings.NOTIFICATION_PUSH_URL)
+        pubsub = client.pubsub()
+        try:
+            await pubsub.subscribe(user_channel(user_id))
+            async for message in pubsub.listen():
+                if message['type'] == 'message':
+                    await self.send(text_data=message['data'].decode())
+        finally:
+            await pubsub.unsubscribe()
+            await pubsub.close()
+            await client.close()
@@ -0,0 +1,20 @@
+"""
+Template context for the notification badge.
+"""
+from django.conf import settings
+
+from apps.notifications.counters import get_unread_count
+
+
+def unread_notifications(request):
+    """
+    Unread count for the header badge (one cache read per page), and
+    whether the badge can use the websocket push instead of polling
+    """
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        return {}
+    return {
+        'unread_notifications': get_unread_count(user.pk),
+        'notification_push': bool(getattr(settings, 'NOTIFICATION_PUSH_URL', '')),
+    }
@@ -0,0 +1,112 @@
+"""
+Unread notification counters
+
+Each user's unread count lives in the cache (Redis in production) and is
+adjusted with atomic INCR/DECR when notifications are created or read, so
+badge reads never COUNT(*) the notifications table. A missing counter is
+rebuilt from the database on the next read, and the periodic reconciliation
+corrects any drift from races between the two.
+"""
+from django.core.cache import cache
+from django.db.models import Count
+
+from apps.notifications.models import Notification
+
+UNREAD_COUNT_TTL = 604800  # 7 days; counters of inactive users are rebuilt on demand
+RECONCILE_CHUNK_SIZE = 1000
+
+
+def unread_count_key(user_id):
+    return f'notifications:unread:{user_id}'
+
+
+def get_unread_count(user_id):
+    """
+    Unread notification count of a user
+
+    Args:
+        user_id: User id
+
+    Returns:
+        int: Cached counter, rebuilt from the database when missing
+    """
+    key = unread_count_key(user_id)
+    count = cache.get(key)
+    if count is None:
+        count = Notification.objects.filter(user_id=user_id, is_read=False).count()
+        # add() does not overwrite an increment that landed since the COUNT
+        cache.add(key, count, UNREAD_COUNT_TTL)
+    return max(count, 0)
+
+
+def adjust_unread_counts(deltas):
+    """
+    Atomically add to the counters of users that have one
+
+    Users without a cached counter are skipped; their next read counts
+    from the database, which already includes the change.
+
+    Args:
+        deltas: dict user id -> change (negative when notifications are read)
+
+    Returns:
+        dict: user id -> new count, for the users that had a counter
+    """
+    counts = {}
+    for user_id, delta in deltas.items():
+        if not delta:
+            continue
+        key = unread_count_key(user_id)
+        try:
+            count = cache.incr(key, delta)
+        except ValueError:
+            continue
+        if count < 0:
+            # Drifted below zero: drop it and recount on the next read
+            cache.delete(key)
+        else:
+            counts[user_id] = count
+    return counts
+
+
+def reset_unread_count(user_id):
+    """Set a user's counter to zero (after marking everything read)"""
+    cache.set(unread_count_key(user_id), 0, UNREAD_COUNT_TTL)
+
+
+def reconcile_unread_counts(user_ids, chunk_size=RECONCILE_CHUNK_SIZE):
+    """
+    Correct cached counters that drifted from the database
+
+    Only users with a cached counter are checked, with one GROUP BY query
+    per chunk.
+
+    Args:
+        user_ids: Iterable of user ids to check
+        chunk_size: Users per cache/database round trip
+
+    Returns:
+        int: Number of counters corrected
+    """
+    corrected = 0
+    user_ids = list(user_ids)
+    for start in range(0, len(user_ids), chunk_size):
+        chunk = user_ids[start:start + chunk_size]
+        cached = cache.get_many([unread_count_key(user_id) for user_id in chunk])
+        if not cached:
+            continue
+
+        cached_ids = [user_id for user_id in chunk if unread_count_key(user_id) in cached]
+        actual = dict(Notification.objects.filter(user_id__in=cached_ids, is_read=False).order_by().values(
+            'user_id'
+        ).annotate(count=Count('id')).values_list('user_id', 'count'))
+
+        fixes = {}
+        for user_id in cached_ids:
+            key = unread_count_key(user_id)
+            if cached[key] != actual.get(user_id, 0):
+                fixes[key] = actual.get(user_id, 0)
+        if fixes:
+            cache.set_many(fixes, UNREAD_COUNT_TTL)
+            corrected += len(fixes)
+    return corrected
@@ -0,0 +1,184 @@
+"""
+Notification digests - coalesce bursts into one row and one email per user
+
+During a digest window, deliveries of DIGEST_TYPES are appended to a
+buffer in the cache (Redis in production) instead of being written to
+the notifications table. Each append is one event holding the recipient
+ids, so a fan-out chunk costs one INCR and one SET however many users it
+covers. Once the window has closed, the flush task groups the window's
+events per user. A user with one event gets it as a normal notification.
+A user with several gets a single DIGEST notification and a single email.
+
+Windows are numbered by time (epoch seconds // window), so writers
+never append to a window that is being flushed. A window's buffer is only
+removed once its notifications are written; a failed flush releases the
+window for the next run. Windows not flushed within the lookback are
+dropped with a warning.
+"""
+import logging
+import time
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+DIGEST_TYPES = ('CALL_PUBLISHED', 'TARGET_HIT', 'STOP_LOSS_HIT')
+DIGEST_FLUSH_GRACE = 10  # seconds after a window closes before it is flushed
+DIGEST_LOOKBACK_WINDOWS = 12  # closed windows each flush checks
+DIGEST_MAX_LINES = 20  # event titles listed in a digest message
+
+# Plural labels for the digest title
+DIGEST_LABELS = {
+    'CALL_PUBLISHED': 'new calls',
+    'TARGET_HIT': 'targets hit',
+    'STOP_LOSS_HIT': 'stop losses hit',
+}
+
+
+def get_digest_window():
+    """Digest window in seconds (0 delivers every notification immediately)"""
+    return getattr(settings, 'NOTIFICATION_DIGEST_WINDOW', 0)
+
+
+def should_digest(notification_type):
+    return get_digest_window() > 0 and notification_type in DIGEST_TYPES
+
+
+def _key(window_id, suffix):
+    return f'notifications:digest:{window_id}:{suffix}'
+
+
+def _buffer_ttl(window):
+    return window * (DIGEST_LOOKBACK_WINDOWS + 2)
+
+
+def buffer_notification(notification_type, title, message, related_type, related_id,
+                        app_user_ids, email_user_ids, now=None):
+    """
+    Append one delivery to the current window's buffer
+
+    Args:
+        notification_type: Notification.TYPE_CHOICES value
+        title: Notification title
+        message: Notification body
+        related_type: Related object class name (or None)
+        related_id: Related object id (or None)
+        app_user_ids: Users who get the in-app notification
+        email_user_ids: Users who get the email
+
+    Returns:
+        int: Id of the window the event was buffered in
+    """
+    window = get_digest_window()
+    window_id = int((now or time.time()) // window)
+    ttl = _buffer_ttl(window)
+
+    length_key = _key(window_id, 'length')
+    cache.add(length_key, 0, ttl)
+    position = cache.incr(length_key)
+    cache.set(_key(window_id, position), {
+        'type': notification_type,
+        'title': title,
+        'message': message,
+        'related_type': related_type,
+        'related_id': related_id,
+        'app': list(app_user_ids),
+        'email': list(email_user_ids),
+    }, ttl)
+    return window_id
+
+
+def collect_window(window_id):
+    """
+    Read a closed window's events (see discard_window)
+
+    Returns:
+        list: Events in the order they were buffered
+    """
+    length = cache.get(_key(window_id, 'length'))
+    if not length:
+        return []
+    keys = [_key(window_id, position) for position in range(1, length + 1)]
+    events = cache.get_many(keys)
+    return [events[key] for key in keys if key in events]
+
+
+def discard_window(window_id):
+    """Remove a window's buffer once its events have been delivered"""
+    length = cache.get(_key(window_id, 'length')) or 0
+    cache.delete_many([
+        *(_key(window_id, position) for position in range(1, length + 1)),
+        _key(window_id, 'length'),
+    ])
+
+
+def release_window(window_id):
+    """Undo a window's claim after a failed flush, so the next flush retries it"""
+    cache.delete(_key(window_id, 'flushed'))
+
+
+def group_events(events):
+    """
+    Group a window's events per recipient
+
+    Returns:
+        tuple: (user id -> in-app events, user id -> email events)
+    """
+    app = defaultdict(list)
+    email = defaultdict(list)
+    for event in events:
+        for user_id in event['app']:
+            app[user_id].append(event)
+        for user_id in event['email']:
+            email[user_id].append(event)
+    return app, email
+
+
+def digest_content(events):
+    """Title and message of a digest of several events"""
+    counts = Counter(event['type'] for event in events)
+    title = f"{len(events)} updates: " + ', '.join(
+        f"{count} {DIGEST_LABELS.get(notification_type, notification_type.lower())}"
+        for notification_type, count in counts.most_common()
+    )
+    lines = [f"- {event['title']}" for event in events[:DIGEST_MAX_LINES]]
+    if len(events) > DIGEST_MAX_LINES:
+        lines.append(f"...and {len(events) - DIGEST_MAX_LINES} more")
+    return title, '\n'.join(lines)
+
+
+def claim_closed_windows(now=None):
+    """
+    Recent windows that are closed, past the grace period and hold events
+
+    Each returned window is claimed, so concurrent flushes never deliver
+    the same window twice.
+
+    Returns:
+        list: Window ids to flush, oldest first
+    """
+    window = get_digest_window()
+    if window <= 0:
+        return []
+    last_closed = int(((now or time.time()) - DIGEST_FLUSH_GRACE) // window) - 1
+    window_ids = range(last_closed - DIGEST_LOOKBACK_WINDOWS + 1, last_closed + 1)
+    # Windows that fell out of the lookback (their buffers may not have expired yet)
+    stale_ids = range(last_closed - 2 * DIGEST_LOOKBACK_WINDOWS + 1, window_ids.start)
+
+    lengths = cache.get_many([_key(window_id, 'length') for window_id in (*stale_ids, *window_ids)])
+    for window_id in stale_ids:
+        length = lengths.get(_key(window_id, 'length'))
+        if length and cache.add(_key(window_id, 'flushed'), 1, _buffer_ttl(window)):
+            logger.warning(
+                f"Dropped notification digest window {window_id}: {length} buffered deliveries "
+                f"were not flushed within {DIGEST_LOOKBACK_WINDOWS} windows"
+            )
+            discard_window(window_id)
+
+    return [
+        window_id for window_id in window_ids
+        if lengths.get(_key(window_id, 'length'))
+        and cache.add(_key(window_id, 'flushed'), 1, _buffer_ttl(window))
+    ]
@@ -0,0 +1,28 @@
+"""
+Django management command to archive old notifications
+"""
+from django.core.management.base import BaseCommand
+
+from apps.notifications.retention import (
+    ARCHIVE_BATCH_SIZE,
+    ARCHIVE_RETENTION_DAYS,
+    NOTIFICATION_RETENTION_DAYS,
+    archive_notifications,
+    purge_archive,
+)
+
+
+class Command(BaseCommand):
+    help = 'Move old notifications to the archive table and purge expired archive rows'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=NOTIFICATION_RETENTION_DAYS, help='Days kept in the live table')
+        parser.add_argument('--archive-days', type=int, default=ARCHIVE_RETENTION_DAYS, help='Days kept in the archive')
+        parser.add_argument('--batch-size', type=int, default=ARCHIVE_BATCH_SIZE, help='Rows per batch')
+
+    def handle(self, *args, **options):
+        archived = archive_notifications(days=options['days'], batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'✓ Archived {archived} notifications'))
+
+        purged = purge_archive(days=options['archive_days'], batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'✓ Purged {purged} archived notifications'))
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.11 on 2026-10-18 18:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0002_emailoutbox'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='notification',
+            name='type',
+            field=models.CharField(choices=[('CALL_PUBLISHED', 'Call Published'), ('TARGET_HIT', 'Target Hit'), ('STOP_LOSS_HIT', 'Stop Loss Hit'), ('CALL_UPDATED', 'Call Updated'), ('CALL_EXPIRED', 'Call Expired'), ('PORTFOLIO_ALERT', 'Portfolio Alert'), ('SYSTEM', 'System Notification'), ('DIGEST', 'Digest')], max_length=50),
+        ),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 from apps.authentication.models import User
 
 
@@ -13,6 +14,7 @@ class Notification(models.Model):
         ('CALL_EXPIRED', 'Call Expired'),
         ('PORTFOLIO_ALERT', 'Portfolio Alert'),
         ('SYSTEM', 'System Notification'),
+        ('DIGEST', 'Digest'),
     ]
     
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='notifications')
@@ -36,6 +38,8 @@ class Notification(models.Model):
         db_table = 'notifications'
         indexes = [
             models.Index(fields=['user', 'is_read', '-created_at']),
+            # Inbox keyset pages: (user, created_at) seek, tie-broken by the implicit id
+            models.Index(fields=['user', '-created_at']),
         ]
         ordering = ['-created_at']
     
@@ -43,6 +47,38 @@ class Notification(models.Model):
         return f"{self.user.email} - {self.title}"
 
 
+class NotificationArchive(models.Model):
+    """Notifications moved out of the live table by the retention job"""
+    
+    # Same id as the live row, so a re-run of an interrupted batch is a no-op
+    id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_notifications')
+    
+    type = models.CharField(max_length=50, choices=Notification.TYPE_CHOICES)
+    title = models.CharField(max_length=255)
+    message = models.TextField()
+    
+    related_type = models.CharField(max_length=50, null=True, blank=True)
+    related_id = models.IntegerField(null=True, blank=True)
+    
+    is_read = models.BooleanField(default=False)
+    read_at = models.DateTimeField(null=True, blank=True)
+    
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'notifications_archive'
+        indexes = [
+            models.Index(fields=['user', '-created_at']),
+            models.Index(fields=['created_at']),
+        ]
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"{self.user_id} - {self.title} (archived)"
+
+
 class NotificationPreferences(models.Model):
     """User's notification preferences"""
     
@@ -75,3 +111,45 @@ class NotificationPreferences(models.Model):
     
     def __str__(self):
         return f"Preferences for {self.user.email}"
+
+
+class EmailOutbox(models.Model):
+    """Outgoing email queued for delivery by the outbox workers"""
+    
+    STATUS_CHOICES = [
+        ('PENDING', 'Pending'),
+        ('SENDING', 'Sending'),
+        ('SENT', 'Sent'),
+        ('FAILED', 'Failed'),
+    ]
+    
+    # Duplicate enqueues with the same key are dropped
+    idempotency_key = models.CharField(max_length=128, unique=True)
+    
+    to_email = models.EmailField()
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    html_body = models.TextField(blank=True, default='')
+    
+    # Recipient mailbox provider, for rate limiting (gmail, microsoft, ...)
+    provider = models.CharField(max_length=30, default='default')
+    
+    # Delivery state
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='PENDING')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True, default='')
+    
+    # Timestamps
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        db_table = 'email_outbox'
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.to_email} - {self.subject} [{self.status}]"
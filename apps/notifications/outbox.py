@@ -0,0 +1,268 @@
+"""
+Email outbox - queued, rate-limited, retried email delivery
+
+Callers enqueue rows into EmailOutbox instead of talking to SMTP in the
+request path. Workers drain due rows in batches over one reused SMTP
+connection, hold each recipient mailbox provider to a per-minute rate,
+and retry failures with exponential backoff. Every row carries an
+idempotency key, so enqueueing the same email twice sends it once.
+
+Any SMTP server works as a stand-in locally, e.g.
+``python -m aiosmtpd -n -l localhost:1025`` with EMAIL_BACKEND set to the
+SMTP backend, EMAIL_PORT=1025 and EMAIL_USE_TLS=False.
+"""
+import hashlib
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import connection, transaction
+from django.utils import timezone
+
+from apps.notifications.models import EmailOutbox
+
+OUTBOX_BATCH_SIZE = 100
+MAX_ATTEMPTS = 5
+RETRY_BASE_SECONDS = 60  # 1, 2, 4, 8 min between attempts
+RETRY_MAX_SECONDS = 3600
+CLAIM_TIMEOUT = timedelta(minutes=10)  # SENDING rows older than this are retried
+KICK_INTERVAL = 5  # seconds between drains started by enqueues
+MAX_BATCHES_PER_DRAIN = 20
+OUTBOX_RETENTION_DAYS = 30  # SENT/FAILED rows (and their idempotency keys) are kept this long
+PURGE_BATCH_SIZE = 5000
+
+# Recipient domain -> mailbox provider
+PROVIDER_DOMAINS = {
+    'gmail.com': 'gmail',
+    'googlemail.com': 'gmail',
+    'outlook.com': 'microsoft',
+    'hotmail.com': 'microsoft',
+    'live.com': 'microsoft',
+    'yahoo.com': 'yahoo',
+    'yahoo.co.in': 'yahoo',
+    'rediffmail.com': 'rediff',
+}
+
+# Emails per minute per provider (override with settings.EMAIL_PROVIDER_RATE_LIMITS)
+DEFAULT_RATE_LIMITS = {
+    'gmail': 300,
+    'microsoft': 300,
+    'yahoo': 120,
+    'default': 600,
+}
+
+
+def get_rate_limits():
+    return {**DEFAULT_RATE_LIMITS, **getattr(settings, 'EMAIL_PROVIDER_RATE_LIMITS', {})}
+
+
+def email_provider(address):
+    """Mailbox provider of an email address ('default' if not listed)"""
+    domain = address.rsplit('@', 1)[-1].lower()
+    return PROVIDER_DOMAINS.get(domain, 'default')
+
+
+def _outbox_row(to_email, subject, body, html_body='', idempotency_key=None):
+    if idempotency_key is None:
+        idempotency_key = hashlib.sha256('\n'.join([to_email, subject, body]).encode()).hexdigest()
+    return EmailOutbox(
+        idempotency_key=idempotency_key[:128],
+        to_email=to_email,
+        subject=subject[:255],
+        body=body,
+        html_body=html_body,
+        provider=email_provider(to_email),
+    )
+
+
+def enqueue_emails(emails, kick=True):
+    """
+    Queue many emails with one bulk INSERT, skipping duplicate keys
+
+    Args:
+        emails: Iterable of dicts with to_email, subject, body and optional
+            html_body / idempotency_key (defaults to a hash of the content)
+        kick: Start a drain as soon as the transaction commits
+
+    Returns:
+        int: Number of emails handed to the outbox
+    """
+    rows = [_outbox_row(**email) for email in emails]
+    if not rows:
+        return 0
+    EmailOutbox.objects.bulk_create(rows, ignore_conflicts=True)
+    if kick:
+        transaction.on_commit(_kick_drain)
+    return len(rows)
+
+
+def _kick_drain():
+    """Start a drain now, at most once per KICK_INTERVAL (the beat task covers the rest)"""
+    from apps.notifications.tasks import task_drain_email_outbox
+
+    if cache.add('email_outbox:kick', 1, KICK_INTERVAL):
+        task_drain_email_outbox.delay()
+
+
+def enqueue_email(to_email, subject, body, html_body='', idempotency_key=None, kick=True):
+    """Queue one email (see enqueue_emails)"""
+    return enqueue_emails([{
+        'to_email': to_email,
+        'subject': subject,
+        'body': body,
+        'html_body': html_body,
+        'idempotency_key': idempotency_key,
+    }], kick=kick)
+
+
+def _claim_batch(now, batch_size):
+    """Mark up to batch_size due rows SENDING and return them"""
+    EmailOutbox.objects.filter(status='SENDING', claimed_at__lt=now - CLAIM_TIMEOUT).update(status='PENDING')
+
+    with transaction.atomic():
+        due = EmailOutbox.objects.filter(status='PENDING', next_attempt_at__lte=now).order_by('next_attempt_at', 'id')
+        # Concurrent workers skip each other's claimed rows
+        if connection.features.has_select_for_update_skip_locked:
+            due = due.select_for_update(skip_locked=True)
+        ids = list(due.values_list('id', flat=True)[:batch_size])
+        EmailOutbox.objects.filter(id__in=ids).update(status='SENDING', claimed_at=now)
+    return list(EmailOutbox.objects.filter(id__in=ids).order_by('id'))
+
+
+def _take_rate_budget(provider, wanted, now):
+    """Reserve up to `wanted` sends from the provider's budget for this minute"""
+    limit = get_rate_limits().get(provider, get_rate_limits()['default'])
+    key = f'email_outbox:rate:{provider}:{now:%Y%m%d%H%M}'
+    cache.add(key, 0, 120)
+    used = cache.incr(key, wanted)
+    granted = max(0, min(wanted, limit - (used - wanted)))
+    if granted < wanted:
+        cache.decr(key, wanted - granted)
+    return granted
+
+
+def _retry_delay(attempts):
+    return timedelta(seconds=min(RETRY_BASE_SECONDS * 2 ** (attempts - 1), RETRY_MAX_SECONDS))
+
+
+def drain_outbox(batch_size=OUTBOX_BATCH_SIZE, now=None):
+    """
+    Send one batch of due outbox emails over a single SMTP connection
+
+    Rows over their provider's per-minute budget go back to the queue for
+    the next minute; failed sends are retried with exponential backoff and
+    marked FAILED after MAX_ATTEMPTS.
+
+    Args:
+        batch_size: Rows claimed per drain
+        now: Current time (for tests)
+
+    Returns:
+        dict: {'sent', 'retried', 'failed', 'deferred'}
+    """
+    now = now or timezone.now()
+    stats = {'sent': 0, 'retried': 0, 'failed': 0, 'deferred': 0}
+    rows = _claim_batch(now, batch_size)
+    if not rows:
+        return stats
+
+    by_provider = {}
+    for row in rows:
+        by_provider.setdefault(row.provider, []).append(row)
+
+    sendable = []
+    deferred = []
+    for provider, provider_rows in by_provider.items():
+        granted = _take_rate_budget(provider, len(provider_rows), now)
+        sendable.extend(provider_rows[:granted])
+        deferred.extend(provider_rows[granted:])
+
+    if deferred:
+        next_minute = now.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        EmailOutbox.objects.filter(id__in=[row.id for row in deferred]).update(
+            status='PENDING', next_attempt_at=next_minute,
+        )
+        stats['deferred'] = len(deferred)
+
+    sent_ids = []
+    email_connection = get_connection()
+    try:
+        email_connection.open()
+        for row in sendable:
+            message = EmailMultiAlternatives(
+                subject=row.subject,
+                body=row.body,
+                from_email=settings.DEFAULT_FROM_EMAIL,
+                to=[row.to_email],
+                connection=email_connection,
+            )
+            if row.html_body:
+                message.attach_alternative(row.html_body, 'text/html')
+            try:
+                email_connection.send_messages([message])
+                sent_ids.append(row.id)
+            except Exception as e:
+                _record_failure(row, e, now, stats)
+    except Exception as e:
+        # Could not connect: the whole batch is retried later
+        for row in sendable:
+            if row.id not in sent_ids and row.status == 'SENDING':
+                _record_failure(row, e, now, stats)
+    finally:
+        email_connection.close()
+
+    if sent_ids:
+        EmailOutbox.objects.filter(id__in=sent_ids).update(status='SENT', sent_at=now, last_error='')
+        stats['sent'] = len(sent_ids)
+    return stats
+
+
+def drain_outbox_until_empty(batch_size=OUTBOX_BATCH_SIZE, max_batches=MAX_BATCHES_PER_DRAIN):
+    """
+    Drain batches until nothing due is left or every remaining row is deferred
+
+    Returns:
+        dict: Totals of drain_outbox's stats
+    """
+    totals = {'sent': 0, 'retried': 0, 'failed': 0, 'deferred': 0}
+    for _ in range(max_batches):
+        stats = drain_outbox(batch_size)
+        for key, value in stats.items():
+            totals[key] += value
+        if stats['sent'] + stats['retried'] + stats['failed'] == 0:
+            break
+    return totals
+
+
+def purge_outbox(days=OUTBOX_RETENTION_DAYS, batch_size=PURGE_BATCH_SIZE):
+    """
+    Delete SENT and FAILED outbox rows whose last attempt is older than `days`, in batches
+
+    Returns:
+        int: Number of rows deleted
+    """
+    cutoff = timezone.now() - timedelta(days=days)
+    deleted = 0
+    while True:
+        # Served by the (status, next_attempt_at) index
+        ids = list(EmailOutbox.objects.filter(
+            status__in=['SENT', 'FAILED'], next_attempt_at__lt=cutoff,
+        ).order_by().values_list('id', flat=True)[:batch_size])
+        if not ids:
+            break
+        deleted += EmailOutbox.objects.filter(id__in=ids).delete()[0]
+    return deleted
+
+
+def _record_failure(row, error, now, stats):
+    row.attempts += 1
+    row.last_error = str(error)[:1000]
+    if row.attempts >= MAX_ATTEMPTS:
+        row.status = 'FAILED'
+        stats['failed'] += 1
+    else:
+        row.status = 'PENDING'
+        row.next_attempt_at = now + _retry_delay(row.attempts)
+        stats['retried'] += 1
+    row.save(update_fields=['attempts', 'last_error', 'status', 'next_attempt_at'])
@@ -0,0 +1,60 @@
+"""
+Real-time notification push over Redis pub/sub
+
+New notifications are published on a per-user channel after the creating
+transaction commits; NotificationConsumer relays them to the user's open
+websocket sessions, so pages update the badge without polling. Push is
+disabled when NOTIFICATION_PUSH_URL is not set.
+"""
+import json
+import logging
+
+import redis
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+_client = None
+
+
+def user_channel(user_id):
+    return f'notifications:user:{user_id}'
+
+
+def get_push_client():
+    """Shared Redis client for publishing (None when push is disabled)"""
+    global _client
+    url = getattr(settings, 'NOTIFICATION_PUSH_URL', '')
+    if not url:
+        return None
+    if _client is None:
+        _client = redis.Redis.from_url(url)
+    return _client
+
+
+def publish_notifications(events):
+    """
+    Publish notification events to their users' channels in one round trip
+
+    Args:
+        events: Iterable of (user id, payload dict)
+
+    Returns:
+        int: Number of events published
+    """
+    client = get_push_client()
+    if client is None:
+        return 0
+
+    published = 0
+    try:
+        pipeline = client.pipeline(transaction=False)
+        for user_id, payload in events:
+            pipeline.publish(user_channel(user_id), json.dumps(payload))
+            published += 1
+        pipeline.execute()
+    except redis.RedisError as e:
+        # Clients fall back to the count endpoint; never fail the writer
+        logger.warning(f"Notification push failed: {e}")
+        return 0
+    return published
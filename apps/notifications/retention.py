@@ -0,0 +1,87 @@
+"""
+Notification retention - keep the live table to recent rows
+
+Notifications older than the retention period are moved to the
+notifications_archive table in id-ordered batches, so the live table (and
+its indexes) stays sized to what inboxes actually show. Archived rows are
+purged once they pass the archive retention period.
+
+A rolling archive table is used instead of native partitioning: MySQL
+range partitions need the partition column in every unique key, which
+the single-column id primary key and foreign keys do not allow.
+"""
+from collections import Counter
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from apps.notifications.counters import adjust_unread_counts
+from apps.notifications.models import Notification, NotificationArchive
+
+NOTIFICATION_RETENTION_DAYS = 90
+ARCHIVE_RETENTION_DAYS = 365
+ARCHIVE_BATCH_SIZE = 5000
+
+ARCHIVED_FIELDS = (
+    'id', 'user_id', 'type', 'title', 'message', 'related_type', 'related_id',
+    'is_read', 'read_at', 'created_at',
+)
+
+
+def archive_notifications(days=NOTIFICATION_RETENTION_DAYS, batch_size=ARCHIVE_BATCH_SIZE, max_batches=None):
+    """
+    Move notifications older than `days` to the archive table in batches
+
+    Each batch is copied and deleted in one short transaction. Unread
+    counters are lowered for the unread rows that leave the inbox.
+
+    Args:
+        days: Live retention in days
+        batch_size: Rows per batch
+        max_batches: Stop after this many batches (no limit by default)
+
+    Returns:
+        int: Number of notifications archived
+    """
+    cutoff = timezone.now() - timedelta(days=days)
+    archived = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        rows = list(Notification.objects.filter(created_at__lt=cutoff).order_by('id').values(
+            *ARCHIVED_FIELDS
+        )[:batch_size])
+        if not rows:
+            break
+
+        with transaction.atomic():
+            NotificationArchive.objects.bulk_create(
+                [NotificationArchive(**row) for row in rows],
+                ignore_conflicts=True,
+            )
+            Notification.objects.filter(id__in=[row['id'] for row in rows]).delete()
+
+        unread = Counter(row['user_id'] for row in rows if not row['is_read'])
+        adjust_unread_counts({user_id: -count for user_id, count in unread.items()})
+        archived += len(rows)
+        batches += 1
+    return archived
+
+
+def purge_archive(days=ARCHIVE_RETENTION_DAYS, batch_size=ARCHIVE_BATCH_SIZE):
+    """
+    Delete archived notifications older than `days`, in batches
+
+    Returns:
+        int: Number of rows deleted
+    """
+    cutoff = timezone.now() - timedelta(days=days)
+    deleted = 0
+    while True:
+        ids = list(NotificationArchive.objects.filter(created_at__lt=cutoff).order_by('created_at').values_list(
+            'id', flat=True
+        )[:batch_size])
+        if not ids:
+            break
+        deleted += NotificationArchive.objects.filter(id__in=ids).delete()[0]
+    return deleted
@@ -0,0 +1,9 @@
+"""
+Websocket routes for the notifications app.
+"""
+from django.urls import path
+from apps.notifications import consumers
+
+websocket_urlpatterns = [
+    path('ws/notifications/', consumers.NotificationConsumer.as_asgi()),
+]
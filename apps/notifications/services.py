@@ -1,11 +1,42 @@
 """
 Notification services for sending alerts.
 """
-from django.conf import settings
-from django.core.mail import send_mail
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Max, Min
+from django.utils import timezone
 
 from apps.authentication.models import User
+from apps.notifications import counters
+from apps.notifications.digest import (
+    buffer_notification,
+    claim_closed_windows,
+    collect_window,
+    digest_content,
+    discard_window,
+    group_events,
+    release_window,
+    should_digest,
+)
 from apps.notifications.models import Notification
+from apps.notifications.outbox import enqueue_email, enqueue_emails
+from apps.notifications.push import publish_notifications
+
+NOTIFICATION_CHUNK_SIZE = 1000  # recipients per fan-out task
+
+# Types about the user's own positions; they drop the user's cached dashboard block
+POSITION_ALERT_TYPES = {'TARGET_HIT', 'STOP_LOSS_HIT', 'CALL_EXPIRED', 'PORTFOLIO_ALERT'}
+
+# Notification type -> NotificationPreferences field suffix (app_<x> / email_<x>)
+PREFERENCE_FIELDS = {
+    'CALL_PUBLISHED': 'call_published',
+    'TARGET_HIT': 'target_hit',
+    'STOP_LOSS_HIT': 'stop_loss_hit',
+    'CALL_UPDATED': 'call_updated',
+    'CALL_EXPIRED': 'call_updated',
+    'PORTFOLIO_ALERT': 'portfolio_alert',
+}
 
 
 def create_notification(user, notification_type, title, message, related_object=None):
@@ -26,40 +57,206 @@ def create_notification(user, notification_type, title, message, related_object=
         related_type=related_type,
         related_id=related_id,
     )
+    notifications_created([notification])
 
-    if hasattr(user, 'notification_preferences'):
-        prefs = user.notification_preferences
-        should_email = (
-            (notification_type == 'CALL_PUBLISHED' and prefs.email_call_published) or
-            (notification_type == 'TARGET_HIT' and prefs.email_target_hit) or
-            (notification_type == 'STOP_LOSS_HIT' and prefs.email_stop_loss_hit) or
-            (notification_type == 'CALL_EXPIRED' and prefs.email_call_updated)
-        )
-        if should_email:
-            send_email_notification(user, title, message)
+    field = PREFERENCE_FIELDS.get(notification_type)
+    if field and hasattr(user, 'notification_preferences'):
+        if getattr(user.notification_preferences, f'email_{field}'):
+            send_email_notification(user, title, message, idempotency_key=f'notification:{notification.pk}')
 
     return notification
 
 
-def send_email_notification(user, title, message):
-    """Send email notification to user."""
+def send_email_notification(user, title, message, idempotency_key=None):
+    """Queue an email notification to user (delivered by the outbox workers)."""
     try:
-        send_mail(
-            subject=title,
-            message=message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[user.email],
-            fail_silently=True,
-        )
+        enqueue_email(user.email, title, message, idempotency_key=idempotency_key)
     except Exception:
         # Notifications should not fail request/worker flow.
         return None
 
 
-def notify_call_published(research_call):
-    """Notify users when a new call is published."""
-    customers = User.objects.filter(role='CUSTOMER', is_active=True)
+def deliver_notifications(recipients, notification_type, title, message, related_object=None):
+    """
+    Notify one chunk of users with a single preferences query and a bulk INSERT
+
+    In-app rows are skipped for users who turned the type off; users who
+    opted in to email are queued in the email outbox with one INSERT. Users
+    without a preferences row get the in-app notification only. Types that
+    are digested go to the digest buffer instead (see apps.notifications.digest).
+
+    Args:
+        recipients: User queryset for this chunk
+        notification_type: Notification.TYPE_CHOICES value
+        title: Notification title
+        message: Notification body
+        related_object: Optional object the notification refers to
+
+    Returns:
+        int: Number of users notified in-app
+    """
+    field = PREFERENCE_FIELDS.get(notification_type)
+    if field:
+        rows = recipients.order_by().values_list(
+            'id', 'email', f'notification_preferences__app_{field}', f'notification_preferences__email_{field}',
+        )
+    else:
+        rows = ((user_id, email, True, False) for user_id, email in recipients.order_by().values_list('id', 'email'))
+
+    related_type = related_object.__class__.__name__ if related_object is not None else None
+    related_id = getattr(related_object, 'id', None)
+
+    app_user_ids = []
+    email_recipients = []
+    for user_id, email, app_enabled, email_enabled in rows:
+        if app_enabled is not False:
+            app_user_ids.append(user_id)
+        if email_enabled:
+            email_recipients.append((user_id, email))
+
+    if should_digest(notification_type):
+        transaction.on_commit(lambda: buffer_notification(
+            notification_type, title, message, related_type, related_id,
+            app_user_ids, [user_id for user_id, _ in email_recipients],
+        ))
+        return len(app_user_ids)
+
+    notifications = [
+        Notification(
+            user_id=user_id,
+            type=notification_type,
+            title=title,
+            message=message,
+            related_type=related_type,
+            related_id=related_id,
+        )
+        for user_id in app_user_ids
+    ]
+    Notification.objects.bulk_create(notifications, batch_size=NOTIFICATION_CHUNK_SIZE)
+    notifications_created(notifications)
+    enqueue_emails(
+        {
+            'to_email': email,
+            'subject': title,
+            'body': message,
+            # Emails queued before a failed chunk's retry are not sent twice
+            'idempotency_key': f'{notification_type}:{related_type}:{related_id}:{user_id}',
+        }
+        for user_id, email in email_recipients
+    )
+    return len(notifications)
+
+
+def flush_notification_digests(now=None):
+    """
+    Deliver the buffered events of every closed digest window
+
+    Per user and window, a single event is delivered as it is and several
+    become one DIGEST notification and one email. A window's buffer is
+    removed only after its rows are committed; if writing fails, the
+    window is released and retried by the next flush.
 
+    Args:
+        now: Current time as epoch seconds (for tests)
+
+    Returns:
+        int: Number of notifications created
+    """
+    created = 0
+    for window_id in claim_closed_windows(now):
+        try:
+            with transaction.atomic():
+                created += _deliver_window(window_id)
+                transaction.on_commit(lambda window_id=window_id: discard_window(window_id))
+        except Exception:
+            release_window(window_id)
+            raise
+    return created
+
+
+def _deliver_window(window_id):
+    """Write one digest window's notifications and queue its emails"""
+    app, email = group_events(collect_window(window_id))
+
+    notifications = []
+    for user_id, events in app.items():
+        if len(events) == 1:
+            event = events[0]
+            notifications.append(Notification(
+                user_id=user_id,
+                type=event['type'],
+                title=event['title'],
+                message=event['message'],
+                related_type=event['related_type'],
+                related_id=event['related_id'],
+            ))
+        else:
+            title, message = digest_content(events)
+            notifications.append(Notification(user_id=user_id, type='DIGEST', title=title, message=message))
+    Notification.objects.bulk_create(notifications, batch_size=NOTIFICATION_CHUNK_SIZE)
+    notifications_created(notifications)
+
+    addresses = dict(User.objects.filter(id__in=list(email)).values_list('id', 'email'))
+    emails = []
+    for user_id, events in email.items():
+        if user_id not in addresses:
+            continue
+        if len(events) == 1:
+            subject, body = events[0]['title'], events[0]['message']
+        else:
+            subject, body = digest_content(events)
+        emails.append({
+            'to_email': addresses[user_id],
+            'subject': subject,
+            'body': body,
+            'idempotency_key': f'digest:{window_id}:{user_id}',
+        })
+    enqueue_emails(emails)
+    return len(notifications)
+
+
+def notifications_created(notifications):
+    """
+    Once the transaction commits, bump the unread counters of the
+    notifications' users, drop dashboard blocks made stale by position
+    alerts and push each notification to their open sessions
+    """
+    if not notifications:
+        return
+
+    def publish():
+        from apps.dashboard.snapshot import invalidate_user_blocks
+
+        deltas = Counter(notification.user_id for notification in notifications)
+        unread = counters.adjust_unread_counts(deltas)
+        invalidate_user_blocks({
+            notification.user_id for notification in notifications
+            if notification.type in POSITION_ALERT_TYPES
+        })
+        publish_notifications(
+            (notification.user_id, {
+                'type': 'notification',
+                # No id: bulk_create does not set primary keys on MySQL
+                'notification': {
+                    'type': notification.type,
+                    'title': notification.title,
+                    'created_at': notification.created_at.isoformat(),
+                },
+                'unread_count': unread.get(notification.user_id),
+            })
+            for notification in notifications
+        )
+
+    transaction.on_commit(publish)
+
+
+def call_published_recipients():
+    """Users notified when a call is published"""
+    return User.objects.filter(role='CUSTOMER', is_active=True)
+
+
+def call_published_content(research_call):
+    """Title and message of the CALL_PUBLISHED notification"""
     title = f"New {research_call.action} Call: {research_call.symbol}"
     message = f"""
     A new research call has been published:
@@ -73,26 +270,87 @@ def notify_call_published(research_call):
 
     View details: /calls/{research_call.id}/
     """
+    return title, message
 
-    for customer in customers:
-        create_notification(
-            user=customer,
-            notification_type='CALL_PUBLISHED',
-            title=title,
-            message=message,
+
+def notify_call_published(research_call):
+    """
+    Notify users when a new call is published.
+
+    Delivery is queued for after the publishing transaction commits, so the
+    caller returns immediately; see fan_out_call_published.
+    """
+    from apps.notifications.tasks import task_notify_call_published
+
+    transaction.on_commit(lambda: task_notify_call_published.delay(research_call.id))
+
+
+def fan_out_call_published(research_call_id, chunk_size=NOTIFICATION_CHUNK_SIZE):
+    """
+    Split CALL_PUBLISHED delivery into one task per recipient id range
+
+    Args:
+        research_call_id: Published call
+        chunk_size: Width of each user id range
+
+    Returns:
+        int: Number of chunk tasks queued
+    """
+    from apps.notifications.tasks import task_deliver_call_published
+
+    bounds = call_published_recipients().aggregate(low=Min('id'), high=Max('id'))
+    if bounds['low'] is None:
+        return 0
+
+    queued = 0
+    for start in range(bounds['low'], bounds['high'] + 1, chunk_size):
+        task_deliver_call_published.delay(research_call_id, start, start + chunk_size)
+        queued += 1
+    return queued
+
+
+def deliver_call_published(research_call_id, start_id, end_id):
+    """
+    Deliver CALL_PUBLISHED notifications to recipients with start_id <= id < end_id
+
+    Users in the range who already have this call's notification are
+    skipped, so a retried chunk does not notify anyone twice.
+
+    Returns:
+        int: Number of users notified in-app
+    """
+    from apps.research_calls.models import ResearchCall
+
+    research_call = ResearchCall.objects.select_related('broker').get(pk=research_call_id)
+    title, message = call_published_content(research_call)
+    delivered = Notification.objects.filter(
+        user_id__gte=start_id,
+        user_id__lt=end_id,
+        type='CALL_PUBLISHED',
+        related_type=ResearchCall.__name__,
+        related_id=research_call.id,
+    ).values('user_id')
+    # Notifications and their emails commit together, so a failed chunk leaves nothing to skip
+    with transaction.atomic():
+        return deliver_notifications(
+            call_published_recipients().filter(id__gte=start_id, id__lt=end_id).exclude(id__in=delivered),
+            'CALL_PUBLISHED',
+            title,
+            message,
             related_object=research_call,
         )
 
 
-def notify_target_hit(research_call, target_level):
-    """Notify users when target is hit."""
-    from apps.portfolios.models import PortfolioItem
+def call_holders(research_call):
+    """Users with an active portfolio position in the call"""
+    return User.objects.filter(
+        portfolios__items__research_call=research_call,
+        portfolios__items__status='ACTIVE',
+    ).distinct()
 
-    portfolio_items = PortfolioItem.objects.filter(
-        research_call=research_call,
-        status='ACTIVE',
-    ).select_related('portfolio__user')
 
+def notify_target_hit(research_call, target_level):
+    """Notify users when target is hit."""
     title = f"Target Hit: {research_call.symbol}"
     message = f"""
     Target {target_level} has been hit for {research_call.symbol}!
@@ -103,25 +361,11 @@ def notify_target_hit(research_call, target_level):
     Consider booking profits.
     """
 
-    for item in portfolio_items:
-        create_notification(
-            user=item.portfolio.user,
-            notification_type='TARGET_HIT',
-            title=title,
-            message=message,
-            related_object=research_call,
-        )
+    deliver_notifications(call_holders(research_call), 'TARGET_HIT', title, message, related_object=research_call)
 
 
 def notify_stop_loss_hit(research_call):
     """Notify users when stop loss is hit."""
-    from apps.portfolios.models import PortfolioItem
-
-    portfolio_items = PortfolioItem.objects.filter(
-        research_call=research_call,
-        status='ACTIVE',
-    ).select_related('portfolio__user')
-
     title = f"Stop Loss Hit: {research_call.symbol}"
     message = f"""
     Stop loss has been hit for {research_call.symbol}.
@@ -132,25 +376,11 @@ def notify_stop_loss_hit(research_call):
     Consider exiting the position to limit losses.
     """
 
-    for item in portfolio_items:
-        create_notification(
-            user=item.portfolio.user,
-            notification_type='STOP_LOSS_HIT',
-            title=title,
-            message=message,
-            related_object=research_call,
-        )
+    deliver_notifications(call_holders(research_call), 'STOP_LOSS_HIT', title, message, related_object=research_call)
 
 
 def notify_call_expired(research_call):
     """Notify users when call expires."""
-    from apps.portfolios.models import PortfolioItem
-
-    portfolio_items = PortfolioItem.objects.filter(
-        research_call=research_call,
-        status='ACTIVE',
-    ).select_related('portfolio__user')
-
     title = f"Call Expired: {research_call.symbol}"
     message = f"""
     The research call for {research_call.symbol} has expired.
@@ -161,27 +391,24 @@ def notify_call_expired(research_call):
     Please review your position.
     """
 
-    for item in portfolio_items:
-        create_notification(
-            user=item.portfolio.user,
-            notification_type='CALL_EXPIRED',
-            title=title,
-            message=message,
-            related_object=research_call,
-        )
+    deliver_notifications(call_holders(research_call), 'CALL_EXPIRED', title, message, related_object=research_call)
 
 
 def mark_as_read(notification_id, user):
     """Mark notification as read."""
     try:
         notification = Notification.objects.get(id=notification_id, user=user)
-        notification.is_read = True
-        notification.save(update_fields=['is_read'])
-        return notification
     except Notification.DoesNotExist:
         return None
 
+    updated = Notification.objects.filter(pk=notification.pk, is_read=False).update(
+        is_read=True, read_at=timezone.now(),
+    )
+    counters.adjust_unread_counts({user.id: -updated})
+    notification.refresh_from_db(fields=['is_read', 'read_at'])
+    return notification
+
 
 def get_unread_count(user):
-    """Get count of unread notifications for user."""
-    return Notification.objects.filter(user=user, is_read=False).count()
+    """Get count of unread notifications for user (cached counter)."""
+    return counters.get_unread_count(user.id)
@@ -0,0 +1,111 @@
+"""
+Celery tasks for notification fan-out and email delivery
+"""
+from celery import shared_task
+import logging
+
+from django.core.exceptions import ObjectDoesNotExist
+
+from apps.authentication.models import User
+from apps.notifications.counters import reconcile_unread_counts
+from apps.notifications.outbox import drain_outbox_until_empty, purge_outbox
+from apps.notifications.retention import archive_notifications, purge_archive
+from apps.notifications.services import (
+    deliver_call_published,
+    fan_out_call_published,
+    flush_notification_digests,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def task_notify_call_published(research_call_id):
+    """Queue one delivery task per recipient id range for a published call"""
+    logger.info(f"Executing task: task_notify_call_published ({research_call_id})")
+    try:
+        queued = fan_out_call_published(research_call_id)
+        logger.info(f"Queued {queued} CALL_PUBLISHED delivery chunks")
+        return queued
+    except Exception as e:
+        logger.error(f"Error in task_notify_call_published: {e}")
+        return 0
+
+
+@shared_task(
+    bind=True,
+    acks_late=True,
+    autoretry_for=(Exception,),
+    retry_backoff=True,
+    retry_kwargs={'max_retries': 5},
+)
+def task_deliver_call_published(self, research_call_id, start_id, end_id):
+    """Create CALL_PUBLISHED notifications for one recipient id range, retrying with backoff on failure"""
+    try:
+        return deliver_call_published(research_call_id, start_id, end_id)
+    except ObjectDoesNotExist:
+        logger.warning(f"Research call {research_call_id} no longer exists; skipping chunk {start_id}-{end_id}")
+        return 0
+    except Exception as e:
+        logger.error(
+            f"Error in task_deliver_call_published ({start_id}-{end_id}, attempt {self.request.retries + 1}): {e}"
+        )
+        raise
+
+
+@shared_task
+def task_drain_email_outbox():
+    """Send due outbox emails in batches over reused SMTP connections"""
+    try:
+        stats = drain_outbox_until_empty()
+        if any(stats.values()):
+            logger.info(f"Email outbox drained: {stats}")
+        return stats['sent']
+    except Exception as e:
+        logger.error(f"Error in task_drain_email_outbox: {e}")
+        return 0
+
+
+@shared_task
+def task_reconcile_unread_counts():
+    """Correct cached unread counters that drifted from the notifications table"""
+    logger.info("Executing periodic task: task_reconcile_unread_counts")
+    try:
+        user_ids = User.objects.filter(is_active=True).order_by().values_list('id', flat=True)
+        corrected = reconcile_unread_counts(user_ids.iterator(chunk_size=2000))
+        if corrected:
+            logger.info(f"Corrected {corrected} unread notification counters")
+        return corrected
+    except Exception as e:
+        logger.error(f"Error in task_reconcile_unread_counts: {e}")
+        return 0
+
+
+@shared_task
+def task_flush_notification_digests():
+    """Deliver buffered notifications of closed digest windows"""
+    try:
+        created = flush_notification_digests()
+        if created:
+            logger.info(f"Delivered {created} digested notifications")
+        return created
+    except Exception as e:
+        logger.error(f"Error in task_flush_notification_digests: {e}")
+        return 0
+
+
+@shared_task
+def task_archive_notifications():
+    """Move old notifications to the archive table and purge expired archive and outbox rows"""
+    logger.info("Executing periodic task: task_archive_notifications")
+    try:
+        archived = archive_notifications()
+        purged = purge_archive()
+        purged_emails = purge_outbox()
+        logger.info(
+            f"Archived {archived} notifications, purged {purged} archived rows and {purged_emails} outbox emails"
+        )
+        return archived
+    except Exception as e:
+        logger.error(f"Error in task_archive_notifications: {e}")
+        return 0
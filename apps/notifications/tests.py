@@ -0,0 +1,301 @@
+"""
+Tests for notification delivery, archiving, retention, the inbox and the email outbox
+"""
+import time
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.cache import cache
+from django.core.mail.backends.locmem import EmailBackend as LocmemEmailBackend
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.brokers.models import Broker
+from apps.notifications.counters import get_unread_count, reconcile_unread_counts, unread_count_key
+from apps.notifications.models import EmailOutbox, Notification, NotificationArchive, NotificationPreferences
+from apps.notifications.outbox import MAX_ATTEMPTS, drain_outbox, enqueue_email, purge_outbox
+from apps.notifications.retention import archive_notifications, purge_archive
+from apps.notifications.services import (
+    deliver_call_published, fan_out_call_published, flush_notification_digests,
+)
+from apps.notifications.tasks import task_deliver_call_published, task_drain_email_outbox
+from apps.research_calls.models import ResearchCall
+
+User = get_user_model()
+
+
+class NotificationRetentionTest(TestCase):
+    """Test notification archiving and the keyset-paginated inbox"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            email='inbox@example.com', first_name='Test', last_name='Inbox', password='TestPass123!',
+        )
+        now = timezone.now()
+        Notification.objects.bulk_create([
+            Notification(user=self.user, type='SYSTEM', title=f'Note {i}', message='', is_read=i % 2 == 0)
+            for i in range(7)
+        ])
+        # Rows sharing a timestamp exercise the id tie-break
+        stamps = [now - timedelta(days=d) for d in (200, 120, 1, 1, 0, 0, 0)]
+        for notification, stamp in zip(Notification.objects.order_by('id'), stamps):
+            Notification.objects.filter(pk=notification.pk).update(created_at=stamp)
+
+    def test_inbox_pages_by_cursor(self):
+        self.client.force_login(self.user)
+        seen = []
+        url = '/api/notifications/?page_size=2'
+        while url:
+            data = self.client.get(url).json()
+            self.assertNotIn('count', data)
+            seen.extend(item['id'] for item in data['results'])
+            url = data['next']
+        expected = list(Notification.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+        self.assertEqual(seen, expected)
+        self.assertEqual(self.client.get('/api/notifications/?cursor=bogus').status_code, 400)
+
+    def test_old_notifications_move_to_archive(self):
+        # One of the two old rows is unread
+        self.assertEqual(get_unread_count(self.user.id), 3)
+
+        self.assertEqual(archive_notifications(days=90, batch_size=1), 2)
+        self.assertEqual(Notification.objects.count(), 5)
+        self.assertEqual(NotificationArchive.objects.count(), 2)
+        self.assertEqual(get_unread_count(self.user.id), 2)
+        self.assertEqual(archive_notifications(days=90), 0)
+
+        self.assertEqual(purge_archive(days=150), 1)
+        self.assertEqual(NotificationArchive.objects.get().title, 'Note 1')
+
+
+class CountingEmailBackend(LocmemEmailBackend):
+    """Locmem backend that counts connection opens and fails listed recipients"""
+    opened = 0
+    failing = set()
+
+    def open(self):
+        CountingEmailBackend.opened += 1
+        return True
+
+    def send_messages(self, messages):
+        if any(set(message.to) & self.failing for message in messages):
+            raise ConnectionError('mailbox unavailable')
+        return super().send_messages(messages)
+
+
+@override_settings(EMAIL_BACKEND='apps.notifications.tests.CountingEmailBackend')
+class EmailOutboxTest(TestCase):
+    """Test the batched email outbox"""
+
+    def setUp(self):
+        cache.clear()
+        CountingEmailBackend.opened = 0
+        CountingEmailBackend.failing = set()
+        self.user = User.objects.create_user(
+            email='outbox@gmail.com', first_name='Test', last_name='User', password='TestPassword123!',
+        )
+
+    def test_same_key_is_queued_once(self):
+        for _ in range(2):
+            enqueue_email(self.user.email, 'Verify', 'Link', html_body='<a>Link</a>', idempotency_key='verify:abc123')
+        enqueue_email(self.user.email, 'Hello', 'Body')
+        enqueue_email(self.user.email, 'Hello', 'Body')
+
+        self.assertEqual(EmailOutbox.objects.count(), 2)
+        row = EmailOutbox.objects.get(idempotency_key='verify:abc123')
+        self.assertEqual((row.provider, row.status), ('gmail', 'PENDING'))
+        # Nothing is sent in the calling transaction
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_batch_reuses_one_connection(self):
+        for i in range(5):
+            enqueue_email(f'user{i}@example.com', 'Hello', 'Body', kick=False)
+
+        stats = drain_outbox()
+        self.assertEqual(stats['sent'], 5)
+        self.assertEqual(CountingEmailBackend.opened, 1)
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertFalse(EmailOutbox.objects.exclude(status='SENT').exists())
+
+    def test_failures_back_off_then_fail(self):
+        CountingEmailBackend.failing = {'bounce@example.com'}
+        enqueue_email('bounce@example.com', 'Hello', 'Body', kick=False)
+        now = timezone.now()
+
+        self.assertEqual(drain_outbox(now=now)['retried'], 1)
+        row = EmailOutbox.objects.get()
+        self.assertEqual(row.attempts, 1)
+        self.assertEqual(row.next_attempt_at, now + timedelta(minutes=1))
+        # Not due again until the backoff has passed
+        self.assertEqual(drain_outbox(now=now)['retried'], 0)
+
+        for _ in range(MAX_ATTEMPTS - 1):
+            now += timedelta(hours=1)
+            drain_outbox(now=now)
+        row.refresh_from_db()
+        self.assertEqual((row.status, row.attempts), ('FAILED', MAX_ATTEMPTS))
+        self.assertIn('mailbox unavailable', row.last_error)
+
+    @override_settings(EMAIL_PROVIDER_RATE_LIMITS={'gmail': 2})
+    def test_provider_rate_limit_defers_overflow(self):
+        for i in range(3):
+            enqueue_email(f'user{i}@gmail.com', 'Hello', 'Body', kick=False)
+        enqueue_email('user@example.com', 'Hello', 'Body', kick=False)
+        now = timezone.now()
+
+        stats = drain_outbox(now=now)
+        self.assertEqual((stats['sent'], stats['deferred']), (3, 1))
+        deferred = EmailOutbox.objects.get(status='PENDING')
+        self.assertEqual(deferred.next_attempt_at, now.replace(second=0, microsecond=0) + timedelta(minutes=1))
+
+        self.assertEqual(drain_outbox(now=deferred.next_attempt_at)['sent'], 1)
+
+    def test_purge_removes_finished_rows_only(self):
+        for status in ('PENDING', 'SENDING', 'SENT', 'FAILED'):
+            enqueue_email(self.user.email, status, 'Body', kick=False)
+            EmailOutbox.objects.filter(subject=status).update(
+                status=status, next_attempt_at=timezone.now() - timedelta(days=40),
+            )
+        enqueue_email(self.user.email, 'Recent', 'Body', kick=False)
+        EmailOutbox.objects.filter(subject='Recent').update(status='SENT')
+
+        self.assertEqual(purge_outbox(days=30, batch_size=1), 2)
+        self.assertEqual(
+            sorted(EmailOutbox.objects.values_list('subject', flat=True)), ['PENDING', 'Recent', 'SENDING'],
+        )
+
+
+@override_settings(NOTIFICATION_DIGEST_WINDOW=0)
+class NotificationDeliveryTest(TestCase):
+    """Test unread counters, the inbox badge and digests of delivered notifications"""
+
+    def setUp(self):
+        cache.clear()
+        # Run the fan-out inline instead of through the broker; emails stay queued
+        self._patch_delay(task_deliver_call_published, deliver_call_published)
+        self._patch_delay(task_drain_email_outbox)
+
+        self.analyst = User.objects.create_user(
+            email='analyst@example.com', first_name='Test', last_name='Analyst',
+            password='TestPass123!', role='ANALYST',
+        )
+        self.broker = Broker.objects.create(name='Test Broker', slug='test-broker-delivery')
+        self.customers = [
+            User.objects.create_user(
+                email=f'customer{i}@example.com', first_name='Test', last_name=f'Customer{i}',
+                password='TestPass123!', role='CUSTOMER',
+            )
+            for i in range(5)
+        ]
+        # One customer muted in-app, one opted in to email
+        NotificationPreferences.objects.create(
+            user=self.customers[0], app_call_published=False, email_call_published=False,
+        )
+        NotificationPreferences.objects.create(user=self.customers[1], email_call_published=True)
+        self.call = ResearchCall.objects.create(
+            symbol='TCS', created_by=self.analyst, broker=self.broker, action='BUY',
+            call_type='SHORT_TERM', entry_price=Decimal('3500.00'), target_1=Decimal('3700.00'),
+            stop_loss=Decimal('3400.00'), timeframe_days=20, status='ACTIVE',
+        )
+
+    def _patch_delay(self, task, function=None):
+        patcher = mock.patch.object(task, 'delay', side_effect=function)
+        self.addCleanup(patcher.stop)
+        return patcher.start()
+
+    def test_unread_counters_follow_delivery_and_reads(self):
+        cache.clear()
+        reader, other = self.customers[1], self.customers[2]
+        self.assertEqual(get_unread_count(reader.id), 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            fan_out_call_published(self.call.id)
+        # Existing counters are incremented; missing ones are counted on first read
+        self.assertEqual(cache.get(unread_count_key(reader.id)), 1)
+        self.assertIsNone(cache.get(unread_count_key(other.id)))
+        self.assertEqual(get_unread_count(other.id), 1)
+
+        self.client.force_login(reader)
+        self.client.post('/api/notifications/mark-all-read/')
+        self.assertEqual(self.client.get('/api/notifications/unread-count/').json(), {'unread_count': 0})
+
+        cache.set(unread_count_key(other.id), 5)
+        self.assertEqual(reconcile_unread_counts([reader.id, other.id]), 1)
+        self.assertEqual(get_unread_count(other.id), 1)
+
+    def test_badge_uses_socket_only_with_push(self):
+        self.client.force_login(self.customers[1])
+        with override_settings(NOTIFICATION_PUSH_URL=''):
+            response = self.client.get(reverse('dashboard:dashboard'))
+        self.assertContains(response, 'data-unread-badge')
+        self.assertNotContains(response, 'data-push')
+
+        with override_settings(NOTIFICATION_PUSH_URL='redis://localhost:6379/2'):
+            self.assertContains(self.client.get(reverse('dashboard:dashboard')), 'data-push')
+
+    @override_settings(NOTIFICATION_DIGEST_WINDOW=60)
+    def test_bursts_are_digested_per_user(self):
+        cache.clear()
+        second = ResearchCall.objects.create(
+            symbol='INFY', created_by=self.analyst, broker=self.broker, action='BUY',
+            call_type='SHORT_TERM', entry_price=Decimal('1500.00'), target_1=Decimal('1600.00'),
+            stop_loss=Decimal('1450.00'), timeframe_days=20, status='ACTIVE',
+        )
+        first, last = self.customers[0].id, self.customers[-1].id
+        window_start = int(time.time()) // 60 * 60
+
+        with mock.patch('apps.notifications.digest.time.time', return_value=window_start + 5):
+            with self.captureOnCommitCallbacks(execute=True):
+                deliver_call_published(self.call.id, first, last + 1)
+                deliver_call_published(second.id, first, last + 1)
+            self.assertFalse(Notification.objects.exists())
+            # The window is still open
+            self.assertEqual(flush_notification_digests(), 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(flush_notification_digests(now=window_start + 75), 4)
+        self.assertEqual(flush_notification_digests(now=window_start + 75), 0)
+
+        digests = Notification.objects.filter(type='DIGEST')
+        self.assertEqual(set(digests.values_list('user_id', flat=True)), {c.id for c in self.customers[1:]})
+        self.assertEqual(digests.first().title, '2 updates: 2 new calls')
+        self.assertIn('New BUY Call: INFY', digests.first().message)
+        # One email for the two calls
+        self.assertEqual(list(EmailOutbox.objects.values_list('to_email', flat=True)), [self.customers[1].email])
+
+    @override_settings(NOTIFICATION_DIGEST_WINDOW=60)
+    def test_failed_flush_keeps_the_buffer(self):
+        cache.clear()
+        first, last = self.customers[0].id, self.customers[-1].id
+        window_start = int(time.time()) // 60 * 60
+        with mock.patch('apps.notifications.digest.time.time', return_value=window_start + 5):
+            with self.captureOnCommitCallbacks(execute=True):
+                deliver_call_published(self.call.id, first, last + 1)
+
+        with mock.patch('apps.notifications.services.enqueue_emails', side_effect=RuntimeError('outbox down')):
+            with self.assertRaises(RuntimeError):
+                flush_notification_digests(now=window_start + 75)
+        self.assertFalse(Notification.objects.exists())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(flush_notification_digests(now=window_start + 75), 4)
+        self.assertEqual(EmailOutbox.objects.count(), 1)
+
+    @override_settings(NOTIFICATION_DIGEST_WINDOW=60)
+    def test_windows_past_the_lookback_are_logged(self):
+        cache.clear()
+        first, last = self.customers[0].id, self.customers[-1].id
+        window_start = int(time.time()) // 60 * 60
+        with mock.patch('apps.notifications.digest.time.time', return_value=window_start + 5):
+            with self.captureOnCommitCallbacks(execute=True):
+                deliver_call_published(self.call.id, first, last + 1)
+
+        with self.assertLogs('apps.notifications.digest', level='WARNING') as logs:
+            self.assertEqual(flush_notification_digests(now=window_start + 75 + 60 * 12), 0)
+        self.assertIn('1 buffered deliveries', logs.output[0])
+        self.assertFalse(Notification.objects.exists())
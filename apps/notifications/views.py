@@ -11,6 +11,8 @@ from django.views import View
 from rest_framework import generics, permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from apps.core.pagination import KeysetPagination
+from apps.notifications.counters import adjust_unread_counts, get_unread_count, reset_unread_count
 from apps.notifications.models import Notification, NotificationPreferences
 from apps.notifications.serializers import (
     NotificationSerializer,
@@ -30,13 +32,21 @@ class NotificationsPageView(View):
         return render(request, 'notifications/list.html')
 
 
+class NotificationPagination(KeysetPagination):
+    """Inbox pages seek on (created_at, id), so deep pages cost the same as the first"""
+    field = 'created_at'
+    page_size = 20
+
+
 class NotificationListView(generics.ListAPIView):
     """
     GET /api/notifications/
-    Returns current user's notifications (paginated), newest first.
+    Returns current user's notifications newest first, paginated by
+    ?cursor= (see the response's next / next_cursor).
     """
     serializer_class = NotificationListSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = NotificationPagination
 
     def get_queryset(self):
         qs = Notification.objects.filter(
@@ -65,6 +75,7 @@ class NotificationMarkReadView(APIView):
             user=request.user,
             is_read=False,
         ).update(is_read=True, read_at=timezone.now())
+        adjust_unread_counts({request.user.id: -updated})
         return Response({'marked_read': updated})
 
 
@@ -80,6 +91,7 @@ class NotificationMarkAllReadView(APIView):
             user=request.user,
             is_read=False,
         ).update(is_read=True, read_at=timezone.now())
+        reset_unread_count(request.user.id)
         return Response({'marked_read': updated})
 
 
@@ -99,10 +111,10 @@ class NotificationPreferencesView(generics.RetrieveUpdateAPIView):
 class UnreadNotificationCountView(APIView):
     """
     GET /api/notifications/unread-count/
-    Returns count of unread notifications for the current user.
+    Returns count of unread notifications for the current user, from the
+    cached counter (open pages get updates over /ws/notifications/ instead).
     """
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
-        count = Notification.objects.filter(user=request.user, is_read=False).count()
-        return Response({'unread_count': count})
+        return Response({'unread_count': get_unread_count(request.user.id)})
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.11 on 2026-10-18 10:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0002_alter_payment_razorpay_order_id'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['created_at'], name='payments_created_e3a130_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+"""
+Django management command to precompute portfolio risk analytics
+"""
+from django.core.management.base import BaseCommand
+
+from apps.portfolios.risk import RISK_BATCH_CHUNK_SIZE, compute_all_portfolio_risk, refresh_risk_bars
+
+
+class Command(BaseCommand):
+    help = 'Compute and cache risk analytics for every portfolio across a process pool'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=None, help='Worker processes (CPU count by default)')
+        parser.add_argument('--chunk-size', type=int, default=RISK_BATCH_CHUNK_SIZE, help='Holdings per worker task')
+        parser.add_argument('--skip-bars', action='store_true', help='Use the stored daily bars without refreshing them')
+
+    def handle(self, *args, **options):
+        if not options['skip_bars']:
+            bars = refresh_risk_bars()
+            self.stdout.write(self.style.SUCCESS(f'✓ Stored {bars} daily bars'))
+
+        computed = compute_all_portfolio_risk(processes=options['processes'], chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f'✓ Computed risk for {computed} distinct holdings'))
@@ -0,0 +1,82 @@
+# Generated by Django 5.2.11 on 2026-10-18 12:40
+
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import Case, Count, DecimalField, ExpressionWrapper, F, OuterRef, Q, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+
+
+def backfill_portfolio_summary(apps, schema_editor):
+    Portfolio = apps.get_model('portfolios', 'Portfolio')
+    PortfolioItem = apps.get_model('portfolios', 'PortfolioItem')
+
+    def items_aggregate(function, source, condition):
+        totals = PortfolioItem.objects.filter(condition, portfolio=OuterRef('pk')).order_by().values(
+            'portfolio'
+        ).annotate(total=function(source)).values('total')[:1]
+        if function is Count:
+            return Coalesce(Subquery(totals), Value(0))
+        return Coalesce(Subquery(totals), Value(Decimal('0.00')), output_field=DecimalField(max_digits=15, decimal_places=2))
+
+    Portfolio.objects.update(
+        total_invested=items_aggregate(Sum, 'invested_amount', Q(status='ACTIVE')),
+        current_value=items_aggregate(Sum, 'current_value', Q(status='ACTIVE')),
+        realized_pnl=items_aggregate(Sum, 'profit_loss', Q(status='CLOSED')),
+        active_positions=items_aggregate(Count, 'id', Q(status='ACTIVE')),
+        closed_positions=items_aggregate(Count, 'id', Q(status='CLOSED')),
+        winning_trades=items_aggregate(Count, 'id', Q(status='CLOSED', profit_loss__gt=0)),
+        losing_trades=items_aggregate(Count, 'id', Q(status='CLOSED', profit_loss__lt=0)),
+    )
+    Portfolio.objects.update(
+        profit_loss=F('current_value') - F('total_invested'),
+        profit_loss_percentage=Case(
+            When(total_invested__gt=0, then=ExpressionWrapper(
+                (F('current_value') - F('total_invested')) * Value(100.0) / F('total_invested'),
+                output_field=DecimalField(max_digits=15, decimal_places=2),
+            )),
+            default=Value(Decimal('0.00')),
+            output_field=DecimalField(max_digits=10, decimal_places=2),
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolios', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='portfolio',
+            name='active_positions',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='portfolio',
+            name='closed_positions',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='portfolio',
+            name='losing_trades',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='portfolio',
+            name='realized_pnl',
+            field=models.DecimalField(decimal_places=2, default=0.0, max_digits=15),
+        ),
+        migrations.AddField(
+            model_name='portfolio',
+            name='winning_trades',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name='portfolioitem',
+            name='status',
+            field=models.CharField(choices=[('ACTIVE', 'Active'), ('CLOSED', 'Closed')], default='ACTIVE', max_length=20),
+        ),
+        migrations.RunPython(backfill_portfolio_summary, migrations.RunPython.noop),
+    ]
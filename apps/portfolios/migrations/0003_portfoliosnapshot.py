@@ -0,0 +1,30 @@
+# Generated by Django 5.2.11 on 2026-10-18 15:40
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolios', '0002_portfolio_summary_fields'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PortfolioSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('snapshot_date', models.DateField()),
+                ('market_value', models.DecimalField(decimal_places=2, default=0.0, max_digits=15)),
+                ('invested_amount', models.DecimalField(decimal_places=2, default=0.0, max_digits=15)),
+                ('cash_flow', models.DecimalField(decimal_places=2, default=0.0, max_digits=15)),
+                ('portfolio', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='snapshots', to='portfolios.portfolio')),
+            ],
+            options={
+                'db_table': 'portfolio_snapshots',
+                'ordering': ['snapshot_date'],
+                'unique_together': {('portfolio', 'snapshot_date')},
+            },
+        ),
+    ]
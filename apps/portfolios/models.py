@@ -16,6 +16,11 @@ class Portfolio(models.Model):
     current_value = models.DecimalField(max_digits=15, decimal_places=2, default=0.00)
     profit_loss = models.DecimalField(max_digits=15, decimal_places=2, default=0.00)
     profit_loss_percentage = models.DecimalField(max_digits=10, decimal_places=2, default=0.00)
+    realized_pnl = models.DecimalField(max_digits=15, decimal_places=2, default=0.00)
+    active_positions = models.PositiveIntegerField(default=0)
+    closed_positions = models.PositiveIntegerField(default=0)
+    winning_trades = models.PositiveIntegerField(default=0)
+    losing_trades = models.PositiveIntegerField(default=0)
     
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
@@ -112,3 +117,25 @@ class PortfolioItem(models.Model):
                     self.profit_loss_percentage = (self.profit_loss / self.invested_amount) * 100
         
         super().save(*args, **kwargs)
+
+
+class PortfolioSnapshot(models.Model):
+    """End-of-day portfolio valuation - one row per portfolio per day"""
+    
+    portfolio = models.ForeignKey(Portfolio, on_delete=models.CASCADE, related_name='snapshots')
+    snapshot_date = models.DateField()
+    
+    # Open positions at the close
+    market_value = models.DecimalField(max_digits=15, decimal_places=2, default=0.00)
+    invested_amount = models.DecimalField(max_digits=15, decimal_places=2, default=0.00)
+    
+    # Money put in (new positions) minus money taken out (exit proceeds) that day
+    cash_flow = models.DecimalField(max_digits=15, decimal_places=2, default=0.00)
+    
+    class Meta:
+        db_table = 'portfolio_snapshots'
+        unique_together = [['portfolio', 'snapshot_date']]
+        ordering = ['snapshot_date']
+    
+    def __str__(self):
+        return f"Portfolio {self.portfolio_id} @ {self.snapshot_date}: {self.market_value}"
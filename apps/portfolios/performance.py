@@ -0,0 +1,256 @@
+"""
+Portfolio valuation history - end-of-day snapshots, XIRR and time-weighted return
+
+The end-of-day job writes one PortfolioSnapshot row per portfolio from the
+denormalized Portfolio totals, so a performance chart reads a few hundred
+compact rows instead of replaying every historical item. Returns are
+computed over those series with NumPy and cached per portfolio until the
+next snapshot lands.
+"""
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+import numpy as np
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import DecimalField, ExpressionWrapper, F, Max, Sum
+from django.utils import timezone
+
+from apps.portfolios.models import Portfolio, PortfolioItem, PortfolioSnapshot
+
+SNAPSHOT_CHUNK_SIZE = 2000
+PERFORMANCE_CACHE_TTL = 86400  # 24 hours; the key changes with every new snapshot
+
+XIRR_MAX_ITERATIONS = 50
+XIRR_TOLERANCE = 1e-7
+# Annual rates scanned to bracket the root when Newton's method does not converge
+XIRR_RATE_GRID = np.concatenate([np.linspace(-0.99, 1, 200), np.linspace(1.05, 10, 180)])
+
+
+def daily_cash_flows(snapshot_date):
+    """
+    Net money put into each portfolio on a day
+
+    Args:
+        snapshot_date: Day to total
+
+    Returns:
+        dict: portfolio id -> invested amount of new positions minus exit proceeds
+    """
+    flows = defaultdict(Decimal)
+    bought = PortfolioItem.objects.filter(entry_date=snapshot_date).order_by().values(
+        'portfolio'
+    ).annotate(total=Sum('invested_amount'))
+    for row in bought:
+        flows[row['portfolio']] += row['total']
+
+    proceeds = ExpressionWrapper(F('exit_price') * F('quantity'), output_field=DecimalField(max_digits=15, decimal_places=2))
+    exited = PortfolioItem.objects.filter(status='CLOSED', exit_date=snapshot_date).order_by().values(
+        'portfolio'
+    ).annotate(total=Sum(proceeds))
+    for row in exited:
+        flows[row['portfolio']] -= row['total'] or Decimal('0.00')
+    return flows
+
+
+def snapshot_portfolios(snapshot_date=None, chunk_size=SNAPSHOT_CHUNK_SIZE):
+    """
+    Write today's valuation row for every portfolio in bulk
+
+    Values come from the denormalized Portfolio totals (run after the
+    mark-to-market job). Re-running on the same day overwrites that day's rows.
+
+    Args:
+        snapshot_date: Valuation date (defaults to today)
+        chunk_size: Rows per INSERT
+
+    Returns:
+        int: Number of snapshots written
+    """
+    snapshot_date = snapshot_date or timezone.localdate()
+    flows = daily_cash_flows(snapshot_date)
+
+    kwargs = {
+        'update_conflicts': True,
+        'update_fields': ['market_value', 'invested_amount', 'cash_flow'],
+    }
+    # MySQL's ON DUPLICATE KEY UPDATE does not take a conflict target
+    if connection.features.supports_update_conflicts_with_target:
+        kwargs['unique_fields'] = ['portfolio', 'snapshot_date']
+
+    written = 0
+    batch = []
+    portfolios = Portfolio.objects.order_by().values_list('id', 'current_value', 'total_invested')
+    for portfolio_id, current_value, total_invested in portfolios.iterator(chunk_size=chunk_size):
+        batch.append(PortfolioSnapshot(
+            portfolio_id=portfolio_id,
+            snapshot_date=snapshot_date,
+            market_value=current_value,
+            invested_amount=total_invested,
+            cash_flow=flows.get(portfolio_id, Decimal('0.00')),
+        ))
+        if len(batch) >= chunk_size:
+            PortfolioSnapshot.objects.bulk_create(batch, **kwargs)
+            written += len(batch)
+            batch = []
+    if batch:
+        PortfolioSnapshot.objects.bulk_create(batch, **kwargs)
+        written += len(batch)
+    return written
+
+
+def time_weighted_return(values, flows):
+    """
+    Chain-linked time-weighted return of a daily valuation series
+
+    Each day's flow is treated as arriving at the start of the day, so the
+    day's return is value / (previous value + flow) - 1. Days with nothing
+    invested at the start are skipped.
+
+    Args:
+        values: Closing values, oldest first
+        flows: Net money put in on each day
+
+    Returns:
+        float: Cumulative return as a fraction, or None if there is no history
+    """
+    values = np.asarray(values, dtype=float)
+    flows = np.asarray(flows, dtype=float)
+    if len(values) < 2:
+        return None
+
+    base = values[:-1] + flows[1:]
+    valid = base > 0
+    if not valid.any():
+        return None
+    return float(np.prod(values[1:][valid] / base[valid]) - 1)
+
+
+def xirr(days, amounts):
+    """
+    Annualized money-weighted return of dated cash flows
+
+    Newton's method on the NPV; if it fails to converge, the NPV is evaluated
+    over a grid of rates in one matrix operation to bracket the root, which is
+    then refined by bisection.
+
+    Args:
+        days: Day offset of each flow from the first one
+        amounts: Flows from the investor's side (money in negative, money out positive)
+
+    Returns:
+        float: Annual rate as a fraction, or None if the flows have no root
+    """
+    years = np.asarray(days, dtype=float) / 365.0
+    amounts = np.asarray(amounts, dtype=float)
+    if years[-1] <= 0 or not ((amounts > 0).any() and (amounts < 0).any()):
+        return None
+
+    def npv(rate):
+        return np.sum(amounts * (1.0 + rate) ** -years)
+
+    rate = 0.1
+    for _ in range(XIRR_MAX_ITERATIONS):
+        discount = (1.0 + rate) ** -years
+        value = np.sum(amounts * discount)
+        slope = np.sum(-years * amounts * discount / (1.0 + rate))
+        if slope == 0:
+            break
+        step = value / slope
+        rate -= step
+        if rate <= -1:
+            break
+        if abs(step) < XIRR_TOLERANCE:
+            return float(rate)
+
+    grid = (amounts * (1.0 + XIRR_RATE_GRID[:, None]) ** -years).sum(axis=1)
+    crossings = np.nonzero(np.sign(grid[:-1]) != np.sign(grid[1:]))[0]
+    if not len(crossings):
+        return None
+    low, high = XIRR_RATE_GRID[crossings[0]], XIRR_RATE_GRID[crossings[0] + 1]
+    low_value = npv(low)
+    for _ in range(100):
+        mid = (low + high) / 2
+        mid_value = npv(mid)
+        if abs(high - low) < XIRR_TOLERANCE:
+            break
+        if np.sign(mid_value) == np.sign(low_value):
+            low, low_value = mid, mid_value
+        else:
+            high = mid
+    return float((low + high) / 2)
+
+
+def compute_performance(dates, values, flows):
+    """
+    XIRR and time-weighted return of a snapshot series
+
+    The first snapshot's value stands in for the opening investment, so
+    returns are measured from the start of the recorded history.
+
+    Args:
+        dates: Snapshot dates, oldest first
+        values: Market value per snapshot
+        flows: Cash flow per snapshot
+
+    Returns:
+        dict: {'twr', 'xirr'} as percentages (None when not computable)
+    """
+    if not dates:
+        return {'twr': None, 'xirr': None}
+
+    values = np.asarray(values, dtype=float)
+    flows = np.asarray(flows, dtype=float)
+    days = np.array([(day - dates[0]).days for day in dates], dtype=float)
+
+    investor_flows = -flows
+    investor_flows[0] = -values[0]
+    investor_flows[-1] += values[-1]
+
+    twr = time_weighted_return(values, flows)
+    rate = xirr(days, investor_flows)
+    return {
+        'twr': round(twr * 100, 2) if twr is not None else None,
+        'xirr': round(rate * 100, 2) if rate is not None else None,
+    }
+
+
+def get_portfolio_performance(portfolio, days=None):
+    """
+    Valuation history plus XIRR and TWR for one portfolio, cached per snapshot
+
+    Args:
+        portfolio: Portfolio instance
+        days: Limit the history to the last N days (all history by default)
+
+    Returns:
+        dict: {'as_of', 'series': [{'date', 'value', 'invested'}], 'twr', 'xirr'}
+    """
+    snapshots = PortfolioSnapshot.objects.filter(portfolio=portfolio)
+    as_of = snapshots.aggregate(latest=Max('snapshot_date'))['latest']
+    if as_of is None:
+        return {'as_of': None, 'series': [], 'twr': None, 'xirr': None}
+
+    cache_key = f'portfolios:performance:{portfolio.pk}:{as_of.isoformat()}:{days or "all"}'
+    performance = cache.get(cache_key)
+    if performance is not None:
+        return performance
+
+    if days:
+        snapshots = snapshots.filter(snapshot_date__gt=as_of - timedelta(days=days))
+    rows = list(snapshots.order_by('snapshot_date').values_list(
+        'snapshot_date', 'market_value', 'invested_amount', 'cash_flow'
+    ))
+    dates, values, invested, flows = (list(column) for column in zip(*rows))
+
+    performance = {
+        'as_of': as_of.isoformat(),
+        'series': [
+            {'date': day.isoformat(), 'value': float(value), 'invested': float(amount)}
+            for day, value, amount in zip(dates, values, invested)
+        ],
+        **compute_performance(dates, values, flows),
+    }
+    cache.set(cache_key, performance, PERFORMANCE_CACHE_TTL)
+    return performance
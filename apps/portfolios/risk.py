@@ -0,0 +1,298 @@
+"""
+Portfolio risk analytics - volatility, beta, VaR, max drawdown and correlations
+
+Risk is computed from the stored DailyBar closes. One query loads the price
+matrix for the held symbols plus the NIFTY 50 benchmark; each portfolio is
+then a few NumPy operations over its columns. Results are cached per
+holdings hash and date, so portfolios holding the same positions share one
+entry and nothing is recomputed until the holdings or the day change.
+"""
+import hashlib
+import multiprocessing
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+from statistics import NormalDist
+
+import numpy as np
+from django.core.cache import cache
+from django.utils import timezone
+
+from apps.market_data.models import DailyBar
+from apps.portfolios.models import PortfolioItem
+
+BENCHMARK_SYMBOL = 'NIFTY50'
+RISK_LOOKBACK_DAYS = 365  # calendar days of bars (~250 sessions)
+TRADING_DAYS_PER_YEAR = 252
+VAR_CONFIDENCE = 0.95
+MIN_RETURN_OBSERVATIONS = 20
+RISK_CACHE_TTL = 86400  # 24 hours; the key also carries the date
+RISK_BATCH_CHUNK_SIZE = 200  # holdings per worker task
+
+RISK_METRICS = ('volatility', 'beta', 'var_historical', 'var_parametric', 'max_drawdown')
+
+# Price history shared with pool workers (set by _init_worker)
+_worker_history = None
+
+
+def load_holdings(portfolio_ids=None):
+    """
+    Open positions of each portfolio in one query
+
+    Args:
+        portfolio_ids: Portfolios to load (all portfolios by default)
+
+    Returns:
+        dict: portfolio id -> {symbol: quantity}
+    """
+    items = PortfolioItem.objects.filter(status='ACTIVE')
+    if portfolio_ids is not None:
+        items = items.filter(portfolio_id__in=portfolio_ids)
+
+    holdings = defaultdict(lambda: defaultdict(int))
+    for portfolio_id, symbol, quantity in items.order_by().values_list(
+        'portfolio_id', 'research_call__symbol', 'quantity'
+    ):
+        holdings[portfolio_id][symbol] += quantity
+    return {portfolio_id: dict(positions) for portfolio_id, positions in holdings.items()}
+
+
+def risk_cache_key(positions, as_of):
+    """Cache key for a set of positions on a date"""
+    holdings = ';'.join(f'{symbol}:{quantity}' for symbol, quantity in sorted(positions.items()))
+    return f'portfolios:risk:{hashlib.md5(holdings.encode()).hexdigest()}:{as_of.isoformat()}'
+
+
+def load_price_history(symbols, as_of):
+    """
+    Daily close matrix for symbols over the lookback window, in one query
+
+    Missing sessions are forward-filled; days before a symbol's first bar
+    give it a zero return.
+
+    Args:
+        symbols: Symbols (and index codes) to load
+        as_of: Last date of the window
+
+    Returns:
+        dict: {'symbols': [...], 'returns': (days x symbols) array, 'last_close': array}
+    """
+    rows = list(DailyBar.objects.filter(
+        symbol__in=set(symbols),
+        trade_date__gt=as_of - timedelta(days=RISK_LOOKBACK_DAYS),
+        trade_date__lte=as_of,
+    ).order_by().values_list('trade_date', 'symbol', 'close'))
+
+    dates = sorted({row[0] for row in rows})
+    columns = sorted({row[1] for row in rows})
+    date_index = {day: i for i, day in enumerate(dates)}
+    column_index = {symbol: j for j, symbol in enumerate(columns)}
+
+    prices = np.full((len(dates), len(columns)), np.nan)
+    for day, symbol, close in rows:
+        prices[date_index[day], column_index[symbol]] = float(close)
+
+    # Forward-fill gaps with the last seen close
+    filled = np.where(np.isnan(prices), 0, np.arange(len(dates))[:, None])
+    prices = prices[np.maximum.accumulate(filled, axis=0), np.arange(len(columns))]
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        returns = prices[1:] / prices[:-1] - 1
+    return {
+        'symbols': columns,
+        'returns': np.nan_to_num(returns, nan=0.0, posinf=0.0, neginf=0.0),
+        'last_close': prices[-1] if len(dates) else np.array([]),
+    }
+
+
+def compute_risk_metrics(returns, weights, benchmark=None, confidence=VAR_CONFIDENCE):
+    """
+    Risk metrics of a weighted portfolio from a returns matrix
+
+    Args:
+        returns: (days x holdings) daily returns
+        weights: Holding weights summing to 1
+        benchmark: Benchmark daily returns over the same days (for beta)
+        confidence: VaR confidence level
+
+    Returns:
+        dict: Annualized volatility, beta, 1-day historical and parametric
+            VaR and max drawdown (percentages except beta), plus the
+            holdings' correlation matrix
+    """
+    portfolio = returns @ weights
+    daily_volatility = portfolio.std(ddof=1)
+    z_score = NormalDist().inv_cdf(1 - confidence)
+
+    growth = np.cumprod(1 + portfolio)
+    drawdown = growth / np.maximum.accumulate(growth) - 1
+
+    beta = None
+    if benchmark is not None and benchmark.var(ddof=1) > 0:
+        beta = round(float(np.cov(portfolio, benchmark)[0, 1] / benchmark.var(ddof=1)), 2)
+
+    if returns.shape[1] > 1:
+        with np.errstate(invalid='ignore', divide='ignore'):
+            correlation = np.nan_to_num(np.corrcoef(returns, rowvar=False))
+    else:
+        correlation = np.ones((1, 1))
+
+    return {
+        'volatility': round(float(daily_volatility * np.sqrt(TRADING_DAYS_PER_YEAR) * 100), 2),
+        'beta': beta,
+        'var_historical': round(float(-np.percentile(portfolio, (1 - confidence) * 100) * 100), 2),
+        'var_parametric': round(float(-(portfolio.mean() + z_score * daily_volatility) * 100), 2),
+        'max_drawdown': round(float(drawdown.min() * 100), 2),
+        'correlation': np.round(correlation, 4).tolist(),
+    }
+
+
+def risk_for_positions(positions, history, as_of):
+    """
+    Risk of one set of positions against a loaded price history
+
+    Holdings are weighted by quantity times the last stored close; symbols
+    without bars (e.g. derivatives) are left out and listed as unpriced.
+
+    Args:
+        positions: {symbol: quantity}
+        history: Output of load_price_history
+        as_of: Date the history ends on
+
+    Returns:
+        dict: Metrics (None when there is too little history) plus
+            'symbols', 'unpriced', 'observations' and 'as_of'
+    """
+    column_index = {symbol: j for j, symbol in enumerate(history['symbols'])}
+    priced = sorted(symbol for symbol in positions if symbol in column_index)
+    result = {
+        'as_of': as_of.isoformat(),
+        'symbols': priced,
+        'unpriced': sorted(symbol for symbol in positions if symbol not in column_index),
+        'observations': len(history['returns']),
+        'correlation': [],
+        **dict.fromkeys(RISK_METRICS),
+    }
+    if not priced or len(history['returns']) < MIN_RETURN_OBSERVATIONS:
+        return result
+
+    columns = [column_index[symbol] for symbol in priced]
+    values = history['last_close'][columns] * np.array([positions[symbol] for symbol in priced], dtype=float)
+    if values.sum() <= 0:
+        return result
+
+    benchmark = None
+    if BENCHMARK_SYMBOL in column_index:
+        benchmark = history['returns'][:, column_index[BENCHMARK_SYMBOL]]
+
+    result.update(compute_risk_metrics(history['returns'][:, columns], values / values.sum(), benchmark))
+    return result
+
+
+def get_portfolio_risk(portfolio, as_of=None):
+    """
+    Risk analytics for one portfolio, cached per holdings hash and date
+
+    Args:
+        portfolio: Portfolio instance
+        as_of: Last date of the history (defaults to today)
+
+    Returns:
+        dict: See risk_for_positions (None when the portfolio has no open positions)
+    """
+    as_of = as_of or timezone.localdate()
+    positions = load_holdings([portfolio.pk]).get(portfolio.pk)
+    if not positions:
+        return None
+
+    cache_key = risk_cache_key(positions, as_of)
+    risk = cache.get(cache_key)
+    if risk is None:
+        history = load_price_history([*positions, BENCHMARK_SYMBOL], as_of)
+        risk = risk_for_positions(positions, history, as_of)
+        cache.set(cache_key, risk, RISK_CACHE_TTL)
+    return risk
+
+
+def _risk_chunk(jobs, history, as_of):
+    return {key: risk_for_positions(positions, history, as_of) for key, positions in jobs}
+
+
+def _init_worker(history):
+    global _worker_history
+    _worker_history = history
+
+
+def _risk_chunk_in_worker(jobs, as_of):
+    return _risk_chunk(jobs, _worker_history, as_of)
+
+
+def compute_all_portfolio_risk(as_of=None, processes=None, chunk_size=RISK_BATCH_CHUNK_SIZE):
+    """
+    Precompute and cache risk for every portfolio (nightly batch)
+
+    Identical holdings are computed once. The price history is loaded with a
+    single query and handed to a process pool once per worker; the pool is
+    skipped when running inside a daemonic process (e.g. a Celery prefork
+    worker), which may not start children.
+
+    Args:
+        as_of: Last date of the history (defaults to today)
+        processes: Pool size (CPU count by default; 1 runs inline)
+        chunk_size: Holdings per worker task
+
+    Returns:
+        int: Number of distinct holdings computed
+    """
+    as_of = as_of or timezone.localdate()
+    pending = {}
+    for positions in load_holdings().values():
+        pending.setdefault(risk_cache_key(positions, as_of), positions)
+    for key in cache.get_many(list(pending)):
+        del pending[key]
+    if not pending:
+        return 0
+
+    symbols = {symbol for positions in pending.values() for symbol in positions}
+    history = load_price_history(symbols | {BENCHMARK_SYMBOL}, as_of)
+
+    jobs = list(pending.items())
+    chunks = [jobs[start:start + chunk_size] for start in range(0, len(jobs), chunk_size)]
+    if processes == 1 or len(chunks) == 1 or multiprocessing.current_process().daemon:
+        results = [_risk_chunk(chunk, history, as_of) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker, initargs=(history,)) as pool:
+            results = list(pool.map(_risk_chunk_in_worker, chunks, [as_of] * len(chunks)))
+
+    computed = {}
+    for result in results:
+        computed.update(result)
+    cache.set_many(computed, RISK_CACHE_TTL)
+    return len(computed)
+
+
+def refresh_risk_bars():
+    """
+    Store the latest daily bars for every held symbol and the benchmark
+
+    Symbols with no stored history get a full lookback window; the rest
+    only the last few sessions.
+
+    Returns:
+        int: Number of bars written
+    """
+    from apps.market_data.services import store_daily_bars
+
+    symbols = set(PortfolioItem.objects.filter(status='ACTIVE').order_by().values_list(
+        'research_call__symbol', flat=True
+    ).distinct()) | {BENCHMARK_SYMBOL}
+    stored = set(DailyBar.objects.filter(symbol__in=symbols).order_by().values_list(
+        'symbol', flat=True
+    ).distinct())
+
+    written = 0
+    if symbols - stored:
+        written += store_daily_bars(symbols - stored, period='1y')
+    if stored:
+        written += store_daily_bars(stored, period='5d')
+    return written
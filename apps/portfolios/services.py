@@ -1,12 +1,21 @@
 """
 Portfolio services - Business logic for portfolio operations
 """
+from collections import defaultdict
 from django.db import transaction
+from django.db.models import (
+    Case, Count, DecimalField, ExpressionWrapper, F, Max, Min, OuterRef, Q, Subquery, Sum, Value, When,
+)
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 from decimal import Decimal
 from apps.portfolios.models import Portfolio, PortfolioItem
+from apps.research_calls.models import ResearchCall
 from apps.audit.models import AuditLog
 
+MTM_SYMBOL_CHUNK_SIZE = 200        # symbols priced per UPDATE
+PORTFOLIO_TOTALS_CHUNK_SIZE = 5000  # portfolios (by id range) per UPDATE
+
 
 @transaction.atomic
 def add_to_portfolio(user, research_call, entry_price, quantity, entry_date=None):
@@ -53,6 +62,13 @@ def add_to_portfolio(user, research_call, entry_price, quantity, entry_date=None
         # invested_amount will be calculated in save()
     )
     
+    _apply_portfolio_delta(
+        portfolio.pk,
+        total_invested=item.invested_amount,
+        current_value=item.current_value,
+        active_positions=1,
+    )
+    
     # Audit log
     # Audit log
     AuditLog.objects.create(
@@ -87,6 +103,7 @@ def exit_position(portfolio_item, exit_price, exit_date=None, exit_by=None):
     if portfolio_item.status != 'ACTIVE':
         raise ValueError('Can only exit active positions')
     
+    exit_price = Decimal(str(exit_price))
     portfolio_item.exit_price = exit_price
     portfolio_item.exit_date = exit_date or timezone.now().date()
     portfolio_item.status = 'CLOSED'
@@ -95,6 +112,19 @@ def exit_position(portfolio_item, exit_price, exit_date=None, exit_by=None):
     portfolio_item.calculate_pnl()
     portfolio_item.save()
     
+    # Move the position from the open totals to the realized ones
+    pnl = portfolio_item.profit_loss
+    _apply_portfolio_delta(
+        portfolio_item.portfolio_id,
+        total_invested=-portfolio_item.invested_amount,
+        current_value=-portfolio_item.current_value,
+        realized_pnl=pnl,
+        active_positions=-1,
+        closed_positions=1,
+        winning_trades=1 if pnl > 0 else 0,
+        losing_trades=1 if pnl < 0 else 0,
+    )
+    
     # Audit log
     if exit_by:
         AuditLog.objects.create(
@@ -111,9 +141,53 @@ def exit_position(portfolio_item, exit_price, exit_date=None, exit_by=None):
     return portfolio_item
 
 
+# Denormalized Portfolio summary fields, recomputed by refresh_portfolio_totals
+SUMMARY_AGGREGATES = {
+    'total_invested': (Sum, 'invested_amount', Q(status='ACTIVE')),
+    'current_value': (Sum, 'current_value', Q(status='ACTIVE')),
+    'realized_pnl': (Sum, 'profit_loss', Q(status='CLOSED')),
+    'active_positions': (Count, 'id', Q(status='ACTIVE')),
+    'closed_positions': (Count, 'id', Q(status='CLOSED')),
+    'winning_trades': (Count, 'id', Q(status='CLOSED', profit_loss__gt=0)),
+    'losing_trades': (Count, 'id', Q(status='CLOSED', profit_loss__lt=0)),
+}
+
+
+def _money(expression):
+    return ExpressionWrapper(expression, output_field=DecimalField(max_digits=15, decimal_places=2))
+
+
+def _percentage_of(amount, base):
+    """SQL (amount / base * 100), 0 when base is not positive"""
+    return Case(
+        When(**{f'{base}__gt': 0}, then=_money(amount * Value(100.0) / F(base))),
+        default=Value(Decimal('0.00')),
+        output_field=DecimalField(max_digits=10, decimal_places=2),
+    )
+
+
+def _pnl_update():
+    """UPDATE assignments deriving Portfolio P&L from its stored totals"""
+    return {
+        'profit_loss': _money(F('current_value') - F('total_invested')),
+        'profit_loss_percentage': _percentage_of(F('current_value') - F('total_invested'), 'total_invested'),
+    }
+
+
+def _apply_portfolio_delta(portfolio_id, **deltas):
+    """Incrementally adjust denormalized Portfolio fields (two UPDATEs, no reads)"""
+    portfolio = Portfolio.objects.filter(pk=portfolio_id)
+    portfolio.update(updated_at=timezone.now(), **{field: F(field) + delta for field, delta in deltas.items()})
+    portfolio.update(**_pnl_update())
+
+
 def calculate_portfolio_summary(portfolio):
     """
-    Calculate portfolio summary statistics
+    Portfolio summary statistics from the denormalized Portfolio fields
+    
+    The fields are kept current incrementally by add_to_portfolio and
+    exit_position and recomputed by the mark-to-market job, so this reads
+    only the portfolio row.
     
     Args:
         portfolio: Portfolio instance
@@ -121,29 +195,20 @@ def calculate_portfolio_summary(portfolio):
     Returns:
         dict: Summary statistics
     """
-    active_items = portfolio.items.filter(status='ACTIVE')
-    closed_items = portfolio.items.filter(status='CLOSED')
-    
-    total_invested = sum(item.invested_amount for item in active_items)
-    total_current_value = sum(item.current_value or 0 for item in active_items)
-    total_pnl = sum(item.profit_loss or 0 for item in closed_items)
-    
-    winning_trades = closed_items.filter(profit_loss__gt=0).count()
-    losing_trades = closed_items.filter(profit_loss__lt=0).count()
-    total_trades = closed_items.count()
-    
-    win_rate = (winning_trades / total_trades * 100) if total_trades > 0 else 0
+    unrealized_pnl = portfolio.current_value - portfolio.total_invested
+    total_trades = portfolio.closed_positions
+    win_rate = (portfolio.winning_trades / total_trades * 100) if total_trades > 0 else 0
     
     return {
-        'total_invested': total_invested,
-        'total_current_value': total_current_value,
-        'unrealized_pnl': total_current_value - total_invested,
-        'realized_pnl': total_pnl,
-        'total_pnl': (total_current_value - total_invested) + total_pnl,
-        'active_positions': active_items.count(),
+        'total_invested': portfolio.total_invested,
+        'total_current_value': portfolio.current_value,
+        'unrealized_pnl': unrealized_pnl,
+        'realized_pnl': portfolio.realized_pnl,
+        'total_pnl': unrealized_pnl + portfolio.realized_pnl,
+        'active_positions': portfolio.active_positions,
         'closed_positions': total_trades,
-        'winning_trades': winning_trades,
-        'losing_trades': losing_trades,
+        'winning_trades': portfolio.winning_trades,
+        'losing_trades': portfolio.losing_trades,
         'win_rate': round(win_rate, 2),
     }
 
@@ -157,3 +222,101 @@ def get_portfolio_summary(user):
         defaults={'name': 'My Portfolio'},
     )
     return calculate_portfolio_summary(portfolio)
+
+
+def _items_aggregate(function, source, condition):
+    """Correlated subquery computing one item aggregate per portfolio"""
+    totals = PortfolioItem.objects.filter(condition, portfolio=OuterRef('pk')).order_by().values(
+        'portfolio'
+    ).annotate(total=function(source)).values('total')[:1]
+    if function is Count:
+        return Coalesce(Subquery(totals), Value(0))
+    return Coalesce(Subquery(totals), Value(Decimal('0.00')), output_field=DecimalField(max_digits=15, decimal_places=2))
+
+
+def refresh_portfolio_totals(portfolio_ids=None, chunk_size=PORTFOLIO_TOTALS_CHUNK_SIZE):
+    """
+    Recompute denormalized Portfolio summary fields with set-based UPDATEs
+
+    Portfolios are processed in id ranges; each range is two UPDATE
+    statements (aggregates from the items, then P&L from those totals).
+    Also serves as the reconciliation pass for the incremental updates.
+
+    Args:
+        portfolio_ids: Portfolios to refresh (all portfolios by default)
+        chunk_size: Portfolio id range per UPDATE
+
+    Returns:
+        int: Number of portfolios refreshed
+    """
+    queryset = Portfolio.objects.all()
+    if portfolio_ids is not None:
+        queryset = queryset.filter(pk__in=portfolio_ids)
+
+    bounds = queryset.aggregate(low=Min('id'), high=Max('id'))
+    if bounds['low'] is None:
+        return 0
+
+    aggregates = {field: _items_aggregate(*spec) for field, spec in SUMMARY_AGGREGATES.items()}
+    refreshed = 0
+    for start in range(bounds['low'], bounds['high'] + 1, chunk_size):
+        chunk = queryset.filter(id__gte=start, id__lt=start + chunk_size)
+        with transaction.atomic():
+            refreshed += chunk.update(updated_at=timezone.now(), **aggregates)
+            chunk.update(**_pnl_update())
+    return refreshed
+
+
+def mark_portfolios_to_market(quotes=None, refresh=True, chunk_size=MTM_SYMBOL_CHUNK_SIZE):
+    """
+    Mark every ACTIVE portfolio item to market and refresh Portfolio totals
+
+    Items are priced through their research call's symbol. Each chunk of
+    symbols is two set-based UPDATEs over all matching items: one sets
+    current_price with a CASE over research_call_id, the next derives
+    current_value and P&L from it, so the cost grows with the number of
+    symbols rather than the number of holdings.
+
+    Args:
+        quotes: Optional symbol -> price snapshot (fetched when omitted)
+        refresh: Fetch live prices when building the snapshot
+        chunk_size: Symbols per UPDATE
+
+    Returns:
+        int: Number of portfolio items marked
+    """
+    call_ids = PortfolioItem.objects.filter(status='ACTIVE').order_by().values_list(
+        'research_call_id', flat=True
+    ).distinct()
+    calls_by_symbol = defaultdict(list)
+    for call_id, symbol in ResearchCall.objects.filter(id__in=list(call_ids)).values_list('id', 'symbol'):
+        calls_by_symbol[symbol].append(call_id)
+
+    if quotes is None:
+        from apps.market_data.services import get_quote_snapshot
+        quotes = get_quote_snapshot(calls_by_symbol, refresh=refresh)
+
+    priced = [(symbol, Decimal(str(quotes[symbol]))) for symbol in sorted(calls_by_symbol) if symbol in quotes]
+
+    marked = 0
+    for start in range(0, len(priced), chunk_size):
+        chunk = priced[start:start + chunk_size]
+        items = PortfolioItem.objects.filter(
+            status='ACTIVE',
+            research_call_id__in=[call_id for symbol, _ in chunk for call_id in calls_by_symbol[symbol]],
+        )
+        price = Case(
+            *[When(research_call_id__in=calls_by_symbol[symbol], then=Value(ltp)) for symbol, ltp in chunk],
+            output_field=DecimalField(max_digits=12, decimal_places=2),
+        )
+        position_value = F('current_price') * F('quantity')
+        with transaction.atomic():
+            marked += items.update(current_price=price, updated_at=timezone.now())
+            items.update(
+                current_value=_money(position_value),
+                profit_loss=_money(position_value - F('invested_amount')),
+                profit_loss_percentage=_percentage_of(position_value - F('invested_amount'), 'invested_amount'),
+            )
+
+    refresh_portfolio_totals()
+    return marked
@@ -0,0 +1,52 @@
+"""
+Celery tasks for portfolio mark-to-market, valuation history and risk
+"""
+from celery import shared_task
+import logging
+
+from apps.portfolios.performance import snapshot_portfolios
+from apps.portfolios.risk import compute_all_portfolio_risk, refresh_risk_bars
+from apps.portfolios.services import mark_portfolios_to_market
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def task_mark_portfolios_to_market():
+    """Reprice ACTIVE portfolio items and refresh Portfolio totals"""
+    logger.info("Executing periodic task: task_mark_portfolios_to_market")
+    try:
+        marked = mark_portfolios_to_market()
+        logger.info(f"Marked {marked} portfolio items to market")
+        return marked
+    except Exception as e:
+        logger.error(f"Error in task_mark_portfolios_to_market: {e}")
+        return 0
+
+
+@shared_task
+def task_snapshot_portfolios():
+    """End-of-day valuation: final mark-to-market, then one snapshot row per portfolio"""
+    logger.info("Executing periodic task: task_snapshot_portfolios")
+    try:
+        mark_portfolios_to_market()
+        written = snapshot_portfolios()
+        logger.info(f"Wrote {written} portfolio snapshots")
+        return written
+    except Exception as e:
+        logger.error(f"Error in task_snapshot_portfolios: {e}")
+        return 0
+
+
+@shared_task
+def task_compute_portfolio_risk():
+    """Nightly: store the day's bars, then precompute risk for every portfolio"""
+    logger.info("Executing periodic task: task_compute_portfolio_risk")
+    try:
+        bars = refresh_risk_bars()
+        computed = compute_all_portfolio_risk()
+        logger.info(f"Stored {bars} daily bars, computed risk for {computed} holdings")
+        return computed
+    except Exception as e:
+        logger.error(f"Error in task_compute_portfolio_risk: {e}")
+        return 0
@@ -1,16 +1,30 @@
 """
 Tests for portfolio models and services.
 """
-from datetime import date
+import time
+from datetime import date, timedelta
 from decimal import Decimal
+from unittest import mock
 
+import numpy as np
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.test import TestCase
+from django.urls import reverse
 
 from apps.brokers.models import Broker
-from apps.portfolios.models import Portfolio, PortfolioItem
-from apps.portfolios.services import add_to_portfolio, exit_position, get_portfolio_summary
+from apps.market_data.models import DailyBar
+from apps.portfolios.models import Portfolio, PortfolioItem, PortfolioSnapshot
+from apps.portfolios.performance import (
+    compute_performance, get_portfolio_performance, snapshot_portfolios, time_weighted_return, xirr,
+)
+from apps.portfolios.risk import compute_all_portfolio_risk, compute_risk_metrics, get_portfolio_risk
+from apps.portfolios.services import (
+    SUMMARY_AGGREGATES, add_to_portfolio, exit_position, get_portfolio_summary, mark_portfolios_to_market,
+    refresh_portfolio_totals,
+)
 from apps.research_calls.models import ResearchCall
+from services.projection_service import get_portfolio_projection, get_projection, simulate_growth
 
 User = get_user_model()
 
@@ -197,3 +211,304 @@ class PortfolioServiceTest(TestCase):
         self.assertEqual(summary['closed_positions'], 1)
         self.assertGreater(summary['total_invested'], 0)
         self.assertGreater(summary['realized_pnl'], 0)
+
+    def test_mark_portfolios_to_market(self):
+        item = add_to_portfolio(self.user, self.call, Decimal('3500.00'), 10)
+        other = User.objects.create_user(
+            email='other@example.com',
+            first_name='Other',
+            last_name='Customer',
+            password='TestPass123!',
+            role='CUSTOMER',
+        )
+        other_item = add_to_portfolio(other, self.call, Decimal('3000.00'), 4)
+
+        marked = mark_portfolios_to_market(quotes={'TCS': Decimal('3675.00')})
+        self.assertEqual(marked, 2)
+
+        item.refresh_from_db()
+        self.assertEqual(item.current_price, Decimal('3675.00'))
+        self.assertEqual(item.current_value, Decimal('36750.00'))
+        self.assertEqual(item.profit_loss, Decimal('1750.00'))
+        self.assertEqual(item.profit_loss_percentage, Decimal('5.00'))
+
+        other_item.refresh_from_db()
+        self.assertEqual(other_item.profit_loss_percentage, Decimal('22.50'))
+
+        portfolio = Portfolio.objects.get(user=self.user)
+        self.assertEqual(portfolio.total_invested, Decimal('35000.00'))
+        self.assertEqual(portfolio.current_value, Decimal('36750.00'))
+        self.assertEqual(portfolio.profit_loss, Decimal('1750.00'))
+        self.assertEqual(portfolio.profit_loss_percentage, Decimal('5.00'))
+
+    def test_summary_kept_incrementally(self):
+        item = add_to_portfolio(self.user, self.call, Decimal('3500.00'), 10)
+        portfolio = Portfolio.objects.get(user=self.user)
+        self.assertEqual((portfolio.total_invested, portfolio.active_positions), (Decimal('35000.00'), 1))
+
+        exit_position(item, Decimal('3300.00'), date.today())
+        portfolio.refresh_from_db()
+        self.assertEqual(portfolio.realized_pnl, Decimal('-2000.00'))
+        self.assertEqual((portfolio.active_positions, portfolio.closed_positions, portfolio.losing_trades), (0, 1, 1))
+
+        # The incremental fields agree with a full recomputation
+        refresh_portfolio_totals([portfolio.pk])
+        recomputed = Portfolio.objects.get(pk=portfolio.pk)
+        for field in SUMMARY_AGGREGATES:
+            self.assertEqual(getattr(recomputed, field), getattr(portfolio, field), field)
+
+        with self.assertNumQueries(1):
+            summary = get_portfolio_summary(self.user)
+        self.assertEqual(summary['total_pnl'], Decimal('-2000.00'))
+
+
+class PortfolioPerformanceTest(TestCase):
+    """Test valuation snapshots, XIRR and time-weighted return."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='customer@example.com',
+            first_name='Test',
+            last_name='Customer',
+            password='TestPass123!',
+            role='CUSTOMER',
+        )
+        analyst = User.objects.create_user(
+            email='analyst@example.com',
+            first_name='Analyst',
+            last_name='User',
+            password='TestPass123!',
+            role='ANALYST',
+        )
+        broker = Broker.objects.create(
+            name='Test Broker',
+            slug='test-broker-performance',
+            sebi_registration_no='INZ000000002',
+        )
+        self.call = ResearchCall.objects.create(
+            symbol='TCS',
+            created_by=analyst,
+            broker=broker,
+            action='BUY',
+            call_type='SHORT_TERM',
+            instrument_type='EQUITY',
+            entry_price=Decimal('3500.00'),
+            target_1=Decimal('3700.00'),
+            stop_loss=Decimal('3400.00'),
+            timeframe_days=30,
+            status='ACTIVE',
+        )
+
+    def test_return_calculations(self):
+        # 1000 invested, worth 1100 a year later
+        self.assertAlmostEqual(xirr([0, 365], [-1000, 1100]), 0.10, places=6)
+        self.assertIsNone(xirr([0, 365], [-1000, -100]))
+
+        # +10% then -10% regardless of the 1000 added in between
+        self.assertAlmostEqual(time_weighted_return([1000, 1100, 1890], [0, 0, 1000]), -0.01)
+
+        start = date(2026, 1, 1)
+        performance = compute_performance(
+            [start, start + timedelta(days=182), start + timedelta(days=365)],
+            [1000, 2100, 2200],
+            [0, 1000, 0],
+        )
+        self.assertGreater(performance['xirr'], 0)
+        self.assertEqual(performance['twr'], round((2100 / 2000 * 2200 / 2100 - 1) * 100, 2))
+
+    def test_snapshot_portfolios(self):
+        today = date.today()
+        add_to_portfolio(self.user, self.call, Decimal('3500.00'), 10, entry_date=today)
+        self.assertEqual(snapshot_portfolios(today), 1)
+
+        snapshot = PortfolioSnapshot.objects.get()
+        self.assertEqual(snapshot.snapshot_date, today)
+        self.assertEqual(snapshot.invested_amount, Decimal('35000.00'))
+        self.assertEqual(snapshot.cash_flow, Decimal('35000.00'))
+
+        # Re-running the same day overwrites the row
+        mark_portfolios_to_market(quotes={'TCS': Decimal('3600.00')})
+        snapshot_portfolios(today)
+        snapshot = PortfolioSnapshot.objects.get()
+        self.assertEqual(snapshot.market_value, Decimal('36000.00'))
+
+    def test_get_portfolio_performance(self):
+        portfolio = Portfolio.objects.create(user=self.user)
+        start = date(2026, 1, 1)
+        PortfolioSnapshot.objects.bulk_create([
+            PortfolioSnapshot(portfolio=portfolio, snapshot_date=start, market_value=1000, invested_amount=1000),
+            PortfolioSnapshot(
+                portfolio=portfolio, snapshot_date=start + timedelta(days=365),
+                market_value=1100, invested_amount=1000,
+            ),
+        ])
+
+        performance = get_portfolio_performance(portfolio)
+        self.assertEqual(performance['as_of'], '2027-01-01')
+        self.assertEqual(len(performance['series']), 2)
+        self.assertEqual(performance['xirr'], 10.0)
+        self.assertEqual(performance['twr'], 10.0)
+
+        # Served from the cache until a newer snapshot exists
+        with self.assertNumQueries(1):
+            get_portfolio_performance(portfolio)
+
+
+class PortfolioRiskTest(TestCase):
+    """Test vectorized portfolio risk analytics."""
+
+    def setUp(self):
+        cache.clear()
+        self.analyst = User.objects.create_user(
+            email='analyst@example.com',
+            first_name='Analyst',
+            last_name='User',
+            password='TestPass123!',
+            role='ANALYST',
+        )
+        self.broker = Broker.objects.create(
+            name='Test Broker',
+            slug='test-broker-risk',
+            sebi_registration_no='INZ000000003',
+        )
+        self.as_of = date(2026, 6, 30)
+        rng = np.random.default_rng(7)
+        index = 20000 * np.cumprod(1 + rng.normal(0, 0.01, 60))
+        other = 1500 * np.cumprod(1 + rng.normal(0, 0.02, 60))
+        bars = []
+        for offset in range(60):
+            day = self.as_of - timedelta(days=59 - offset)
+            # TCS moves exactly with the index, so its beta is 1
+            for symbol, close in (('NIFTY50', index[offset]), ('TCS', index[offset] / 5), ('INFY', other[offset])):
+                close = Decimal(str(round(close, 2)))
+                bars.append(DailyBar(symbol=symbol, trade_date=day, open=close, high=close, low=close, close=close))
+        DailyBar.objects.bulk_create(bars)
+
+    def _portfolio(self, email, positions):
+        user = User.objects.create_user(
+            email=email, first_name='Test', last_name='Customer', password='TestPass123!', role='CUSTOMER',
+        )
+        for symbol, quantity in positions.items():
+            call = ResearchCall.objects.create(
+                symbol=symbol,
+                created_by=self.analyst,
+                broker=self.broker,
+                action='BUY',
+                call_type='SHORT_TERM',
+                instrument_type='EQUITY',
+                entry_price=Decimal('1000.00'),
+                target_1=Decimal('1100.00'),
+                stop_loss=Decimal('950.00'),
+                timeframe_days=30,
+                status='ACTIVE',
+            )
+            add_to_portfolio(user, call, Decimal('1000.00'), quantity)
+        return Portfolio.objects.get(user=user)
+
+    def test_compute_risk_metrics(self):
+        returns = np.array([[0.01], [-0.02], [0.03], [-0.01]])
+        metrics = compute_risk_metrics(returns, np.array([1.0]), benchmark=returns[:, 0] / 2)
+        self.assertEqual(metrics['beta'], 2.0)
+        self.assertEqual(metrics['max_drawdown'], -2.0)
+        self.assertEqual(metrics['correlation'], [[1.0]])
+        self.assertGreater(metrics['var_parametric'], 0)
+
+    def test_get_portfolio_risk(self):
+        portfolio = self._portfolio('one@example.com', {'TCS': 10, 'NIFTYBANKFUT': 1})
+        risk = get_portfolio_risk(portfolio, as_of=self.as_of)
+        self.assertEqual(risk['symbols'], ['TCS'])
+        self.assertEqual(risk['unpriced'], ['NIFTYBANKFUT'])
+        self.assertEqual(risk['observations'], 59)
+        self.assertEqual(risk['beta'], 1.0)
+        self.assertLess(risk['max_drawdown'], 0)
+
+        # Cached per holdings and date
+        with self.assertNumQueries(1):
+            self.assertEqual(get_portfolio_risk(portfolio, as_of=self.as_of), risk)
+
+    def test_compute_all_portfolio_risk(self):
+        self._portfolio('one@example.com', {'TCS': 10, 'INFY': 5})
+        self._portfolio('two@example.com', {'INFY': 3})
+        portfolio = self._portfolio('three@example.com', {'INFY': 3})
+
+        self.assertEqual(compute_all_portfolio_risk(as_of=self.as_of, processes=2, chunk_size=1), 2)
+        self.assertEqual(compute_all_portfolio_risk(as_of=self.as_of), 0)
+
+        with self.assertNumQueries(1):
+            risk = get_portfolio_risk(portfolio, as_of=self.as_of)
+        self.assertEqual(risk['symbols'], ['INFY'])
+        self.assertIsNotNone(risk['volatility'])
+
+
+class ProjectionTest(TestCase):
+    """Test the Monte Carlo projection engine."""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_simulate_growth(self):
+        # Without volatility every path compounds at the expected return
+        lump_sum = simulate_growth(initial=100000, years=2, annual_return=10, annual_volatility=0)
+        self.assertEqual(lump_sum['bands']['p5'], [110000.0, 121000.0])
+        self.assertEqual(lump_sum['bands']['p95'], [110000.0, 121000.0])
+
+        sip = simulate_growth(monthly=1000, years=1, annual_return=12.68, annual_volatility=0)
+        # 12 instalments at 1% a month, each invested at the start of the month
+        self.assertAlmostEqual(sip['bands']['p50'][0], 1000 * sum(1.01 ** k for k in range(1, 13)), delta=1)
+
+        started = time.perf_counter()
+        projection = simulate_growth(monthly=5000, years=30, annual_return=12, annual_volatility=18)
+        self.assertLess(time.perf_counter() - started, 0.5)
+        bands = projection['bands']
+        self.assertTrue(bands['p5'][-1] < bands['p50'][-1] < bands['p95'][-1])
+        self.assertEqual(projection['invested'][-1], 1800000.0)
+
+        # Seeded: the same parameters give the same bands
+        self.assertEqual(simulate_growth(monthly=5000, years=30, annual_return=12, annual_volatility=18), projection)
+
+        with self.assertRaises(ValueError):
+            simulate_growth(monthly=5000, years=0)
+
+    def test_projection_cached_per_parameter_set(self):
+        first = get_projection(monthly=2000, years=5)
+        self.assertEqual(first['assumptions']['monthly'], 2000.0)
+        with mock.patch('services.projection_service.simulate_growth') as simulate:
+            self.assertEqual(get_projection(monthly=2000, years=5), first)
+        simulate.assert_not_called()
+        self.assertNotEqual(get_projection(monthly=3000, years=5)['bands'], first['bands'])
+
+    def test_portfolio_projection(self):
+        user = User.objects.create_user(
+            email='customer@example.com',
+            first_name='Test',
+            last_name='Customer',
+            password='TestPass123!',
+            role='CUSTOMER',
+        )
+        portfolio = Portfolio.objects.create(user=user, current_value=Decimal('100000.00'))
+        projection = get_portfolio_projection(portfolio, years=3, annual_return=10)
+        self.assertEqual(projection['invested'], [100000.0] * 3)
+        self.assertEqual(projection['assumptions']['annual_volatility'], 18.0)
+
+    def test_non_finite_inputs_are_rejected(self):
+        for params in (
+            {'initial': float('nan')},
+            {'monthly': float('inf')},
+            {'initial': 1000, 'annual_return': float('nan')},
+            {'initial': 1000, 'annual_volatility': float('inf')},
+        ):
+            with self.subTest(params=params), self.assertRaises(ValueError):
+                get_projection(years=5, **params)
+
+        user = User.objects.create_user(
+            email='customer@example.com',
+            first_name='Test',
+            last_name='Customer',
+            password='TestPass123!',
+            role='CUSTOMER',
+        )
+        Portfolio.objects.create(user=user, current_value=Decimal('100000.00'))
+        self.client.force_login(user)
+        for value in ('nan', 'inf', '-Infinity'):
+            response = self.client.get(reverse('portfolios:projection'), {'return': value})
+            self.assertEqual(response.status_code, 400)
@@ -5,6 +5,9 @@ app_name = 'portfolios'
 
 urlpatterns = [
     path('', views.portfolio_view, name='portfolio'),
+    path('performance/', views.portfolio_performance_view, name='performance'),
+    path('risk/', views.portfolio_risk_view, name='risk'),
+    path('projection/', views.portfolio_projection_view, name='projection'),
     path('add/', views.add_to_portfolio_view, name='add'),
     path('<int:pk>/exit/', views.exit_position_view, name='exit'),
 ]
@@ -6,6 +6,8 @@ from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.http import JsonResponse
 from apps.portfolios.models import Portfolio, PortfolioItem
+from apps.portfolios.performance import get_portfolio_performance
+from apps.portfolios.risk import get_portfolio_risk
 from apps.portfolios.services import add_to_portfolio, exit_position, calculate_portfolio_summary
 from apps.research_calls.models import ResearchCall
 
@@ -27,17 +29,77 @@ def portfolio_view(request):
     ).select_related('research_call__broker').order_by('-exit_date')[:10]
     
     summary = calculate_portfolio_summary(portfolio)
+    performance = get_portfolio_performance(portfolio)
     
     context = {
         'portfolio': portfolio,
         'active_items': active_items,
         'closed_items': closed_items,
         'summary': summary,
+        'performance': performance,
     }
     
     return render(request, 'portfolios/portfolio.html', context)
 
 
+@login_required
+def portfolio_performance_view(request):
+    """Valuation history with XIRR and time-weighted return (JSON, for charts)"""
+    portfolio, created = Portfolio.objects.get_or_create(
+        user=request.user,
+        defaults={'name': 'My Portfolio'}
+    )
+    
+    try:
+        days = int(request.GET.get('days', 0)) or None
+    except ValueError:
+        days = None
+    
+    return JsonResponse(get_portfolio_performance(portfolio, days=days))
+
+
+@login_required
+def portfolio_risk_view(request):
+    """Volatility, beta, VaR, max drawdown and correlations of open positions (JSON)"""
+    portfolio, created = Portfolio.objects.get_or_create(
+        user=request.user,
+        defaults={'name': 'My Portfolio'}
+    )
+    
+    risk = get_portfolio_risk(portfolio)
+    if risk is None:
+        return JsonResponse({'error': 'No open positions'}, status=404)
+    
+    # The cached metrics are percentages; express VaR in rupees for this portfolio
+    for field in ('var_historical', 'var_parametric'):
+        if risk[field] is not None:
+            risk[f'{field}_amount'] = round(float(portfolio.current_value) * risk[field] / 100, 2)
+    
+    return JsonResponse(risk)
+
+
+@login_required
+def portfolio_projection_view(request):
+    """Monte Carlo projection of the portfolio's current value (JSON): ?years=&return="""
+    from services.projection_service import DEFAULT_PORTFOLIO_RETURN, get_portfolio_projection
+    
+    portfolio, created = Portfolio.objects.get_or_create(
+        user=request.user,
+        defaults={'name': 'My Portfolio'}
+    )
+    
+    try:
+        projection = get_portfolio_projection(
+            portfolio,
+            years=int(request.GET.get('years', 5)),
+            annual_return=float(request.GET.get('return', DEFAULT_PORTFOLIO_RETURN)),
+        )
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    
+    return JsonResponse(projection)
+
+
 @login_required
 def add_to_portfolio_view(request):
     """Add research call to portfolio"""
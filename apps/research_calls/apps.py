@@ -5,3 +5,6 @@ class ResearchCallsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.research_calls'
     verbose_name = 'Research Calls'
+    
+    def ready(self):
+        from apps.research_calls import signals  # noqa: F401
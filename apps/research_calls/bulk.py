@@ -0,0 +1,163 @@
+"""
+Bulk research call transitions - set-based approve/publish/close/delete
+
+Each action locks the eligible calls, changes them with one UPDATE (or one
+DELETE), and writes their ResearchCallEvent and AuditLog rows with one
+bulk_create each, all in a single transaction. Work that the per-call
+services do through signals (admin counters, sentiment counters, cached
+summaries, dashboard blocks) is applied once for the whole batch, and
+published calls are handed to the notification tasks after commit.
+"""
+from collections import Counter
+
+from django.db import transaction
+from django.utils import timezone
+
+from apps.admin_panel.metrics import record_metric_deltas
+from apps.audit.models import AuditLog
+from apps.research_calls.models import ResearchCall, ResearchCallEvent
+from apps.research_calls.sentiment import bucket_names, record_sentiment_deltas
+
+CLOSABLE_STATUSES = (
+    'ACTIVE', 'TARGET_1_HIT', 'TARGET_2_HIT', 'TARGET_3_HIT', 'STOP_LOSS_HIT', 'MANUALLY_EXITED', 'EXPIRED',
+)
+
+# action -> (statuses it applies to, new status, event type, audit action)
+BULK_TRANSITIONS = {
+    'approve': (('PENDING_APPROVAL',), 'APPROVED', 'APPROVED', 'APPROVE'),
+    'publish': (('APPROVED',), 'ACTIVE', 'PUBLISHED', 'PUBLISH'),
+    'close': (CLOSABLE_STATUSES, 'CLOSED', 'CLOSED', 'UPDATE'),
+}
+BULK_ACTIONS = (*BULK_TRANSITIONS, 'delete')
+
+REPR_FIELDS = ('id', 'status', 'action', 'symbol', 'entry_price', 'call_type', 'sector')
+
+
+def _call_repr(row):
+    """str(ResearchCall) from a values() row"""
+    return f"{row['action']} {row['symbol']} @ {row['entry_price']} ({row['call_type']})"
+
+
+def _lock_calls(call_ids, statuses=None):
+    queryset = ResearchCall.objects.select_for_update().filter(id__in=call_ids)
+    if statuses is not None:
+        queryset = queryset.filter(status__in=statuses)
+    return list(queryset.order_by('id').values(*REPR_FIELDS))
+
+
+def _after_commit(closed=False, published_ids=()):
+    from apps.dashboard.snapshot import invalidate_market_block
+    from apps.notifications.tasks import task_notify_call_published
+    from apps.research_calls.services import invalidate_closed_call_summary
+
+    def apply():
+        invalidate_market_block()
+        if closed:
+            invalidate_closed_call_summary()
+        for call_id in published_ids:
+            task_notify_call_published.delay(call_id)
+
+    transaction.on_commit(apply)
+
+
+@transaction.atomic
+def bulk_transition_calls(call_ids, action, user, reason=''):
+    """
+    Apply one lifecycle transition to many calls
+
+    Calls not in a status the action applies to are skipped.
+
+    Args:
+        call_ids: Ids of the selected calls
+        action: 'approve', 'publish' or 'close'
+        user: Admin performing the action
+        reason: Closing reason (close only)
+
+    Returns:
+        dict: {'updated': int, 'skipped': int}
+    """
+    from_statuses, new_status, event_type, audit_action = BULK_TRANSITIONS[action]
+    call_ids = set(call_ids)
+    rows = _lock_calls(call_ids, from_statuses)
+    if not rows:
+        return {'updated': 0, 'skipped': len(call_ids)}
+
+    now = timezone.now()
+    changes = {'status': new_status, 'updated_at': now}
+    if action == 'approve':
+        changes['approved_by'] = user
+    elif action == 'publish':
+        changes['published_at'] = now
+    elif action == 'close':
+        changes['closed_at'] = now
+    ids = [row['id'] for row in rows]
+    ResearchCall.objects.filter(id__in=ids).update(**changes)
+
+    if action == 'close':
+        notes = f'Call closed: {reason}'
+    else:
+        notes = f'Call {event_type.lower()} by {user.get_full_name()} (bulk)'
+    ResearchCallEvent.objects.bulk_create([
+        ResearchCallEvent(research_call_id=call_id, event_type=event_type, triggered_by=user, notes=notes)
+        for call_id in ids
+    ])
+    audit_changes = {'status': new_status, 'bulk': True}
+    if action == 'close':
+        audit_changes['reason'] = reason
+    AuditLog.objects.bulk_create([
+        AuditLog(
+            user=user,
+            action=audit_action,
+            model_name='ResearchCall',
+            object_id=row['id'],
+            object_repr=_call_repr(row),
+            changes_json=audit_changes,
+        )
+        for row in rows
+    ])
+
+    # queryset.update() sends no signals
+    deltas = Counter({f'calls:{new_status}': len(rows)})
+    deltas.subtract(Counter(f"calls:{row['status']}" for row in rows))
+    record_metric_deltas(deltas)
+    sentiment = Counter()
+    for row in rows:
+        if (row['status'] == 'ACTIVE') != (new_status == 'ACTIVE'):
+            sign = 1 if new_status == 'ACTIVE' else -1
+            for name in bucket_names(row['action'], row['sector'], row['call_type']):
+                sentiment[name] += sign
+    record_sentiment_deltas(sentiment)
+    _after_commit(closed=action == 'close', published_ids=ids if action == 'publish' else ())
+
+    return {'updated': len(ids), 'skipped': len(call_ids) - len(ids)}
+
+
+@transaction.atomic
+def bulk_delete_calls(call_ids, user):
+    """
+    Delete many calls, with one DELETE cascade and bulk audit rows
+
+    Returns:
+        dict: {'deleted': int, 'skipped': int}
+    """
+    call_ids = set(call_ids)
+    rows = _lock_calls(call_ids)
+    if not rows:
+        return {'deleted': 0, 'skipped': len(call_ids)}
+
+    AuditLog.objects.bulk_create([
+        AuditLog(
+            user=user,
+            action='DELETE',
+            model_name='ResearchCall',
+            object_id=row['id'],
+            object_repr=_call_repr(row),
+            changes_json={'status': row['status'], 'bulk': True},
+        )
+        for row in rows
+    ])
+    # The collector sends per-row delete signals, which already update the
+    # admin counters, closed-call summaries and dashboard blocks
+    ResearchCall.objects.filter(id__in=[row['id'] for row in rows]).delete()
+
+    return {'deleted': len(rows), 'skipped': len(call_ids) - len(rows)}
@@ -0,0 +1,382 @@
+"""
+Bulk research call import - CSV/JSON batches with batched validation
+"""
+import csv
+import io
+import json
+import uuid
+from collections import Counter
+from decimal import Decimal, InvalidOperation
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from apps.admin_panel.metrics import record_metric_deltas
+from apps.audit.models import AuditLog
+from apps.brokers.models import Broker
+from apps.market_data.contracts import get_contract_lookup
+from apps.research_calls.models import ResearchCall, ResearchCallEvent, ResearchCallVersion
+from apps.research_calls.validators import validate_price_levels
+
+IMPORT_CHUNK_SIZE = 200
+BROKER_LOOKUP_CACHE_KEY = 'research_calls:broker_lookup:v2'
+BROKER_LOOKUP_CACHE_TTL = 600  # 10 min
+
+REQUIRED_FIELDS = ('symbol', 'broker', 'call_type', 'action', 'entry_price', 'target_1', 'stop_loss')
+PRICE_FIELDS = ('entry_price', 'target_1', 'target_2', 'target_3', 'stop_loss')
+TEXT_FIELDS = ('exchange', 'company_name', 'sector', 'rationale')
+LENGTH_LIMITED_FIELDS = ('symbol', 'exchange', 'company_name', 'sector')
+DERIVED_FIELDS = ('expected_return_percentage', 'risk_reward_ratio')
+
+# Imported calls still go through approval/publishing
+IMPORTABLE_STATUSES = ('DRAFT', 'PENDING_APPROVAL')
+
+
+def parse_call_file(fileobj, file_format=None):
+    """
+    Parse an uploaded CSV or JSON file into a list of row dicts
+
+    Args:
+        fileobj: File-like object (bytes or text)
+        file_format: 'csv' or 'json' (guessed from the file name if omitted)
+
+    Returns:
+        list: Row dictionaries
+
+    Raises:
+        ValueError: If the file cannot be parsed
+    """
+    if not file_format:
+        name = getattr(fileobj, 'name', '') or ''
+        file_format = 'json' if name.lower().endswith('.json') else 'csv'
+
+    content = fileobj.read()
+    if isinstance(content, bytes):
+        content = content.decode('utf-8-sig')
+
+    if file_format == 'json':
+        try:
+            data = json.loads(content)
+        except json.JSONDecodeError as e:
+            raise ValueError(f'Invalid JSON: {e}')
+        if isinstance(data, dict):
+            data = data.get('calls', [])
+        if not isinstance(data, list) or not all(isinstance(row, dict) for row in data):
+            raise ValueError('JSON must be a list of call objects')
+        return data
+
+    if file_format == 'csv':
+        reader = csv.DictReader(io.StringIO(content))
+        return [
+            {(key or '').strip(): value for key, value in row.items()}
+            for row in reader
+        ]
+
+    raise ValueError(f'Unsupported format: {file_format}')
+
+
+def get_broker_lookup(keys):
+    """
+    Resolve broker references (id, slug or name) to broker ids
+
+    The id/slug/name map is cached and reloaded with a single query when a
+    reference is not in it, so a batch costs at most one broker query.
+
+    Args:
+        keys: Iterable of lower-cased broker references from the import rows
+
+    Returns:
+        dict: Lower-cased reference -> (broker id, broker name)
+    """
+    lookup = cache.get(BROKER_LOOKUP_CACHE_KEY)
+    if lookup is None or any(key and key not in lookup for key in keys):
+        lookup = {}
+        for broker_id, slug, name in Broker.objects.values_list('id', 'slug', 'name'):
+            lookup[str(broker_id)] = (broker_id, name)
+            lookup[slug.lower()] = (broker_id, name)
+            lookup[name.lower()] = (broker_id, name)
+        cache.set(BROKER_LOOKUP_CACHE_KEY, lookup, BROKER_LOOKUP_CACHE_TTL)
+    return lookup
+
+
+def get_symbol_lookup(symbols):
+    """
+    Resolve company name and sector for symbols from previously published calls
+
+    Args:
+        symbols: Iterable of upper-cased symbols
+
+    Returns:
+        dict: symbol -> {'company_name': ..., 'sector': ...}
+    """
+    lookup = {}
+    known = ResearchCall.objects.filter(
+        symbol__in=set(symbols),
+    ).exclude(company_name__isnull=True).order_by('symbol', '-created_at').values_list(
+        'symbol', 'company_name', 'sector'
+    )
+    for symbol, company_name, sector in known:
+        lookup.setdefault(symbol, {'company_name': company_name, 'sector': sector})
+    return lookup
+
+
+def _integer_digits(field):
+    """Integer digits a ResearchCall DecimalField can store"""
+    model_field = ResearchCall._meta.get_field(field)
+    return model_field.max_digits - model_field.decimal_places
+
+
+def _clean(value):
+    if value is None:
+        return ''
+    return str(value).strip()
+
+
+def _build_call(row, broker_lookup, symbol_lookup, contract_lookup, created_by):
+    """
+    Validate one row and build an unsaved ResearchCall
+
+    Returns:
+        tuple: (ResearchCall or None, list of error messages)
+    """
+    errors = []
+    values = {field: _clean(row.get(field)) for field in set(row) | set(REQUIRED_FIELDS)}
+
+    for field in REQUIRED_FIELDS:
+        if not values[field]:
+            errors.append(f'{field} is required')
+
+    broker_id, broker_name = broker_lookup.get(values['broker'].lower(), (None, None))
+    if values['broker'] and broker_id is None:
+        errors.append(f"Unknown broker: {values['broker']}")
+
+    prices = {}
+    for field in PRICE_FIELDS:
+        raw = values.get(field, '')
+        if not raw:
+            prices[field] = None
+            continue
+        try:
+            prices[field] = Decimal(raw)
+        except InvalidOperation:
+            errors.append(f'{field} must be a number')
+            continue
+        # NaN/Infinity parse, but cannot be compared or stored
+        if not prices[field].is_finite():
+            errors.append(f'{field} must be a number')
+        elif prices[field] <= 0:
+            errors.append(f'{field} must be greater than zero')
+        elif round(prices[field], 2) >= 10 ** _integer_digits(field):
+            errors.append(f'{field} must have at most {_integer_digits(field)} digits before the decimal point')
+
+    for field in LENGTH_LIMITED_FIELDS:
+        max_length = ResearchCall._meta.get_field(field).max_length
+        if len(values.get(field, '')) > max_length:
+            errors.append(f'{field} must be at most {max_length} characters')
+
+    choice_fields = {
+        'call_type': ResearchCall.CALL_TYPE_CHOICES,
+        'action': ResearchCall.ACTION_CHOICES,
+        'instrument_type': ResearchCall.INSTRUMENT_TYPE_CHOICES,
+    }
+    choices = {}
+    for field, field_choices in choice_fields.items():
+        value = values.get(field, '').upper().replace(' ', '_')
+        if field == 'instrument_type' and not value:
+            value = 'EQUITY'
+        if value and value not in dict(field_choices):
+            errors.append(f'Invalid {field}: {values[field]}')
+        choices[field] = value
+
+    status = values.get('status', '').upper() or 'DRAFT'
+    if status not in IMPORTABLE_STATUSES:
+        errors.append(f'status must be one of {", ".join(IMPORTABLE_STATUSES)}')
+
+    timeframe_days = None
+    if values.get('timeframe_days'):
+        try:
+            timeframe_days = int(values['timeframe_days'])
+        except ValueError:
+            errors.append('timeframe_days must be a whole number')
+
+    expires_at = None
+    if values.get('expires_at'):
+        expires_at = parse_datetime(values['expires_at'])
+        if expires_at is None:
+            errors.append('expires_at must be an ISO datetime')
+        elif timezone.is_naive(expires_at):
+            expires_at = timezone.make_aware(expires_at)
+
+    if not errors:
+        try:
+            validate_price_levels(
+                choices['action'], prices['entry_price'], prices['target_1'],
+                prices['target_2'], prices['target_3'], prices['stop_loss'],
+            )
+        except ValidationError as e:
+            errors.extend(e.messages)
+
+    if errors:
+        return None, errors
+
+    symbol = values['symbol'].upper()
+    known = symbol_lookup.get(symbol, {})
+    text = {field: values.get(field) or None for field in TEXT_FIELDS}
+
+    # Derivatives take their instrument type from the contract master
+    contract_id, contract_instrument = contract_lookup.get(symbol, (None, None))
+    if contract_instrument:
+        choices['instrument_type'] = contract_instrument
+
+    call = ResearchCall(
+        broker_id=broker_id,
+        created_by=created_by,
+        symbol=symbol,
+        exchange=text['exchange'] or ('MCX' if choices['instrument_type'] == 'COMMODITY' else 'NSE'),
+        company_name=text['company_name'] or known.get('company_name'),
+        sector=text['sector'] or known.get('sector'),
+        instrument_type=choices['instrument_type'],
+        contract_id=contract_id,
+        call_type=choices['call_type'],
+        action=choices['action'],
+        timeframe_days=timeframe_days,
+        rationale=text['rationale'],
+        status=status,
+        expires_at=expires_at,
+        **prices,
+    )
+    call.calculate_derived_fields()
+    for field in DERIVED_FIELDS:
+        value = getattr(call, field)
+        if value is not None and abs(value) >= 10 ** _integer_digits(field):
+            return None, [f'{field} is out of range; check the price levels']
+    call.search_document = call.build_search_document(broker_name=broker_name)
+    return call, []
+
+
+def validate_call_rows(rows, created_by):
+    """
+    Validate a whole batch of rows, collecting every row error
+
+    Args:
+        rows: List of row dictionaries
+        created_by: User importing the calls
+
+    Returns:
+        tuple: (list of (row_number, ResearchCall), list of {'row', 'errors'})
+    """
+    broker_lookup = get_broker_lookup({_clean(row.get('broker')).lower() for row in rows})
+    symbols = {_clean(row.get('symbol')).upper() for row in rows}
+    symbol_lookup = get_symbol_lookup(symbols)
+    contract_lookup = get_contract_lookup(symbols)
+
+    calls = []
+    errors = []
+    for row_number, row in enumerate(rows, start=1):
+        call, row_errors = _build_call(row, broker_lookup, symbol_lookup, contract_lookup, created_by)
+        if row_errors:
+            errors.append({'row': row_number, 'errors': row_errors})
+        else:
+            calls.append((row_number, call))
+    return calls, errors
+
+
+def _persist_chunk(calls, created_by):
+    """Write one chunk of calls plus their event/version/audit rows"""
+    with transaction.atomic():
+        ResearchCall.objects.bulk_create(calls)
+
+        # MySQL cannot return ids from a bulk insert; read them back by import_ref
+        if any(call.pk is None for call in calls):
+            ids = dict(
+                ResearchCall.objects.filter(
+                    import_ref__in=[call.import_ref for call in calls]
+                ).values_list('import_ref', 'id')
+            )
+            for call in calls:
+                call.pk = ids[call.import_ref]
+
+        notes = f'Call imported by {created_by.get_full_name()}'
+        ResearchCallEvent.objects.bulk_create([
+            ResearchCallEvent(
+                research_call=call,
+                event_type='CREATED',
+                triggered_by=created_by,
+                notes=notes,
+            )
+            for call in calls
+        ])
+        ResearchCallVersion.objects.bulk_create([
+            ResearchCallVersion(
+                research_call=call,
+                version_number=1,
+                changed_by=created_by,
+                changes_json={
+                    'status': call.status,
+                    'entry_price': str(call.entry_price),
+                    'target_1': str(call.target_1),
+                    'stop_loss': str(call.stop_loss),
+                },
+                change_reason='Initial version (bulk import)',
+            )
+            for call in calls
+        ])
+        AuditLog.objects.bulk_create([
+            AuditLog(
+                user=created_by,
+                action='CREATE',
+                model_name='ResearchCall',
+                object_id=call.id,
+                object_repr=str(call),
+                changes_json={
+                    'symbol': call.symbol,
+                    'action': call.action,
+                    'status': call.status,
+                    'import_ref': call.import_ref,
+                },
+            )
+            for call in calls
+        ])
+
+        # bulk_create sends no signals; count the calls for the admin dashboard
+        record_metric_deltas(Counter(['calls'] * len(calls) + [f'calls:{call.status}' for call in calls]))
+
+
+def import_research_calls(rows, created_by, chunk_size=IMPORT_CHUNK_SIZE, skip_invalid=False, dry_run=False):
+    """
+    Validate and bulk-create research calls
+
+    The whole batch is validated first so every row error is reported at
+    once. Unless skip_invalid is set, nothing is written when any row fails.
+    Valid calls are persisted in chunks: one bulk_create per table inside
+    one transaction per chunk.
+
+    Args:
+        rows: List of row dictionaries (see parse_call_file)
+        created_by: User importing the calls
+        chunk_size: Calls per transaction
+        skip_invalid: Import the valid rows even if some rows fail
+        dry_run: Validate only
+
+    Returns:
+        dict: {'total', 'created', 'errors', 'batch_id'}
+    """
+    calls, errors = validate_call_rows(rows, created_by)
+    batch_id = uuid.uuid4().hex[:16]
+    result = {'total': len(rows), 'created': 0, 'errors': errors, 'batch_id': batch_id}
+
+    if dry_run or (errors and not skip_invalid):
+        return result
+
+    for row_number, call in calls:
+        call.import_ref = f'{batch_id}:{row_number}'
+
+    for start in range(0, len(calls), chunk_size):
+        chunk = [call for _, call in calls[start:start + chunk_size]]
+        _persist_chunk(chunk, created_by)
+        result['created'] += len(chunk)
+
+    return result
@@ -0,0 +1,55 @@
+"""
+Django management command to bulk import research calls from CSV/JSON
+"""
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.research_calls.imports import IMPORT_CHUNK_SIZE, import_research_calls, parse_call_file
+
+
+class Command(BaseCommand):
+    help = 'Bulk import research calls from a CSV or JSON file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV or JSON file of calls')
+        parser.add_argument('--user', required=True, help='Email of the analyst/admin the calls are created by')
+        parser.add_argument('--format', choices=['csv', 'json'], help='File format (guessed from extension by default)')
+        parser.add_argument('--chunk-size', type=int, default=IMPORT_CHUNK_SIZE, help='Calls per transaction')
+        parser.add_argument('--skip-invalid', action='store_true', help='Import valid rows even if some rows fail')
+        parser.add_argument('--dry-run', action='store_true', help='Validate only, write nothing')
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        try:
+            user = User.objects.get(email=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f"No user with email {options['user']}")
+
+        try:
+            with open(options['path'], 'rb') as fileobj:
+                rows = parse_call_file(fileobj, options['format'])
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(f'Validating {len(rows)} rows...')
+        result = import_research_calls(
+            rows,
+            created_by=user,
+            chunk_size=options['chunk_size'],
+            skip_invalid=options['skip_invalid'],
+            dry_run=options['dry_run'],
+        )
+
+        for error in result['errors']:
+            self.stdout.write(self.style.ERROR(f"  Row {error['row']}: {'; '.join(error['errors'])}"))
+
+        if result['errors'] and not options['skip_invalid']:
+            raise CommandError(f"{len(result['errors'])} invalid rows, nothing imported")
+
+        if options['dry_run']:
+            self.stdout.write(self.style.SUCCESS('✓ Dry run complete, nothing imported'))
+            return
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ Imported {result['created']} of {result['total']} calls (batch {result['batch_id']})"
+        ))
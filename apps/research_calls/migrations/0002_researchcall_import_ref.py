@@ -0,0 +1,18 @@
+# Generated by Django 5.2.11 on 2026-10-18 10:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('research_calls', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='researchcall',
+            name='import_ref',
+            field=models.CharField(blank=True, editable=False, max_length=64, null=True, unique=True),
+        ),
+    ]
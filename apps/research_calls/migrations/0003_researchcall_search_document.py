@@ -0,0 +1,49 @@
+# Generated by Django 5.2.11 on 2026-10-18 11:20
+
+from django.db import migrations, models
+
+
+def backfill_search_document(apps, schema_editor):
+    ResearchCall = apps.get_model('research_calls', 'ResearchCall')
+    Broker = apps.get_model('brokers', 'Broker')
+    # broker is not a DB constraint, so a call may point at a deleted broker
+    broker_names = dict(Broker.objects.values_list('id', 'name'))
+    rows = ResearchCall.objects.values_list('id', 'symbol', 'company_name', 'sector', 'broker_id', 'rationale')
+    batch = []
+    for call_id, symbol, company_name, sector, broker_id, rationale in rows.iterator(chunk_size=1000):
+        parts = [symbol, company_name, sector, broker_names.get(broker_id), rationale]
+        batch.append(ResearchCall(id=call_id, search_document=' '.join(part for part in parts if part)))
+        if len(batch) >= 1000:
+            ResearchCall.objects.bulk_update(batch, ['search_document'])
+            batch = []
+    if batch:
+        ResearchCall.objects.bulk_update(batch, ['search_document'])
+
+
+def add_fulltext_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'mysql':
+        schema_editor.execute(
+            'ALTER TABLE research_calls ADD FULLTEXT INDEX research_calls_search_ft (search_document)'
+        )
+
+
+def drop_fulltext_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'mysql':
+        schema_editor.execute('ALTER TABLE research_calls DROP INDEX research_calls_search_ft')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('research_calls', '0002_researchcall_import_ref'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='researchcall',
+            name='search_document',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.RunPython(backfill_search_document, migrations.RunPython.noop),
+        migrations.RunPython(add_fulltext_index, drop_fulltext_index),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.11 on 2026-10-18 12:05
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('market_data', '0007_derivativecontract'),
+        ('research_calls', '0003_researchcall_search_document'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='researchcall',
+            name='contract',
+            field=models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='research_calls', to='market_data.derivativecontract'),
+        ),
+        migrations.AddIndex(
+            model_name='researchcall',
+            index=models.Index(fields=['status', 'instrument_type', 'published_at'], name='research_ca_status_31887d_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.11 on 2026-10-18 10:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('research_calls', '0004_researchcall_contract'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='researchcall',
+            index=models.Index(fields=['created_at'], name='research_ca_created_a91249_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='researchcall',
+            index=models.Index(fields=['closed_at'], name='research_ca_closed__96f2af_idx'),
+        ),
+    ]
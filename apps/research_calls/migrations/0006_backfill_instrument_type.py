@@ -0,0 +1,125 @@
+# Generated by Django 5.2.11 on 2026-10-18 13:10
+
+import calendar
+import re
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db import migrations
+
+BATCH_SIZE = 1000
+
+# Frozen copy of apps.market_data.contracts.parse_trading_symbol as of this
+# migration, so later changes to the parser cannot rewrite history
+COMMODITY_EXCHANGES = ('MCX', 'NCDEX')
+MONTHLY_EXPIRY_WEEKDAY = 3
+MONTHS = {name.upper(): number for number, name in enumerate(calendar.month_abbr) if name}
+WEEKLY_MONTHS = {**{str(number): number for number in range(1, 10)}, 'O': 10, 'N': 11, 'D': 12}
+MONTHLY_RE = re.compile(
+    r'^(?P<underlying>[A-Z][A-Z0-9&-]*?)(?P<year>\d{2})(?P<month>' + '|'.join(MONTHS) + r')'
+    r'(?:(?P<strike>\d+(?:\.\d+)?)(?P<option_type>CE|PE)|FUT)$'
+)
+WEEKLY_RE = re.compile(
+    r'^(?P<underlying>[A-Z][A-Z&-]*?)(?P<year>\d{2})(?P<month>[1-9OND])(?P<day>\d{2})'
+    r'(?P<strike>\d+(?:\.\d+)?)(?P<option_type>CE|PE)$'
+)
+
+
+def _last_weekday_of_month(year, month, weekday=MONTHLY_EXPIRY_WEEKDAY):
+    last_day = date(year, month, calendar.monthrange(year, month)[1])
+    return last_day - timedelta(days=(last_day.weekday() - weekday) % 7)
+
+
+def _parse_trading_symbol(symbol, exchange):
+    symbol = (symbol or '').strip().upper()
+    exchange = (exchange or 'NFO').upper()
+
+    match = WEEKLY_RE.match(symbol)
+    if match:
+        year = 2000 + int(match['year'])
+        try:
+            expiry = date(year, WEEKLY_MONTHS[match['month']], int(match['day']))
+        except ValueError:
+            match = None
+    if not match:
+        match = MONTHLY_RE.match(symbol)
+        if not match:
+            return None
+        year = 2000 + int(match['year'])
+        month = MONTHS[match['month']]
+        expiry = None if exchange in COMMODITY_EXCHANGES else _last_weekday_of_month(year, month)
+
+    option_type = match['option_type']
+    if exchange in COMMODITY_EXCHANGES:
+        instrument_type = 'COMMODITY'
+    else:
+        instrument_type = 'OPTIONS' if option_type else 'FUTURES'
+    return {
+        'trading_symbol': symbol,
+        'exchange': exchange if exchange in COMMODITY_EXCHANGES else 'NFO',
+        'instrument_type': instrument_type,
+        'underlying': match['underlying'],
+        'expiry': expiry,
+        'strike': Decimal(match['strike']) if match['strike'] else None,
+        'option_type': option_type,
+    }
+
+
+def _classify_batch(rows, ResearchCall, DerivativeContract):
+    symbols = {(symbol or '').strip().upper() for _, symbol, _, _ in rows}
+    lookup = {
+        trading_symbol: (contract_id, instrument_type)
+        for contract_id, trading_symbol, instrument_type in DerivativeContract.objects.filter(
+            trading_symbol__in=symbols,
+        ).values_list('id', 'trading_symbol', 'instrument_type')
+    }
+
+    changed = []
+    for call_id, symbol, exchange, instrument_type in rows:
+        symbol = (symbol or '').strip().upper()
+        contract_id = None
+        if symbol not in lookup:
+            parsed = _parse_trading_symbol(symbol, exchange)
+            if parsed is not None:
+                trading_symbol = parsed.pop('trading_symbol')
+                contract, _ = DerivativeContract.objects.get_or_create(trading_symbol=trading_symbol, defaults=parsed)
+                lookup[symbol] = (contract.id, contract.instrument_type)
+        if symbol in lookup:
+            contract_id, new_type = lookup[symbol]
+        elif instrument_type == 'EQUITY' and (exchange or '').upper() in COMMODITY_EXCHANGES:
+            new_type = 'COMMODITY'
+        else:
+            continue
+        if contract_id is not None or new_type != instrument_type:
+            changed.append(ResearchCall(id=call_id, contract_id=contract_id, instrument_type=new_type))
+
+    if changed:
+        ResearchCall.objects.bulk_update(changed, ['contract', 'instrument_type'])
+
+
+def backfill_instrument_type(apps, schema_editor):
+    ResearchCall = apps.get_model('research_calls', 'ResearchCall')
+    DerivativeContract = apps.get_model('market_data', 'DerivativeContract')
+    rows = ResearchCall.objects.filter(contract__isnull=True).order_by('id').values_list(
+        'id', 'symbol', 'exchange', 'instrument_type',
+    )
+    batch = []
+    for row in rows.iterator(chunk_size=BATCH_SIZE):
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            _classify_batch(batch, ResearchCall, DerivativeContract)
+            batch = []
+    if batch:
+        _classify_batch(batch, ResearchCall, DerivativeContract)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('market_data', '0007_derivativecontract'),
+        ('research_calls', '0005_researchcall_date_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_instrument_type, migrations.RunPython.noop),
+    ]
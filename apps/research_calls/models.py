@@ -55,6 +55,10 @@ class ResearchCall(models.Model):
     company_name = models.CharField(max_length=255, null=True, blank=True)
     sector = models.CharField(max_length=100, null=True, blank=True, db_index=True)
     instrument_type = models.CharField(max_length=20, choices=INSTRUMENT_TYPE_CHOICES, default='EQUITY')
+    contract = models.ForeignKey(
+        'market_data.DerivativeContract', on_delete=models.SET_NULL, null=True, blank=True,
+        related_name='research_calls', db_constraint=False,
+    )
     
     # Call details
     call_type = models.CharField(max_length=20, choices=CALL_TYPE_CHOICES, db_index=True)
@@ -88,6 +92,12 @@ class ResearchCall(models.Model):
     # Versioning
     version = models.IntegerField(default=1)
     
+    # Bulk import row reference (lets bulk inserts be read back without RETURNING)
+    import_ref = models.CharField(max_length=64, null=True, blank=True, unique=True, editable=False)
+    
+    # Denormalized search text (symbol, company, sector, broker, rationale) under a FULLTEXT index
+    search_document = models.TextField(blank=True, default='', editable=False)
+    
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -100,6 +110,9 @@ class ResearchCall(models.Model):
             models.Index(fields=['broker', 'status']),
             models.Index(fields=['symbol']),
             models.Index(fields=['call_type', 'status']),
+            models.Index(fields=['status', 'instrument_type', 'published_at']),
+            models.Index(fields=['created_at']),
+            models.Index(fields=['closed_at']),
         ]
         ordering = ['-published_at', '-created_at']
     
@@ -138,8 +151,8 @@ class ResearchCall(models.Model):
             elif self.action == 'SELL' and self.target_3 >= self.target_2:
                 raise ValidationError('Target 3 must be less than Target 2 for SELL calls')
     
-    def save(self, *args, **kwargs):
-        # Calculate expected return and risk-reward ratio
+    def calculate_derived_fields(self):
+        """Calculate expected return and risk-reward ratio from price levels"""
         if self.action == 'BUY':
             potential_gain = float(self.target_1) - float(self.entry_price)
             potential_loss = float(self.entry_price) - float(self.stop_loss)
@@ -151,7 +164,28 @@ class ResearchCall(models.Model):
             self.risk_reward_ratio = round(potential_gain / potential_loss, 2)
         
         self.expected_return_percentage = round((potential_gain / float(self.entry_price)) * 100, 2)
-        
+    
+    def build_search_document(self, broker_name=None):
+        """Build the text indexed for full-text search"""
+        if broker_name is None and self.broker_id:
+            broker_name = self.broker.name
+        parts = [self.symbol, self.company_name, self.sector, broker_name, self.rationale]
+        return ' '.join(part for part in parts if part)
+    
+    def resolve_contract(self):
+        """Link the derivatives contract the symbol refers to and align instrument_type"""
+        if self.contract_id is not None:
+            return
+        from apps.market_data.contracts import resolve_contract
+        contract = resolve_contract(self.symbol, self.exchange, self.instrument_type)
+        if contract is not None:
+            self.contract = contract
+            self.instrument_type = contract.instrument_type
+    
+    def save(self, *args, **kwargs):
+        self.calculate_derived_fields()
+        self.resolve_contract()
+        self.search_document = self.build_search_document()
         super().save(*args, **kwargs)
 
 
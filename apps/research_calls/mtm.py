@@ -0,0 +1,104 @@
+"""
+Live mark-to-market for active research calls
+
+All ACTIVE calls are marked against one quote snapshot in a single
+vectorized pass, and the result is published to the cache as a compact
+call id -> metrics map that views and serializers join in memory.
+"""
+import numpy as np
+from django.core.cache import cache
+from django.utils import timezone
+
+from apps.research_calls.models import ResearchCall
+
+LIVE_METRICS_CACHE_KEY = 'research_calls:live_metrics'
+LIVE_METRICS_CACHE_TTL = 600  # 10 min; refreshed every few minutes by the beat task
+
+
+def compute_live_metrics(calls, quotes):
+    """
+    Vectorized live return and distance to target / stop loss
+
+    Distances are measured from the last price in the call's direction:
+    a positive distance means the level has not been reached yet.
+
+    Args:
+        calls: Iterable of (id, action, entry_price, target_1, stop_loss, symbol)
+        quotes: dict symbol -> last price
+
+    Returns:
+        dict: call id -> {'ltp', 'live_return', 'to_target', 'to_stop_loss'}
+    """
+    rows = [row for row in calls if row[5] in quotes]
+    if not rows:
+        return {}
+
+    ids = [row[0] for row in rows]
+    side = np.array([1.0 if row[1] == 'BUY' else -1.0 for row in rows])
+    prices = np.array(
+        [(row[2], row[3], row[4], quotes[row[5]]) for row in rows],
+        dtype=float,
+    )
+    entry, target, stop_loss, ltp = prices.T
+
+    live_return = np.round(side * (ltp - entry) / entry * 100, 2)
+    to_target = np.round(side * (target - ltp) / ltp * 100, 2)
+    to_stop_loss = np.round(side * (ltp - stop_loss) / ltp * 100, 2)
+
+    return {
+        call_id: {
+            'ltp': price,
+            'live_return': ret,
+            'to_target': tgt,
+            'to_stop_loss': sl,
+        }
+        for call_id, price, ret, tgt, sl in zip(
+            ids, ltp.tolist(), live_return.tolist(), to_target.tolist(), to_stop_loss.tolist()
+        )
+    }
+
+
+def mark_active_calls_to_market(quotes=None, refresh=True):
+    """
+    Mark every ACTIVE call to market and publish the metrics map
+
+    Args:
+        quotes: Optional symbol -> price snapshot (fetched when omitted)
+        refresh: Fetch live prices when building the snapshot
+
+    Returns:
+        int: Number of calls with live metrics
+    """
+    calls = list(ResearchCall.objects.filter(status='ACTIVE').values_list(
+        'id', 'action', 'entry_price', 'target_1', 'stop_loss', 'symbol'
+    ))
+    if quotes is None:
+        from apps.market_data.services import get_quote_snapshot
+        quotes = get_quote_snapshot({call[5] for call in calls}, refresh=refresh)
+
+    metrics = compute_live_metrics(calls, quotes)
+    cache.set(LIVE_METRICS_CACHE_KEY, {
+        'as_of': timezone.now().isoformat(),
+        'calls': metrics,
+    }, LIVE_METRICS_CACHE_TTL)
+    return len(metrics)
+
+
+def get_live_metrics():
+    """
+    The published live metrics map
+
+    Returns:
+        dict: call id -> metrics (empty until the first mark-to-market run)
+    """
+    snapshot = cache.get(LIVE_METRICS_CACHE_KEY)
+    return snapshot['calls'] if snapshot else {}
+
+
+def attach_live_metrics(calls, metrics=None):
+    """Set call.live_metrics on each call from the published map (None when unpriced)"""
+    if metrics is None:
+        metrics = get_live_metrics()
+    for call in calls:
+        call.live_metrics = metrics.get(call.id)
+    return calls
@@ -0,0 +1,112 @@
+"""
+Research call search - ranked full-text search with symbol prefix matching
+
+On MySQL this uses the FULLTEXT index over ResearchCall.search_document
+(symbol, company name, sector, broker name and rationale). Other backends
+fall back to a LIKE filter on the same single column.
+"""
+import re
+
+from django.db import connection
+from django.db.models import Case, FloatField, IntegerField, Q, Value, When
+from django.db.models.expressions import RawSQL
+
+# InnoDB ignores full-text tokens shorter than innodb_ft_min_token_size (3)
+MIN_FULLTEXT_TERM_LENGTH = 3
+
+MATCH_SQL = 'MATCH(research_calls.search_document) AGAINST (%s IN BOOLEAN MODE)'
+
+_TERM_RE = re.compile(r'[\w&.]+')
+_SYMBOL_RE = re.compile(r'[\w&.-]+')
+
+
+def tokenize(query):
+    """Split a search query into terms, dropping boolean-mode operators"""
+    return _TERM_RE.findall((query or '').strip())
+
+
+def _boolean_query(terms):
+    """Every term required, each matched as a prefix"""
+    return ' '.join(f'+{term}*' for term in terms if len(term) >= MIN_FULLTEXT_TERM_LENGTH)
+
+
+def search_calls(queryset, query):
+    """
+    Filter and rank a ResearchCall queryset by a free-text query
+
+    Symbols are matched by prefix (using the symbol index); everything else
+    goes through the full-text index. Results are ordered exact symbol match
+    first, then symbol prefix matches, then by full-text relevance.
+
+    Args:
+        queryset: ResearchCall queryset
+        query: Search string
+
+    Returns:
+        QuerySet: Filtered, ranked queryset (annotated with symbol_rank and text_rank)
+    """
+    terms = tokenize(query)
+    if not terms:
+        return queryset
+
+    # The whole query first: symbols such as BAJAJ-AUTO tokenize into two terms
+    symbol = (query or '').strip().upper()
+    if not _SYMBOL_RE.fullmatch(symbol):
+        symbol = terms[0].upper() if len(terms) == 1 else None
+    symbol_match = Q(symbol__istartswith=symbol) if symbol else Q(pk__in=[])
+
+    if connection.vendor == 'mysql':
+        boolean_query = _boolean_query(terms)
+        if boolean_query:
+            relevance = RawSQL(MATCH_SQL, [boolean_query], output_field=FloatField())
+        else:
+            relevance = Value(0.0, output_field=FloatField())
+        queryset = queryset.annotate(text_rank=relevance).filter(symbol_match | Q(text_rank__gt=0))
+    else:
+        text_match = Q()
+        for term in terms:
+            text_match &= Q(search_document__icontains=term)
+        queryset = queryset.annotate(
+            text_rank=Value(0.0, output_field=FloatField())
+        ).filter(symbol_match | text_match)
+
+    if symbol:
+        symbol_rank = Case(
+            When(symbol=symbol, then=Value(2)),
+            When(symbol__startswith=symbol, then=Value(1)),
+            default=Value(0),
+            output_field=IntegerField(),
+        )
+    else:
+        symbol_rank = Value(0, output_field=IntegerField())
+    return queryset.annotate(
+        symbol_rank=symbol_rank,
+    ).order_by('-symbol_rank', '-text_rank', '-published_at', '-id')
+
+
+def reindex_calls(queryset, chunk_size=1000):
+    """
+    Rebuild search_document for a set of calls in chunked bulk updates
+
+    Args:
+        queryset: ResearchCall queryset to reindex
+        chunk_size: Rows per UPDATE batch
+
+    Returns:
+        int: Number of calls reindexed
+    """
+    from apps.research_calls.models import ResearchCall
+
+    updated = 0
+    batch = []
+    for call in queryset.select_related('broker').iterator(chunk_size=chunk_size):
+        call.search_document = call.build_search_document()
+        batch.append(call)
+        if len(batch) >= chunk_size:
+            ResearchCall.objects.bulk_update(batch, ['search_document'])
+            updated += len(batch)
+            batch = []
+    if batch:
+        ResearchCall.objects.bulk_update(batch, ['search_document'])
+        updated += len(batch)
+    return updated
@@ -0,0 +1,200 @@
+"""
+Market sentiment counters - BUY/SELL counts of ACTIVE calls without COUNT(*)
+
+ACTIVE calls are counted by action overall, per call type and per sector
+in the cache, adjusted with atomic INCR/DECR when a call enters or leaves
+ACTIVE (see apps.research_calls.signals; bulk transitions pass their
+deltas directly) once the writing transaction commits. A missing counter
+makes the next read rebuild all of them with one GROUP BY, and the hourly
+reconciliation corrects drift from writes that bypass signals.
+"""
+from collections import Counter
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count
+
+SENTIMENT_TTL = None  # kept until deleted; the reconciliation corrects drift
+SECTORS_KEY = 'sentiment:sectors'
+ACTIONS = ('BUY', 'SELL')
+CALL_TYPES = ('INTRADAY', 'SWING', 'SHORT_TERM', 'MEDIUM_TERM', 'LONG_TERM', 'POSITIONAL')
+
+BULLISH_THRESHOLD = 65  # percent of active calls on one side
+
+
+def counter_key(name):
+    return f'sentiment:{name}'
+
+
+def bucket_names(action, sector, call_type):
+    """Counters an ACTIVE call with these attributes counts towards"""
+    names = [action, f'type:{call_type}:{action}']
+    if sector:
+        names.append(f'sector:{sector}:{action}')
+    return names
+
+
+def compute_sentiment_counts():
+    """
+    Count ACTIVE calls per counter from the database, one GROUP BY
+
+    Returns:
+        tuple: (counts, sectors) - counter name -> count, and the sectors
+            of the ACTIVE calls
+    """
+    from apps.research_calls.models import ResearchCall
+
+    counts = Counter({action: 0 for action in ACTIONS})
+    for call_type in CALL_TYPES:
+        for action in ACTIONS:
+            counts[f'type:{call_type}:{action}'] = 0
+
+    sectors = set()
+    for row in ResearchCall.objects.filter(status='ACTIVE').order_by().values(
+        'action', 'sector', 'call_type',
+    ).annotate(total=Count('id')):
+        for name in bucket_names(row['action'], row['sector'], row['call_type']):
+            counts[name] += row['total']
+        if row['sector']:
+            sectors.add(row['sector'])
+    for sector in sectors:
+        for action in ACTIONS:
+            counts.setdefault(f'sector:{sector}:{action}', 0)
+    return dict(counts), sorted(sectors)
+
+
+def rebuild_sentiment_counts():
+    """Recount every counter and the sector list into the cache"""
+    counts, sectors = compute_sentiment_counts()
+    cache.set_many({counter_key(name): count for name, count in counts.items()}, SENTIMENT_TTL)
+    cache.set(SECTORS_KEY, sectors, SENTIMENT_TTL)
+    return counts, sectors
+
+
+def adjust_sentiment_counts(deltas):
+    """
+    Atomically add to the cached counters
+
+    A missing counter (a sector seen for the first time, or an evicted
+    key) drops the sector list, so the next breakdown read recounts.
+
+    Args:
+        deltas: dict counter name -> change
+    """
+    for name, delta in deltas.items():
+        if not delta:
+            continue
+        try:
+            count = cache.incr(counter_key(name), delta)
+        except ValueError:
+            cache.delete(SECTORS_KEY)
+            continue
+        if count < 0:
+            cache.delete_many([counter_key(name), SECTORS_KEY])
+
+
+def record_sentiment_deltas(deltas):
+    """
+    Apply counter changes once the current transaction commits
+
+    Args:
+        deltas: dict counter name -> change
+    """
+    deltas = {name: delta for name, delta in deltas.items() if delta}
+    if deltas:
+        transaction.on_commit(lambda: adjust_sentiment_counts(deltas))
+
+
+def _sentiment(buy, sell):
+    total = buy + sell
+    if total == 0:
+        return {'sentiment': 'NEUTRAL', 'buy_pct': 50, 'sell_pct': 50, 'total': 0, 'buy_count': 0, 'sell_count': 0}
+
+    buy_pct = round((buy / total) * 100, 1)
+    sell_pct = round((sell / total) * 100, 1)
+    if buy_pct > BULLISH_THRESHOLD:
+        sentiment = 'BULLISH'
+    elif sell_pct > BULLISH_THRESHOLD:
+        sentiment = 'BEARISH'
+    else:
+        sentiment = 'NEUTRAL'
+    return {
+        'sentiment': sentiment,
+        'buy_pct': buy_pct,
+        'sell_pct': sell_pct,
+        'total': total,
+        'buy_count': buy,
+        'sell_count': sell,
+    }
+
+
+def get_sentiment():
+    """
+    Overall sentiment of the ACTIVE calls
+
+    Returns:
+        dict: sentiment, buy_pct, sell_pct, total, buy_count and sell_count
+    """
+    cached = cache.get_many([counter_key(action) for action in ACTIONS])
+    if len(cached) < len(ACTIONS):
+        counts, _ = rebuild_sentiment_counts()
+    else:
+        counts = {action: cached[counter_key(action)] for action in ACTIONS}
+    return _sentiment(max(counts['BUY'], 0), max(counts['SELL'], 0))
+
+
+def get_sentiment_breakdown():
+    """
+    Sentiment overall, per call type and per sector
+
+    Returns:
+        dict: overall -> sentiment, by_call_type and by_sector -> {name: sentiment}
+            (types and sectors without ACTIVE calls are left out)
+    """
+    sectors = cache.get(SECTORS_KEY)
+    names = list(ACTIONS)
+    groups = {
+        'by_call_type': [(call_type, f'type:{call_type}') for call_type in CALL_TYPES],
+        'by_sector': [(sector, f'sector:{sector}') for sector in sectors or ()],
+    }
+    for entries in groups.values():
+        names.extend(f'{prefix}:{action}' for _, prefix in entries for action in ACTIONS)
+
+    cached = cache.get_many([counter_key(name) for name in names])
+    if sectors is None or len(cached) < len(names):
+        counts, sectors = rebuild_sentiment_counts()
+        groups['by_sector'] = [(sector, f'sector:{sector}') for sector in sectors]
+    else:
+        counts = {name: cached[counter_key(name)] for name in names}
+
+    breakdown = {'overall': _sentiment(max(counts['BUY'], 0), max(counts['SELL'], 0))}
+    for group, entries in groups.items():
+        breakdown[group] = {}
+        for label, prefix in entries:
+            buy = max(counts.get(f'{prefix}:BUY', 0), 0)
+            sell = max(counts.get(f'{prefix}:SELL', 0), 0)
+            if buy + sell:
+                breakdown[group][label] = _sentiment(buy, sell)
+    return breakdown
+
+
+def invalidate_sentiment_counts():
+    """Drop the overall counters and sector list so the next read recounts"""
+    cache.delete_many([counter_key(action) for action in ACTIONS] + [SECTORS_KEY])
+
+
+def reconcile_sentiment_counts():
+    """
+    Correct cached counters that drifted from the database
+
+    Returns:
+        int: Number of counters corrected
+    """
+    counts, sectors = compute_sentiment_counts()
+    keys = {name: counter_key(name) for name in counts}
+    cached = cache.get_many(keys.values())
+    fixes = {keys[name]: count for name, count in counts.items() if cached.get(keys[name]) != count}
+    if fixes:
+        cache.set_many(fixes, SENTIMENT_TTL)
+    cache.set(SECTORS_KEY, sectors, SENTIMENT_TTL)
+    return len(fixes)
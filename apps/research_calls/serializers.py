@@ -5,6 +5,7 @@ from rest_framework import serializers
 
 from apps.brokers.serializers import BrokerSerializer
 from apps.research_calls.models import ResearchCall, ResearchCallEvent, ResearchCallVersion
+from apps.research_calls.mtm import get_live_metrics
 
 
 class ResearchCallEventSerializer(serializers.ModelSerializer):
@@ -59,6 +60,7 @@ class ResearchCallListSerializer(serializers.ModelSerializer):
     """Lightweight serializer for list views."""
 
     broker_name = serializers.CharField(source='broker.name', read_only=True)
+    live_metrics = serializers.SerializerMethodField()
 
     class Meta:
         model = ResearchCall
@@ -66,11 +68,19 @@ class ResearchCallListSerializer(serializers.ModelSerializer):
             'id', 'symbol', 'company_name', 'broker_name',
             'call_type', 'instrument_type', 'action',
             'entry_price', 'target_1', 'stop_loss',
-            'status', 'published_at',
+            'status', 'published_at', 'live_metrics',
         ]
         read_only_fields = fields
 
 
+    def get_live_metrics(self, obj):
+        if obj.status != 'ACTIVE':
+            return None
+        # One cache read per response, shared by every row through the root context
+        metrics = self.context.setdefault('live_metrics', get_live_metrics())
+        return metrics.get(obj.id)
+
+
 class ResearchCallCreateSerializer(serializers.ModelSerializer):
     """Serializer for creating a new research call."""
 
@@ -1,10 +1,23 @@
 """
 Research call services - Business logic for research call operations
 """
+import hashlib
+import json
+import time
+
+from django.core.cache import cache
 from django.db import transaction
+from django.db.models import Avg, Count, Max, Min, Q
 from django.utils import timezone
 from apps.research_calls.models import ResearchCall, ResearchCallEvent, ResearchCallVersion
 from apps.audit.models import AuditLog
+from apps.notifications.services import notify_call_published
+
+CLOSED_SUMMARY_CACHE_TTL = 3600  # 1 hour; invalidated early when a call closes
+CLOSED_SUMMARY_GENERATION_KEY = 'research_calls:closed_summary:generation'
+
+WIN_FILTER = Q(actual_return_percentage__gt=0)
+LOSS_FILTER = Q(actual_return_percentage__lte=0)
 
 
 @transaction.atomic
@@ -140,7 +153,8 @@ def publish_research_call(call, published_by):
         changes_json={'status': 'ACTIVE'},
     )
     
-    # Future: Send notifications to subscribers
+    # Fan out to subscribers once the publish commits
+    notify_call_published(call)
     
     return call
 
@@ -181,3 +195,106 @@ def close_research_call(call, reason, closed_by):
     )
     
     return call
+
+
+def _summary_bucket(row, prefix, label):
+    total = row[f'{prefix}_total']
+    wins = row[f'{prefix}_wins']
+    avg_return = row[f'{prefix}_avg']
+    return {
+        'label': label,
+        'total': total,
+        'wins': wins,
+        'accuracy': round(wins / total * 100, 2) if total else 0,
+        'avg_return': round(float(avg_return), 2) if avg_return is not None else 0,
+    }
+
+
+def summarize_closed_calls(queryset):
+    """
+    Performance summary of closed calls in a single aggregate query
+
+    Totals, wins/losses, average/best/worst return and per call type and
+    per instrument accuracy are all conditional aggregates over one scan.
+
+    Args:
+        queryset: ResearchCall queryset (already filtered to CLOSED calls)
+
+    Returns:
+        dict: Summary with 'by_call_type' and 'by_instrument' breakdowns
+    """
+    aggregates = {
+        'total': Count('id'),
+        'wins': Count('id', filter=WIN_FILTER),
+        'losses': Count('id', filter=LOSS_FILTER),
+        'avg_return': Avg('actual_return_percentage'),
+        'best_return': Max('actual_return_percentage'),
+        'worst_return': Min('actual_return_percentage'),
+    }
+    breakdowns = {
+        'by_call_type': ('call_type', ResearchCall.CALL_TYPE_CHOICES),
+        'by_instrument': ('instrument_type', ResearchCall.INSTRUMENT_TYPE_CHOICES),
+    }
+    for field, choices in breakdowns.values():
+        for code, _ in choices:
+            match = Q(**{field: code})
+            prefix = f'{field}_{code}'
+            aggregates[f'{prefix}_total'] = Count('id', filter=match)
+            aggregates[f'{prefix}_wins'] = Count('id', filter=match & WIN_FILTER)
+            aggregates[f'{prefix}_avg'] = Avg('actual_return_percentage', filter=match)
+
+    row = queryset.order_by().aggregate(**aggregates)
+
+    total = row['total']
+    summary = {
+        'total': total,
+        'wins': row['wins'],
+        'losses': row['losses'],
+        'accuracy': round(row['wins'] / total * 100, 2) if total else 0,
+    }
+    for key in ('avg_return', 'best_return', 'worst_return'):
+        summary[key] = round(float(row[key]), 2) if row[key] is not None else None
+    for name, (field, choices) in breakdowns.items():
+        summary[name] = {
+            code: _summary_bucket(row, f'{field}_{code}', label)
+            for code, label in choices
+        }
+    return summary
+
+
+def get_closed_call_summary(search=None, **filters):
+    """
+    Cached closed-call performance summary for a filter combination
+
+    Results are cached per filter combination and stay valid until a call
+    closes (see invalidate_closed_call_summary).
+
+    Args:
+        search: Optional free-text search (see search_calls)
+        **filters: ResearchCall field lookups, e.g. broker_id=3, call_type='SWING'
+
+    Returns:
+        dict: Summary (see summarize_closed_calls)
+    """
+    generation = cache.get_or_set(CLOSED_SUMMARY_GENERATION_KEY, time.time_ns, None)
+    fingerprint = json.dumps([sorted(filters.items()), (search or '').strip().lower()], default=str)
+    cache_key = f'research_calls:closed_summary:{generation}:{hashlib.md5(fingerprint.encode()).hexdigest()}'
+
+    summary = cache.get(cache_key)
+    if summary is None:
+        queryset = ResearchCall.objects.filter(status='CLOSED', **filters)
+        if search:
+            from apps.research_calls.search import search_calls
+            queryset = search_calls(queryset, search)
+        summary = summarize_closed_calls(queryset)
+        cache.set(cache_key, summary, CLOSED_SUMMARY_CACHE_TTL)
+    return summary
+
+
+def invalidate_closed_call_summary():
+    """Drop every cached closed-call summary by moving to a new cache generation"""
+    try:
+        cache.incr(CLOSED_SUMMARY_GENERATION_KEY)
+    except ValueError:
+        # Generation was evicted; start from a fresh value that cannot collide
+        cache.set(CLOSED_SUMMARY_GENERATION_KEY, time.time_ns(), None)
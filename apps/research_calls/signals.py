@@ -0,0 +1,115 @@
+"""
+Research call signals for keeping denormalized data in sync
+"""
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
+from django.dispatch import receiver
+from apps.brokers.models import Broker
+from apps.research_calls.models import ResearchCall
+
+
+@receiver(pre_save, sender=Broker)
+def broker_pre_save(sender, instance, **kwargs):
+    """Remember the stored broker name so renames can be detected"""
+    if instance.pk:
+        instance._previous_name = Broker.objects.filter(pk=instance.pk).values_list('name', flat=True).first()
+
+
+@receiver(post_save, sender=Broker)
+def broker_post_save(sender, instance, created, **kwargs):
+    """Rebuild call search documents when a broker is renamed"""
+    previous_name = getattr(instance, '_previous_name', None)
+    if created or previous_name is None or previous_name == instance.name:
+        return
+
+    from apps.research_calls.search import reindex_calls
+    reindex_calls(instance.research_calls.all())
+
+
+CLOSE_STATE_FIELDS = ('status', 'actual_return_percentage')
+
+
+def _close_state(call):
+    """(status, actual return) of a call, or None when a field was deferred"""
+    if any(field not in call.__dict__ for field in CLOSE_STATE_FIELDS):
+        return None
+    return call.status, call.actual_return_percentage
+
+
+@receiver(post_init, sender=ResearchCall)
+def research_call_snapshot_close_state(sender, instance, **kwargs):
+    """Note the loaded status and return so closes can be detected without a query"""
+    instance._previous_close_state = _close_state(instance)
+
+
+@receiver(post_save, sender=ResearchCall)
+def research_call_post_save(sender, instance, created, **kwargs):
+    """Invalidate closed-call summaries when a call closes (or a closed call changes)"""
+    previous = (None, None) if created else getattr(instance, '_previous_close_state', None)
+    current = _close_state(instance)
+    instance._previous_close_state = current
+    if previous is not None and current is not None:
+        previous_status, previous_return = previous
+        if instance.status != 'CLOSED' and previous_status != 'CLOSED':
+            return
+        if previous == current:
+            return
+
+    from apps.research_calls.services import invalidate_closed_call_summary
+    invalidate_closed_call_summary()
+
+
+@receiver(post_delete, sender=ResearchCall)
+def research_call_post_delete(sender, instance, **kwargs):
+    """Deleting a closed call changes the closed-call summaries"""
+    if instance.status == 'CLOSED':
+        from apps.research_calls.services import invalidate_closed_call_summary
+        invalidate_closed_call_summary()
+
+
+SENTIMENT_FIELDS = ('status', 'action', 'sector', 'call_type')
+
+
+def _sentiment_counters(call):
+    """Sentiment counters of a call (none unless ACTIVE), or None when a field was deferred"""
+    if any(field not in call.__dict__ for field in SENTIMENT_FIELDS):
+        return None
+    if call.status != 'ACTIVE':
+        return set()
+
+    from apps.research_calls.sentiment import bucket_names
+    return set(bucket_names(call.action, call.sector, call.call_type))
+
+
+@receiver(post_init, sender=ResearchCall)
+def research_call_post_init(sender, instance, **kwargs):
+    """Note which sentiment counters a loaded call counts towards"""
+    instance._sentiment_counters = _sentiment_counters(instance)
+
+
+@receiver(post_save, sender=ResearchCall)
+def research_call_count_sentiment(sender, instance, created, raw=False, **kwargs):
+    """Adjust the sentiment counters when a call enters or leaves ACTIVE"""
+    if raw:
+        return
+    from apps.research_calls.sentiment import invalidate_sentiment_counts, record_sentiment_deltas
+
+    new = _sentiment_counters(instance)
+    old = set() if created else getattr(instance, '_sentiment_counters', None)
+    if new is None or old is None:
+        invalidate_sentiment_counts()
+    elif new != old:
+        deltas = {name: 1 for name in new - old}
+        deltas.update({name: -1 for name in old - new})
+        record_sentiment_deltas(deltas)
+    instance._sentiment_counters = new
+
+
+@receiver(post_delete, sender=ResearchCall)
+def research_call_uncount_sentiment(sender, instance, **kwargs):
+    counters = getattr(instance, '_sentiment_counters', None)
+    if counters is None:
+        from apps.research_calls.sentiment import invalidate_sentiment_counts
+        invalidate_sentiment_counts()
+    elif counters:
+        from apps.research_calls.sentiment import record_sentiment_deltas
+        record_sentiment_deltas({name: -1 for name in counters})
@@ -0,0 +1,37 @@
+"""
+Celery tasks for research calls
+"""
+from celery import shared_task
+import logging
+
+from apps.research_calls.mtm import mark_active_calls_to_market
+from apps.research_calls.sentiment import reconcile_sentiment_counts
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def task_mark_calls_to_market():
+    """Mark all ACTIVE calls to market and publish the live metrics map"""
+    logger.info("Executing periodic task: task_mark_calls_to_market")
+    try:
+        marked = mark_active_calls_to_market()
+        logger.info(f"Marked {marked} active calls to market")
+        return marked
+    except Exception as e:
+        logger.error(f"Error in task_mark_calls_to_market: {e}")
+        return 0
+
+
+@shared_task
+def task_reconcile_sentiment_counts():
+    """Correct market sentiment counters that drifted from the database"""
+    logger.info("Executing periodic task: task_reconcile_sentiment_counts")
+    try:
+        corrected = reconcile_sentiment_counts()
+        if corrected:
+            logger.info(f"Corrected {corrected} market sentiment counters")
+        return corrected
+    except Exception as e:
+        logger.error(f"Error in task_reconcile_sentiment_counts: {e}")
+        return 0
@@ -1,13 +1,39 @@
 """
 Tests for research call models and services
 """
-from django.test import TestCase
+from unittest import mock
+
+from django.test import TestCase, override_settings
 from django.contrib.auth import get_user_model
 from apps.brokers.models import Broker
-from apps.research_calls.models import ResearchCall, ResearchCallEvent
+from apps.research_calls.models import ResearchCall, ResearchCallEvent, ResearchCallVersion
 from apps.research_calls.forms import ResearchCallForm
-from apps.research_calls.services import create_research_call, approve_research_call, publish_research_call
+from apps.research_calls.services import (
+    create_research_call, approve_research_call, publish_research_call, close_research_call,
+    get_closed_call_summary,
+)
+from apps.research_calls.bulk import bulk_transition_calls
+from apps.research_calls.imports import import_research_calls, parse_call_file
+from apps.research_calls.search import search_calls
+from apps.research_calls.mtm import get_live_metrics, mark_active_calls_to_market
+from apps.research_calls.sentiment import (
+    compute_sentiment_counts, get_sentiment, get_sentiment_breakdown, reconcile_sentiment_counts,
+)
+from apps.audit.models import AuditLog
+from apps.notifications.models import EmailOutbox, Notification, NotificationPreferences
+from apps.notifications.services import deliver_call_published, fan_out_call_published
+from apps.notifications.tasks import (
+    task_deliver_call_published, task_drain_email_outbox, task_notify_call_published,
+)
+from apps.core.pagination import paginate_keyset, paginate_ranked
+from apps.core.testing import AdminCallFixtureMixin
+from apps.admin_panel.metrics import compute_metrics, get_metrics
+from apps.market_data.contracts import load_contracts, parse_contract_file, parse_trading_symbol
+from apps.market_data.models import DerivativeContract
+from django.urls import reverse
+from django.utils import timezone
 from decimal import Decimal
+from io import BytesIO
 from datetime import date, timedelta
 
 User = get_user_model()
@@ -180,3 +206,526 @@ class ResearchCallFormTest(TestCase):
         # Wait, I didn't add custom clean to form, only model has clean.
         # ModelForm validation calls model.clean().
         self.assertFalse(form.is_valid())
+
+
+class ResearchCallImportTest(TestCase):
+    """Test bulk research call imports"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='importer@example.com',
+            first_name='Import',
+            last_name='Analyst',
+            password='TestPass123!',
+            role='ANALYST'
+        )
+        self.broker = Broker.objects.create(name='Import Broker', slug='import-broker')
+        self.csv = (
+            b'symbol,broker,call_type,action,entry_price,target_1,stop_loss,sector\n'
+            b'tcs,Import Broker,SHORT_TERM,BUY,3500,3700,3400,IT\n'
+            b'INFY,import-broker,SWING,SELL,1500,1400,1550,IT\n'
+        )
+
+    def test_import_creates_calls_and_history(self):
+        rows = parse_call_file(BytesIO(self.csv), 'csv')
+        result = import_research_calls(rows, created_by=self.user, chunk_size=1)
+
+        self.assertEqual(result['created'], 2)
+        self.assertEqual(result['errors'], [])
+        call = ResearchCall.objects.get(symbol='TCS')
+        self.assertEqual(call.broker, self.broker)
+        self.assertEqual(call.status, 'DRAFT')
+        self.assertEqual(call.risk_reward_ratio, Decimal('2.00'))
+        self.assertEqual(ResearchCallEvent.objects.filter(event_type='CREATED').count(), 2)
+        self.assertEqual(ResearchCallVersion.objects.filter(research_call=call).count(), 1)
+        self.assertTrue(AuditLog.objects.filter(model_name='ResearchCall', object_id=call.id).exists())
+
+    def test_import_reports_all_row_errors(self):
+        rows = parse_call_file(BytesIO(self.csv), 'csv') + [
+            {'symbol': 'SBIN', 'broker': 'Nobody', 'call_type': 'SWING', 'action': 'BUY',
+             'entry_price': '600', 'target_1': '650', 'stop_loss': '580'},
+            {'symbol': 'ITC', 'broker': 'Import Broker', 'call_type': 'SWING', 'action': 'BUY',
+             'entry_price': '400', 'target_1': '390', 'stop_loss': '380'},
+        ]
+        result = import_research_calls(rows, created_by=self.user)
+
+        self.assertEqual(result['created'], 0)
+        self.assertEqual([error['row'] for error in result['errors']], [3, 4])
+        self.assertFalse(ResearchCall.objects.exists())
+
+        result = import_research_calls(rows, created_by=self.user, skip_invalid=True)
+        self.assertEqual(result['created'], 2)
+
+    def test_import_rejects_non_finite_and_oversized_values(self):
+        valid = {'broker': 'Import Broker', 'call_type': 'SWING', 'action': 'BUY',
+                 'entry_price': '600', 'target_1': '650', 'stop_loss': '580'}
+        rows = [
+            {**valid, 'symbol': 'SBIN', 'entry_price': 'NaN'},
+            {**valid, 'symbol': 'ITC', 'stop_loss': 'sNaN', 'target_1': 'Infinity'},
+            {**valid, 'symbol': 'HDFC', 'target_1': '1e20'},
+            {**valid, 'symbol': 'X' * 51, 'sector': 'S' * 101},
+            {**valid, 'symbol': 'WIPRO', 'entry_price': '0.01', 'target_1': '9999999999', 'stop_loss': '0.005'},
+        ]
+        result = import_research_calls(rows, created_by=self.user)
+
+        self.assertEqual(result['created'], 0)
+        errors = {error['row']: error['errors'] for error in result['errors']}
+        self.assertEqual(sorted(errors), [1, 2, 3, 4, 5])
+        self.assertEqual(errors[1], ['entry_price must be a number'])
+        self.assertEqual(errors[2], ['target_1 must be a number', 'stop_loss must be a number'])
+        self.assertIn('target_1 must have at most 10 digits before the decimal point', errors[3])
+        self.assertEqual(errors[4], ['symbol must be at most 50 characters', 'sector must be at most 100 characters'])
+        self.assertFalse(ResearchCall.objects.exists())
+
+
+class ResearchCallSearchTest(TestCase):
+    """Test research call search"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='search@example.com',
+            first_name='Search',
+            last_name='Analyst',
+            password='TestPass123!',
+            role='ANALYST'
+        )
+        self.broker = Broker.objects.create(name='Motilal Research', slug='motilal-research')
+        common = {
+            'created_by': self.user, 'broker': self.broker, 'action': 'BUY', 'call_type': 'SWING',
+            'entry_price': Decimal('100.00'), 'target_1': Decimal('110.00'), 'stop_loss': Decimal('95.00'),
+        }
+        self.tcs = ResearchCall.objects.create(symbol='TCS', company_name='Tata Consultancy', sector='IT', **common)
+        self.tcsl = ResearchCall.objects.create(symbol='TCSLTD', **common)
+        self.tata = ResearchCall.objects.create(symbol='TATASTEEL', rationale='Steel demand via TCS vendors', **common)
+
+    def test_symbol_prefix_ranked_first(self):
+        results = list(search_calls(ResearchCall.objects.all(), 'tcs'))
+        self.assertEqual(results[:2], [self.tcs, self.tcsl])
+        self.assertIn(self.tata, results)
+
+    def test_hyphenated_symbol_ranked_first(self):
+        bajaj = ResearchCall.objects.create(
+            symbol='BAJAJ-AUTO', created_by=self.user, broker=self.broker, action='BUY', call_type='SWING',
+            entry_price=Decimal('100.00'), target_1=Decimal('110.00'), stop_loss=Decimal('95.00'),
+        )
+        results = list(search_calls(ResearchCall.objects.all(), ' bajaj-auto '))
+        self.assertEqual(results, [bajaj])
+        self.assertEqual(results[0].symbol_rank, 2)
+
+    def test_ranked_results_paginate_by_cursor(self):
+        ranked = search_calls(ResearchCall.objects.all(), 'tcs')
+        expected = list(ranked)
+        pages, cursor = [], None
+        while True:
+            page = paginate_ranked(ranked, cursor, page_size=1)
+            pages.append(page)
+            cursor = page.next_cursor
+            if not cursor:
+                break
+        self.assertEqual([page.items[0] for page in pages], expected)
+
+        back = paginate_ranked(ranked, page_size=1, before=pages[-1].previous_cursor)
+        self.assertEqual(back.items, pages[-2].items)
+
+    def test_search_document_includes_broker(self):
+        results = search_calls(ResearchCall.objects.all(), 'Motilal')
+        self.assertEqual(results.count(), 3)
+
+        self.broker.name = 'Renamed House'
+        self.broker.save()
+        self.assertEqual(search_calls(ResearchCall.objects.all(), 'Motilal').count(), 0)
+        self.assertEqual(search_calls(ResearchCall.objects.all(), 'Renamed').count(), 3)
+
+
+class LiveCallsPaginationTest(TestCase):
+    """Test keyset pagination of live calls"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='pager@example.com',
+            first_name='Page',
+            last_name='Analyst',
+            password='TestPass123!',
+            role='ANALYST'
+        )
+        broker = Broker.objects.create(name='Pager Broker', slug='pager-broker')
+        published_at = timezone.now()
+        # Pairs of calls share a published_at so the id tie-break is exercised
+        for i in range(5):
+            ResearchCall.objects.create(
+                created_by=self.user, broker=broker, symbol=f'SYM{i}', action='BUY', call_type='SWING',
+                entry_price=Decimal('100.00'), target_1=Decimal('110.00'), stop_loss=Decimal('95.00'),
+                status='ACTIVE', published_at=published_at - timedelta(minutes=i // 2),
+            )
+
+    def test_pages_cover_all_calls_once(self):
+        calls = ResearchCall.objects.filter(status='ACTIVE')
+        seen = []
+        cursor = None
+        while True:
+            page = paginate_keyset(calls, cursor, page_size=2)
+            seen.extend(call.pk for call in page)
+            if not page.has_next:
+                break
+            cursor = page.next_cursor
+        expected = list(calls.order_by('-published_at', '-id').values_list('id', flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_json_fragment(self):
+        url = reverse('research_calls:live_calls')
+        first = self.client.get(url, {'format': 'json', 'page_size': 3}).json()
+        self.assertTrue(first['has_next'])
+        self.assertEqual(first['html'].count('SYM'), 3)
+
+        second = self.client.get(url, {'format': 'json', 'page_size': 3, 'cursor': first['next_cursor']}).json()
+        self.assertFalse(second['has_next'])
+        self.assertIsNone(second['next_cursor'])
+
+        self.assertEqual(self.client.get(url, {'cursor': 'not-a-cursor'}).status_code, 400)
+
+
+class ClosedCallSummaryTest(TestCase):
+    """Test the cached closed-call performance summary"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='summary@example.com',
+            first_name='Summary',
+            last_name='Analyst',
+            password='TestPass123!',
+            role='ANALYST'
+        )
+        self.broker = Broker.objects.create(name='Summary Broker', slug='summary-broker')
+        self.common = {
+            'created_by': self.user, 'broker': self.broker, 'action': 'BUY',
+            'entry_price': Decimal('100.00'), 'target_1': Decimal('110.00'), 'stop_loss': Decimal('95.00'),
+        }
+        for symbol, call_type, returns in [('AAA', 'SWING', '8.00'), ('BBB', 'SWING', '-4.00'), ('CCC', 'INTRADAY', '2.00')]:
+            ResearchCall.objects.create(
+                symbol=symbol, call_type=call_type, status='CLOSED',
+                actual_return_percentage=Decimal(returns), **self.common
+            )
+
+    def test_summary_breakdown(self):
+        summary = get_closed_call_summary()
+        self.assertEqual((summary['total'], summary['wins'], summary['losses']), (3, 2, 1))
+        self.assertEqual(summary['best_return'], 8.0)
+        self.assertEqual(summary['worst_return'], -4.0)
+        self.assertEqual(summary['by_call_type']['SWING']['accuracy'], 50.0)
+        self.assertEqual(summary['by_instrument']['EQUITY']['total'], 3)
+        self.assertEqual(get_closed_call_summary(call_type='INTRADAY')['total'], 1)
+
+    def test_cache_invalidated_when_call_closes(self):
+        self.assertEqual(get_closed_call_summary()['total'], 3)
+
+        call = ResearchCall.objects.create(
+            symbol='DDD', call_type='SWING', status='ACTIVE',
+            actual_return_percentage=Decimal('5.00'), **self.common
+        )
+        with self.assertNumQueries(0):
+            self.assertEqual(get_closed_call_summary()['total'], 3)
+
+        close_research_call(call, 'Target hit', self.user)
+        self.assertEqual(get_closed_call_summary()['total'], 4)
+
+    def test_reloaded_closed_call_change_invalidates_without_select(self):
+        self.assertEqual(get_closed_call_summary()['best_return'], 8.0)
+        call = ResearchCall.objects.select_related('broker').get(symbol='CCC')
+        call.actual_return_percentage = Decimal('12.00')
+        with self.assertNumQueries(1):
+            call.save(update_fields=['actual_return_percentage'])
+        self.assertEqual(get_closed_call_summary()['best_return'], 12.0)
+
+
+class DerivativeContractTest(TestCase):
+    """Test contract master parsing and call classification"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='fno@example.com',
+            first_name='Fno',
+            last_name='Analyst',
+            password='TestPass123!',
+            role='ANALYST'
+        )
+        self.broker = Broker.objects.create(name='Fno Broker', slug='fno-broker')
+
+    def test_parse_trading_symbols(self):
+        option = parse_trading_symbol('NIFTY24JUN23500CE')
+        self.assertEqual(option['underlying'], 'NIFTY')
+        self.assertEqual(option['expiry'], date(2024, 6, 27))
+        self.assertEqual((option['strike'], option['option_type']), (Decimal('23500'), 'CE'))
+
+        weekly = parse_trading_symbol('NIFTY2461323500PE')
+        self.assertEqual(weekly['expiry'], date(2024, 6, 13))
+        self.assertEqual(weekly['instrument_type'], 'OPTIONS')
+
+        self.assertEqual(parse_trading_symbol('GOLD24AUGFUT', 'MCX')['instrument_type'], 'COMMODITY')
+        # Equity symbols that merely contain CE/PE are not options
+        self.assertIsNone(parse_trading_symbol('PEL'))
+        self.assertIsNone(parse_trading_symbol('ACE'))
+
+    def test_contract_file_load_and_call_classification(self):
+        contract_file = BytesIO(
+            b'tradingsymbol,name,expiry,strike,lot_size,instrument_type,exchange\n'
+            b'BANKNIFTY24JUNFUT,BANKNIFTY,2024-06-26,0,15,FUT,NFO\n'
+            b'CRUDEOIL24JUL6500CE,CRUDEOIL,2024-07-16,6500,100,CE,MCX\n'
+        )
+        contracts, skipped = parse_contract_file(contract_file)
+        self.assertEqual((len(contracts), skipped), (2, 0))
+        load_contracts(contracts)
+        future = DerivativeContract.objects.get(trading_symbol='BANKNIFTY24JUNFUT')
+        self.assertEqual((future.lot_size, future.strike), (15, None))
+
+        common = {
+            'created_by': self.user, 'broker': self.broker, 'action': 'BUY', 'call_type': 'SWING',
+            'entry_price': Decimal('100.00'), 'target_1': Decimal('110.00'), 'stop_loss': Decimal('95.00'),
+            'status': 'ACTIVE', 'published_at': timezone.now(),
+        }
+        fut_call = ResearchCall.objects.create(symbol='BANKNIFTY24JUNFUT', **common)
+        ResearchCall.objects.create(symbol='PEL', **common)
+        self.assertEqual(fut_call.contract, future)
+        self.assertEqual(fut_call.instrument_type, 'FUTURES')
+
+        response = self.client.get(reverse('trades:options'))
+        self.assertNotContains(response, 'PEL')
+        response = self.client.get(reverse('trades:futures'))
+        self.assertContains(response, 'BANKNIFTY24JUNFUT')
+
+
+class LiveMarkToMarketTest(TestCase):
+    """Test bulk live mark-to-market of active calls"""
+
+    def setUp(self):
+        user = User.objects.create_user(
+            email='mtm@example.com',
+            first_name='Mtm',
+            last_name='Analyst',
+            password='TestPass123!',
+            role='ANALYST'
+        )
+        broker = Broker.objects.create(name='Mtm Broker', slug='mtm-broker')
+        common = {'created_by': user, 'broker': broker, 'call_type': 'SWING', 'status': 'ACTIVE'}
+        self.buy = ResearchCall.objects.create(
+            symbol='INFY', action='BUY', entry_price=Decimal('100.00'),
+            target_1=Decimal('120.00'), stop_loss=Decimal('90.00'), **common
+        )
+        self.sell = ResearchCall.objects.create(
+            symbol='WIPRO', action='SELL', entry_price=Decimal('200.00'),
+            target_1=Decimal('180.00'), stop_loss=Decimal('210.00'), **common
+        )
+        ResearchCall.objects.create(
+            symbol='HDFC', action='BUY', entry_price=Decimal('100.00'),
+            target_1=Decimal('110.00'), stop_loss=Decimal('95.00'), **common
+        )
+
+    def test_metrics_map(self):
+        marked = mark_active_calls_to_market(quotes={'INFY': Decimal('110.00'), 'WIPRO': Decimal('190.00')})
+        self.assertEqual(marked, 2)
+
+        metrics = get_live_metrics()
+        self.assertEqual(metrics[self.buy.id], {
+            'ltp': 110.0, 'live_return': 10.0, 'to_target': 9.09, 'to_stop_loss': 18.18,
+        })
+        self.assertEqual(metrics[self.sell.id]['live_return'], 5.0)
+        self.assertEqual(metrics[self.sell.id]['to_stop_loss'], 10.53)
+
+
+@override_settings(NOTIFICATION_DIGEST_WINDOW=0)
+class CallPublishedFanOutTest(TestCase):
+    """Test chunked CALL_PUBLISHED notification fan-out"""
+
+    def setUp(self):
+        # Run the fan-out inline instead of through the broker; emails stay queued
+        self.deliver = self._patch_delay(task_deliver_call_published, deliver_call_published)
+        self._patch_delay(task_notify_call_published, fan_out_call_published)
+        self._patch_delay(task_drain_email_outbox)
+
+        self.analyst = User.objects.create_user(
+            email='analyst@example.com', first_name='Test', last_name='Analyst',
+            password='TestPass123!', role='ANALYST',
+        )
+        self.broker = Broker.objects.create(name='Test Broker', slug='test-broker-fanout')
+        self.customers = [
+            User.objects.create_user(
+                email=f'customer{i}@example.com', first_name='Test', last_name=f'Customer{i}',
+                password='TestPass123!', role='CUSTOMER',
+            )
+            for i in range(5)
+        ]
+        # One customer muted in-app, one opted in to email
+        NotificationPreferences.objects.create(
+            user=self.customers[0], app_call_published=False, email_call_published=False,
+        )
+        NotificationPreferences.objects.create(user=self.customers[1], email_call_published=True)
+        NotificationPreferences.objects.create(
+            user=self.customers[2], email_call_published=False, app_call_published=True,
+        )
+        self.call = ResearchCall.objects.create(
+            symbol='TCS', created_by=self.analyst, broker=self.broker, action='BUY',
+            call_type='SHORT_TERM', entry_price=Decimal('3500.00'), target_1=Decimal('3700.00'),
+            stop_loss=Decimal('3400.00'), timeframe_days=20, status='APPROVED',
+        )
+
+    def _patch_delay(self, task, function=None):
+        patcher = mock.patch.object(task, 'delay', side_effect=function)
+        self.addCleanup(patcher.stop)
+        return patcher.start()
+
+    def test_publish_fans_out_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            publish_research_call(self.call, self.analyst)
+        # Nothing is delivered inside the publishing request
+        self.assertFalse(Notification.objects.exists())
+        # Admin metrics and sentiment counter updates, then the fan-out
+        self.assertEqual(len(callbacks), 3)
+
+        for callback in callbacks:
+            callback()
+        recipients = set(Notification.objects.filter(type='CALL_PUBLISHED').values_list('user_id', flat=True))
+        self.assertEqual(recipients, {customer.id for customer in self.customers[1:]})
+        queued = EmailOutbox.objects.values_list('to_email', flat=True)
+        self.assertEqual(list(queued), [self.customers[1].email])
+
+    def test_fan_out_chunks_by_id_range(self):
+        first, last = self.customers[0].id, self.customers[-1].id
+        self.assertEqual(fan_out_call_published(self.call.id, chunk_size=2), len(range(first, last + 1, 2)))
+        self.assertEqual(
+            [call.args[1:] for call in self.deliver.call_args_list],
+            [(start, start + 2) for start in range(first, last + 1, 2)],
+        )
+        self.assertEqual(Notification.objects.count(), 4)
+
+    def test_retried_chunk_does_not_notify_twice(self):
+        first, last = self.customers[0].id, self.customers[-1].id
+        with mock.patch('apps.notifications.services.enqueue_emails', side_effect=RuntimeError('outbox down')):
+            with self.assertRaises(RuntimeError):
+                deliver_call_published(self.call.id, first, last + 1)
+        # The failed chunk is rolled back as a whole
+        self.assertFalse(Notification.objects.exists())
+
+        self.assertEqual(deliver_call_published(self.call.id, first, last + 1), 4)
+        self.assertEqual(deliver_call_published(self.call.id, first, last + 1), 0)
+        self.assertEqual(Notification.objects.count(), 4)
+        self.assertEqual(EmailOutbox.objects.count(), 1)
+
+
+class BulkAdminActionTest(AdminCallFixtureMixin, TestCase):
+    """Test the set-based bulk actions of the admin list pages"""
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.admin)
+
+    def _post(self, url_name, ids, action, **extra):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(reverse(url_name), {'ids': ids, 'action': action, **extra})
+
+    def test_bulk_approve_and_publish(self):
+        pending = [self._create_call('PENDING_APPROVAL') for _ in range(3)]
+        draft = self._create_call('DRAFT')
+        get_metrics()
+        ids = [call.id for call in pending] + [draft.id]
+
+        response = self._post('admin_panel:calls_bulk', ids, 'approve')
+        self.assertRedirects(response, reverse('admin_panel:calls_list'), fetch_redirect_response=False)
+        self.assertEqual(ResearchCall.objects.filter(status='APPROVED', approved_by=self.admin).count(), 3)
+        self.assertEqual(ResearchCall.objects.get(pk=draft.pk).status, 'DRAFT')
+        self.assertEqual(ResearchCallEvent.objects.filter(event_type='APPROVED').count(), 3)
+        self.assertEqual(AuditLog.objects.filter(action='APPROVE', changes_json__bulk=True).count(), 3)
+
+        with mock.patch('apps.notifications.tasks.task_notify_call_published.delay') as delay:
+            self._post('admin_panel:calls_bulk', ids, 'publish')
+        self.assertEqual(sorted(c.args[0] for c in delay.call_args_list), sorted(call.id for call in pending))
+        self.assertEqual(ResearchCall.objects.filter(status='ACTIVE', published_at__isnull=False).count(), 3)
+        self.assertEqual(get_metrics(), compute_metrics())
+
+    def test_bulk_close_and_delete(self):
+        calls = [self._create_call('ACTIVE') for _ in range(2)]
+        get_metrics()
+
+        self._post('admin_panel:calls_bulk', [calls[0].id], 'close', reason='Target revised')
+        closed = ResearchCall.objects.get(pk=calls[0].pk)
+        self.assertEqual(closed.status, 'CLOSED')
+        self.assertIsNotNone(closed.closed_at)
+        self.assertEqual(closed.events.get(event_type='CLOSED').notes, 'Call closed: Target revised')
+
+        self._post('admin_panel:calls_bulk', [call.id for call in calls], 'delete')
+        self.assertFalse(ResearchCall.objects.exists())
+        self.assertEqual(AuditLog.objects.filter(action='DELETE', model_name='ResearchCall').count(), 2)
+        self.assertEqual(get_metrics(), compute_metrics())
+
+    def test_bulk_user_deactivate_skips_own_account(self):
+        get_metrics()
+        self._post('admin_panel:users_bulk', [self.analyst.id, self.admin.id], 'deactivate')
+
+        self.assertFalse(User.objects.get(pk=self.analyst.pk).is_active)
+        self.assertTrue(User.objects.get(pk=self.admin.pk).is_active)
+        self.assertEqual(get_metrics()['users:active'], 1)
+        self.assertEqual(get_metrics(), compute_metrics())
+
+    def test_bulk_ipo_mark_listed(self):
+        from apps.market_data.models import IPO
+
+        ipo = IPO.objects.create(
+            company_name='Bulk Industries', sector='Industrials', price_band='₹100 - ₹110',
+            issue_size='₹500 Cr', lot_size=100, open_date=date(2026, 1, 5), close_date=date(2026, 1, 7),
+        )
+        self._post('admin_panel:ipos_bulk', [ipo.id], 'mark_listed')
+
+        self.assertTrue(IPO.objects.get(pk=ipo.pk).is_listed)
+        self.assertEqual(AuditLog.objects.get(model_name='IPO').changes_json, {'is_listed': True, 'bulk': True})
+
+
+class SentimentCountersTest(AdminCallFixtureMixin, TestCase):
+    """Test the incrementally maintained market sentiment counters"""
+
+    def setUp(self):
+        super().setUp()
+        # Publishing queues the notification fan-out; no broker is needed here
+        patcher = mock.patch.object(task_notify_call_published, 'delay')
+        self.addCleanup(patcher.stop)
+        patcher.start()
+
+    def _create_call(self, action, sector, status='ACTIVE', call_type='SWING'):
+        with self.captureOnCommitCallbacks(execute=True):
+            return super()._create_call(status, symbol='SBIN', action=action, sector=sector, call_type=call_type)
+
+    def test_counters_follow_active_transitions(self):
+        self.assertEqual(get_sentiment()['total'], 0)
+        self._create_call('BUY', 'Banking')
+        sell = self._create_call('SELL', 'IT', call_type='INTRADAY')
+        approved = self._create_call('BUY', 'Banking', status='APPROVED')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            publish_research_call(approved, self.admin)
+        with self.captureOnCommitCallbacks(execute=True):
+            close_research_call(sell, 'Exited', self.admin)
+
+        with self.assertNumQueries(0):
+            sentiment = get_sentiment()
+        self.assertEqual(sentiment['total'], 2)
+        self.assertEqual(sentiment['sentiment'], 'BULLISH')
+
+        breakdown = get_sentiment_breakdown()
+        self.assertEqual(breakdown['by_sector']['Banking']['buy_count'], 2)
+        self.assertNotIn('IT', breakdown['by_sector'])
+        self.assertEqual(list(breakdown['by_call_type']), ['SWING'])
+        self.assertEqual(reconcile_sentiment_counts(), 0)
+
+    def test_bulk_publish_and_reconcile(self):
+        calls = [self._create_call('SELL', 'Energy', status='APPROVED') for _ in range(2)]
+        get_sentiment_breakdown()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            bulk_transition_calls([call.id for call in calls], 'publish', self.admin)
+        breakdown = get_sentiment_breakdown()
+        self.assertEqual(breakdown['overall']['sell_count'], 2)
+        self.assertEqual(breakdown['by_sector']['Energy']['sentiment'], 'BEARISH')
+
+        # queryset.update() sends no signals
+        ResearchCall.objects.update(status='CLOSED')
+        self.assertEqual(get_sentiment()['total'], 2)
+        self.assertGreater(reconcile_sentiment_counts(), 0)
+        self.assertEqual(get_sentiment()['total'], 0)
+        self.assertEqual(compute_sentiment_counts()[1], [])
@@ -4,10 +4,14 @@ Enhanced research call views with card layout and filtering
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.db.models import Q, Count, Avg
+from django.db.models import Count, Avg
 from apps.research_calls.models import ResearchCall
+from apps.research_calls.search import search_calls
+from apps.research_calls.services import get_closed_call_summary
+from apps.research_calls.mtm import attach_live_metrics
 from apps.brokers.models import Broker
 from apps.authentication.decorators import role_required
+from apps.core.pagination import cached_count, fragment_response, paginate_request, wants_fragment
 
 
 
@@ -137,11 +141,17 @@ def live_calls_view(request):
         else:
             calls = calls.filter(call_type=normalized_cat)
     
+    page = paginate_request(request, calls)
+    attach_live_metrics(page.items)
+    if wants_fragment(request):
+        return fragment_response(request, page, 'research_calls/partials/live_call_cards.html')
+
     # Context (categorized_calls removed as unused in new template)
     context = {
-        'calls': calls,
+        'calls': page.items,
+        'next_cursor': page.next_cursor,
         'selected_category': category,
-        'total_count': calls.count(),
+        'total_count': cached_count(calls),
     }
     return render(request, 'research_calls/live_trades.html', context)
 
@@ -152,35 +162,37 @@ def closed_calls_view(request):
     
     # Category filter
     category = request.GET.get('category', 'all')
+    filters = {}
     if category != 'all':
         normalized_cat = category.upper().replace(' ', '_')
         if normalized_cat in ['FUTURES', 'OPTIONS', 'COMMODITY']:
-            calls = calls.filter(instrument_type=normalized_cat)
+            filters['instrument_type'] = normalized_cat
         else:
-            calls = calls.filter(call_type=normalized_cat)
+            filters['call_type'] = normalized_cat
+    calls = calls.filter(**filters)
     
     # Search filter
     search_query = request.GET.get('search')
     if search_query:
-        calls = calls.filter(
-            Q(symbol__icontains=search_query) |
-            Q(broker__name__icontains=search_query)
-        )
+        calls = search_calls(calls, search_query)
     
-    # Calculate performance metrics
-    total_calls = calls.count()
-    successful_calls = calls.filter(actual_return_percentage__gt=0).count()
-    failed_calls = calls.filter(actual_return_percentage__lte=0).count()
-    accuracy = (successful_calls / total_calls * 100) if total_calls > 0 else 0
+    page = paginate_request(request, calls, ranked=bool(search_query))
+    if wants_fragment(request):
+        return fragment_response(request, page, 'research_calls/partials/closed_call_cards.html')
+
+    # Performance metrics (one cached aggregate query per filter combination)
+    summary = get_closed_call_summary(search=search_query, **filters)
     
     context = {
-        'calls': calls,
+        'calls': page.items,
+        'next_cursor': page.next_cursor,
         'selected_category': category,
         'search_query': search_query,
-        'total_calls': total_calls,
-        'successful_calls': successful_calls,
-        'failed_calls': failed_calls,
-        'accuracy': accuracy,
+        'summary': summary,
+        'total_calls': summary['total'],
+        'successful_calls': summary['wins'],
+        'failed_calls': summary['losses'],
+        'accuracy': summary['accuracy'],
     }
     return render(request, 'research_calls/closed_trades.html', context)
 
@@ -3,12 +3,13 @@ Views for different trade types and categories
 Unified into a single parameterized view to eliminate duplication.
 """
 from django.shortcuts import render
-from django.db.models import Q
 from apps.research_calls.models import ResearchCall
+from apps.research_calls.search import search_calls
 from apps.brokers.models import Broker
+from apps.core.pagination import fragment_response, paginate_request, wants_fragment
 
 
-# Trade type configurations: (call_type_filter, display_name, description)
+# Trade type configurations: (queryset filter, display_name, description)
 TRADE_TYPES = {
     'short-term': {
         'filter': {'call_type': 'SHORT_TERM'},
@@ -26,17 +27,17 @@ TRADE_TYPES = {
         'description': 'Investment ideas with 1+ months holding period',
     },
     'futures': {
-        'filter': None,  # uses Q objects below
+        'filter': {'instrument_type': 'FUTURES'},
         'name': 'Futures',
         'description': 'Futures & derivatives trading opportunities',
     },
     'options': {
-        'filter': None,
+        'filter': {'instrument_type': 'OPTIONS'},
         'name': 'Options',
         'description': 'Options trading strategies (Call & Put)',
     },
     'commodity': {
-        'filter': None,
+        'filter': {'instrument_type': 'COMMODITY'},
         'name': 'Commodity',
         'description': 'Commodity trading (Gold, Silver, Crude Oil, etc.)',
     },
@@ -51,23 +52,11 @@ def trade_list_view(request, trade_type):
         raise Http404(f"Unknown trade type: {trade_type}")
 
     # Base queryset
-    calls = ResearchCall.objects.filter(status='ACTIVE').select_related('broker').order_by('-published_at')
+    calls = ResearchCall.objects.filter(status='ACTIVE').select_related('broker', 'contract')
 
-    # Apply trade-type-specific filter
-    if config['filter']:
-        calls = calls.filter(**config['filter'])
-    elif trade_type == 'futures':
-        calls = calls.filter(Q(symbol__icontains='FUT') | Q(rationale__icontains='futures'))
-    elif trade_type == 'options':
-        calls = calls.filter(
-            Q(symbol__icontains='OPT') | Q(symbol__icontains='CE') |
-            Q(symbol__icontains='PE') | Q(rationale__icontains='option')
-        )
-    elif trade_type == 'commodity':
-        calls = calls.filter(
-            Q(symbol__icontains='GOLD') | Q(symbol__icontains='SILVER') |
-            Q(symbol__icontains='CRUDE') | Q(rationale__icontains='commodity')
-        )
+    # Apply trade-type-specific filter (equality on indexed columns;
+    # derivatives get instrument_type from the contract master)
+    calls = calls.filter(**config['filter'])
 
     # Common filters (broker, action, search)
     broker_id = request.GET.get('broker')
@@ -79,10 +68,15 @@ def trade_list_view(request, trade_type):
     if action:
         calls = calls.filter(action=action.upper())
     if search:
-        calls = calls.filter(Q(symbol__icontains=search) | Q(broker__name__icontains=search))
+        calls = search_calls(calls, search)
+
+    page = paginate_request(request, calls, ranked=bool(search))
+    if wants_fragment(request):
+        return fragment_response(request, page, 'trades/partials/trade_cards.html')
 
     context = {
-        'calls': calls,
+        'calls': page.items,
+        'next_cursor': page.next_cursor,
         'brokers': Broker.objects.all(),
         'trade_type': config['name'],
         'trade_description': config['description'],
@@ -27,6 +27,63 @@ app.conf.beat_schedule = {
         'task': 'apps.market_data.tasks.task_update_popular_stocks',
         'schedule': 600.0,  # 10 minutes
     },
+    'mark-calls-to-market': {
+        'task': 'apps.research_calls.tasks.task_mark_calls_to_market',
+        'schedule': 180.0,  # 3 minutes
+    },
+    'mark-portfolios-to-market': {
+        'task': 'apps.portfolios.tasks.task_mark_portfolios_to_market',
+        'schedule': 900.0,  # 15 minutes
+    },
+    'snapshot-portfolios': {
+        'task': 'apps.portfolios.tasks.task_snapshot_portfolios',
+        'schedule': crontab(hour=16, minute=0),  # end of day, after the 15:30 close
+    },
+    'compute-portfolio-risk': {
+        'task': 'apps.portfolios.tasks.task_compute_portfolio_risk',
+        'schedule': crontab(hour=18, minute=0),  # once the day's bars are final
+    },
+    'rollup-broker-performance': {
+        'task': 'apps.brokers.tasks.task_rollup_broker_performance',
+        'schedule': crontab(hour=0, minute=30),  # nightly, after market close
+    },
+    'drain-email-outbox': {
+        'task': 'apps.notifications.tasks.task_drain_email_outbox',
+        'schedule': 30.0,  # retries and rate-deferred emails; enqueues also start a drain
+    },
+    'flush-notification-digests': {
+        'task': 'apps.notifications.tasks.task_flush_notification_digests',
+        'schedule': 30.0,  # closed windows of NOTIFICATION_DIGEST_WINDOW
+    },
+    'archive-notifications': {
+        'task': 'apps.notifications.tasks.task_archive_notifications',
+        'schedule': crontab(hour=2, minute=0),  # nightly, off-peak
+    },
+    'reconcile-unread-counts': {
+        'task': 'apps.notifications.tasks.task_reconcile_unread_counts',
+        'schedule': 3600.0,  # hourly
+    },
+    'reconcile-admin-metrics': {
+        'task': 'apps.admin_panel.tasks.task_reconcile_admin_metrics',
+        'schedule': crontab(hour=3, minute=0),  # nightly, after the notification archive
+    },
+    'refresh-daily-rollups': {
+        'task': 'apps.admin_panel.tasks.task_refresh_daily_rollups',
+        'schedule': 900.0,  # 15 minutes; today and yesterday
+    },
+    'recheck-daily-rollups': {
+        'task': 'apps.admin_panel.tasks.task_refresh_daily_rollups',
+        'schedule': crontab(hour=3, minute=15),  # nightly; late refunds and closures
+        'kwargs': {'days': 35},  # ROLLUP_RECHECK_DAYS
+    },
+    'reconcile-sentiment-counts': {
+        'task': 'apps.research_calls.tasks.task_reconcile_sentiment_counts',
+        'schedule': 3600.0,  # hourly
+    },
+    'compute-recommendations': {
+        'task': 'apps.dashboard.tasks.task_compute_recommendations',
+        'schedule': 1800.0,  # 30 minutes; new calls and follows reach recommendations within a run
+    },
 }
 
 @app.task(bind=True)
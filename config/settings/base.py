@@ -80,6 +80,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'apps.notifications.context_processors.unread_notifications',
             ],
         },
     },
@@ -168,6 +169,11 @@ CACHES = {
     }
 }
 
+# Real-time notification push (Redis pub/sub relayed to websockets); empty disables push
+NOTIFICATION_PUSH_URL = env('NOTIFICATION_PUSH_URL', default='')
+# Seconds over which call/target/stop-loss notifications are coalesced per user; 0 disables digests
+NOTIFICATION_DIGEST_WINDOW = env.int('NOTIFICATION_DIGEST_WINDOW', default=0)
+
 # Session Configuration
 SESSION_ENGINE = 'django.contrib.sessions.backends.db'
 SESSION_COOKIE_AGE = 604800  # 7 days
@@ -12,8 +12,9 @@ ALLOWED_HOSTS = ['*']
 
 # Use MySQL database from base.py (no override needed)
 
-# Use console email backend in development
-EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
+# Console email backend in development; set EMAIL_BACKEND to the SMTP backend
+# to send through a local SMTP stand-in (see apps/notifications/outbox.py)
+EMAIL_BACKEND = env('EMAIL_BACKEND', default='django.core.mail.backends.console.EmailBackend')
 
 # Django Debug Toolbar
 INSTALLED_APPS += ['debug_toolbar']
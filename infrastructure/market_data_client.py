@@ -5,6 +5,7 @@ import yfinance as yf
 import requests
 from decimal import Decimal
 import logging
+import math
 
 logger = logging.getLogger(__name__)
 
@@ -101,6 +102,88 @@ class MarketDataClient:
             logger.error(f"Error fetching price for {symbol}: {e}")
             return None
 
+    def fetch_quotes(self, symbols):
+        """
+        Fetch last traded prices for many symbols in one batched download
+        
+        Args:
+            symbols: Iterable of stock symbols
+        
+        Returns:
+            dict: symbol -> Decimal last price (symbols without data are omitted)
+        """
+        yf_symbols = {self._get_indian_symbol(symbol): symbol for symbol in symbols}
+        if not yf_symbols:
+            return {}
+        
+        try:
+            data = yf.download(
+                list(yf_symbols), period='1d', interval='1m',
+                group_by='ticker', progress=False, threads=True,
+            )
+        except Exception as e:
+            logger.error(f"Error fetching batch quotes: {e}")
+            return {}
+        
+        quotes = {}
+        for yf_symbol, symbol in yf_symbols.items():
+            try:
+                closes = data[yf_symbol]['Close'] if len(yf_symbols) > 1 else data['Close']
+            except KeyError:
+                continue
+            closes = closes.dropna()
+            if not closes.empty:
+                quotes[symbol] = Decimal(str(round(float(closes.iloc[-1]), 2)))
+        return quotes
+
+    def fetch_daily_bars(self, symbols, period='1y'):
+        """
+        Fetch daily OHLCV bars for many symbols in one batched download
+        
+        Args:
+            symbols: Iterable of stock symbols or index codes
+            period: History to fetch (5d, 1mo, 1y, ...)
+        
+        Returns:
+            dict: symbol -> list of (date, open, high, low, close, volume)
+        """
+        yf_symbols = {self._get_indian_symbol(symbol): symbol for symbol in symbols}
+        if not yf_symbols:
+            return {}
+        
+        try:
+            data = yf.download(
+                list(yf_symbols), period=period, interval='1d',
+                group_by='ticker', progress=False, threads=True, auto_adjust=True,
+            )
+        except Exception as e:
+            logger.error(f"Error fetching daily bars: {e}")
+            return {}
+        
+        bars = {}
+        for yf_symbol, symbol in yf_symbols.items():
+            try:
+                frame = data[yf_symbol] if len(yf_symbols) > 1 else data
+                frame = frame[['Open', 'High', 'Low', 'Close', 'Volume']].dropna(
+                    subset=['Open', 'High', 'Low', 'Close']
+                )
+            except KeyError:
+                continue
+            bars[symbol] = [
+                (day.date(), *(Decimal(str(round(float(value), 2))) for value in row[:4]), self._volume(row[4]))
+                for day, row in zip(frame.index, frame.itertuples(index=False))
+            ]
+        return bars
+
+    @staticmethod
+    def _volume(value):
+        """Traded volume of a bar; providers report NaN for illiquid days"""
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            return 0
+        return int(value) if math.isfinite(value) else 0
+
     def get_stock_history(self, symbol, period='1mo'):
         """
         Get historical stock data
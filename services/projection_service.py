@@ -0,0 +1,179 @@
+"""
+Monte Carlo Projection Service
+Forward projections for SIPs and portfolios from simulated return paths
+"""
+import hashlib
+import json
+import logging
+import math
+
+import numpy as np
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PATHS = 20000
+DEFAULT_SEED = 42
+MAX_PATHS = 50000
+MAX_YEARS = 40
+PERCENTILES = (5, 25, 50, 75, 95)
+PROJECTION_CACHE_TTL = 86400  # 24 hours; results are deterministic per parameter set
+
+# Annualized volatility (%) assumed per SIP category
+CATEGORY_VOLATILITY = {
+    'Index Fund': 15.0,
+    'Large Cap': 16.0,
+    'Mid Cap': 21.0,
+    'Small Cap': 26.0,
+    'Hybrid': 10.0,
+}
+DEFAULT_VOLATILITY = 18.0
+DEFAULT_PORTFOLIO_RETURN = 12.0
+
+
+def simulate_growth(initial=0.0, monthly=0.0, years=10, annual_return=12.0, annual_volatility=18.0,
+                    paths=DEFAULT_PATHS, seed=DEFAULT_SEED):
+    """
+    Simulate an investment's value over yearly steps for many paths at once
+
+    Yearly log returns are drawn as one (years x paths) matrix with
+    antithetic pairs. Within a year the return is spread evenly over the
+    months, so the year's 12 instalments (made at the start of each month)
+    grow by a closed-form geometric sum. Values at every year end then
+    follow from cumulative sums, without a Python loop over paths or years.
+
+    Args:
+        initial: Lump sum invested at the start
+        monthly: SIP instalment invested at the start of every month
+        years: Horizon in years
+        annual_return: Expected annual return (%)
+        annual_volatility: Annualized volatility (%)
+        paths: Number of simulated paths
+        seed: Random generator seed (same parameters give the same result)
+
+    Returns:
+        dict: {'years', 'invested', 'bands': {'p5': [...], ...}, 'probability_of_loss'}
+    """
+    if not 1 <= years <= MAX_YEARS:
+        raise ValueError(f'Horizon must be between 1 and {MAX_YEARS} years')
+    # NaN passes every comparison below, and would come back as invalid JSON
+    if not all(math.isfinite(value) for value in (initial, monthly, annual_return, annual_volatility)):
+        raise ValueError('Amounts and return assumptions must be finite numbers')
+    if initial < 0 or monthly < 0 or initial + monthly <= 0:
+        raise ValueError('Invest a positive lump sum or monthly amount')
+    if annual_return <= -100 or annual_volatility < 0:
+        raise ValueError('Invalid return assumptions')
+    paths = max(2, min(int(paths), MAX_PATHS))
+
+    sigma = annual_volatility / 100
+    drift = np.log1p(annual_return / 100) - sigma ** 2 / 2
+
+    rng = np.random.default_rng(seed)
+    half = rng.standard_normal((years, paths // 2))
+    log_returns = drift + sigma * np.concatenate([half, -half], axis=1)
+
+    # 12 monthly instalments compounding at (1 + r)^(1/12) per month, valued at year end
+    monthly_growth = np.exp(log_returns / 12)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        instalments = monthly_growth * (np.exp(log_returns) - 1) / (monthly_growth - 1)
+    instalments = np.where(np.abs(monthly_growth - 1) < 1e-12, 12.0, instalments) * monthly
+
+    # V_y = G_y * (initial + sum of each year's instalments discounted by G at that year's end)
+    cumulative = np.cumsum(log_returns, axis=0)
+    values = np.exp(cumulative) * (initial + np.cumsum(instalments * np.exp(-cumulative), axis=0))
+
+    invested = initial + monthly * 12 * np.arange(1, years + 1)
+    return {
+        'years': list(range(1, years + 1)),
+        'invested': np.round(invested, 2).tolist(),
+        'bands': {f'p{pct}': np.round(band, 2).tolist() for pct, band in zip(PERCENTILES, _percentile_bands(values))},
+        'probability_of_loss': round(float((values[-1] < invested[-1]).mean() * 100), 2),
+    }
+
+
+def _percentile_bands(values):
+    """
+    PERCENTILES of each row of a (years x paths) matrix
+
+    Sorting the contiguous rows once is several times faster than
+    np.percentile's repeated partitioning; interpolation matches its
+    default (linear) method.
+    """
+    values = np.sort(values, axis=1)
+    positions = np.array(PERCENTILES) / 100 * (values.shape[1] - 1)
+    lower = np.floor(positions).astype(int)
+    upper = np.minimum(lower + 1, values.shape[1] - 1)
+    weight = positions - lower
+    return (values[:, lower] * (1 - weight) + values[:, upper] * weight).T
+
+
+def get_projection(initial=0.0, monthly=0.0, years=10, annual_return=12.0, annual_volatility=18.0,
+                   paths=DEFAULT_PATHS, seed=DEFAULT_SEED):
+    """Cached simulate_growth, keyed by the full parameter set"""
+    params = {
+        'initial': round(float(initial), 2),
+        'monthly': round(float(monthly), 2),
+        'years': int(years),
+        'annual_return': round(float(annual_return), 2),
+        'annual_volatility': round(float(annual_volatility), 2),
+        'paths': int(paths),
+        'seed': int(seed),
+    }
+    cache_key = 'projection:' + hashlib.md5(json.dumps(params, sort_keys=True).encode()).hexdigest()
+    projection = cache.get(cache_key)
+    if projection is None:
+        projection = {**simulate_growth(**params), 'assumptions': params}
+        cache.set(cache_key, projection, PROJECTION_CACHE_TTL)
+    return projection
+
+
+def get_sip_projection(fund, monthly, years=10):
+    """
+    Project a SIP in one of the listed funds
+
+    The fund's 5Y return is the expected return; volatility comes from
+    its category.
+
+    Args:
+        fund: SIP fund dict (see get_top_sip_funds)
+        monthly: Monthly instalment
+        years: Horizon in years
+
+    Returns:
+        dict: Projection (see simulate_growth) with the assumptions used
+    """
+    return get_projection(
+        monthly=monthly,
+        years=years,
+        annual_return=float(fund['returns_5y']),
+        annual_volatility=CATEGORY_VOLATILITY.get(fund['category'], DEFAULT_VOLATILITY),
+    )
+
+
+def get_portfolio_projection(portfolio, years=5, annual_return=DEFAULT_PORTFOLIO_RETURN, monthly=0.0):
+    """
+    Project a portfolio's current value forward
+
+    Volatility is the portfolio's own historical volatility when risk
+    analytics are available for it.
+
+    Args:
+        portfolio: Portfolio instance
+        years: Horizon in years
+        annual_return: Expected annual return (%)
+        monthly: Optional monthly top-up
+
+    Returns:
+        dict: Projection (see simulate_growth) with the assumptions used
+    """
+    from apps.portfolios.risk import get_portfolio_risk
+
+    risk = get_portfolio_risk(portfolio)
+    volatility = (risk or {}).get('volatility') or DEFAULT_VOLATILITY
+    return get_projection(
+        initial=float(portfolio.current_value),
+        monthly=monthly,
+        years=years,
+        annual_return=annual_return,
+        annual_volatility=volatility,
+    )
@@ -140,6 +140,116 @@ async function exitPosition(itemId) {
     }
 }
 
+// Infinite scroll for keyset-paginated lists
+// Containers marked data-infinite-scroll carry the next page's cursor in
+// data-next-cursor; the next page is fetched as a JSON fragment.
+function initInfiniteScroll(container) {
+    const anchor = container.closest('table') || container;
+    const sentinel = document.createElement('div');
+    sentinel.className = 'h-px';
+    anchor.insertAdjacentElement('afterend', sentinel);
+
+    let loading = false;
+    const observer = new IntersectionObserver(async (entries) => {
+        const cursor = container.dataset.nextCursor;
+        if (!entries[0].isIntersecting || loading || !cursor) return;
+
+        loading = true;
+        const url = new URL(window.location.href);
+        url.searchParams.set('cursor', cursor);
+        url.searchParams.set('format', 'json');
+
+        try {
+            const response = await fetch(url, {
+                headers: { 'X-Requested-With': 'XMLHttpRequest' }
+            });
+            const data = await response.json();
+            container.insertAdjacentHTML('beforeend', data.html);
+            container.dataset.nextCursor = data.next_cursor || '';
+            if (!data.has_next) observer.disconnect();
+        } catch (error) {
+            showNotification('Failed to load more results', 'danger');
+        } finally {
+            loading = false;
+        }
+    }, { rootMargin: '400px' });
+
+    observer.observe(sentinel);
+}
+
+// Unread notification badge
+// With push enabled (NOTIFICATION_PUSH_URL, served by the ASGI app) the
+// server sends the unread count on connect and every new notification
+// afterwards. Otherwise, or if the socket never connects, the badge polls
+// the unread-count endpoint.
+const UNREAD_POLL_INTERVAL = 60000;
+const SOCKET_CONNECT_ATTEMPTS = 3;
+
+function initUnreadBadge(badge) {
+    function setUnread(count) {
+        badge.classList.toggle('hidden', !count);
+    }
+
+    function poll() {
+        async function refresh() {
+            if (document.hidden) return;
+            try {
+                const response = await fetch('/api/notifications/unread-count/', {
+                    headers: { 'X-Requested-With': 'XMLHttpRequest' }
+                });
+                if (response.ok) setUnread((await response.json()).unread_count);
+            } catch (error) {
+                // The next interval retries
+            }
+        }
+
+        setInterval(refresh, UNREAD_POLL_INTERVAL);
+        document.addEventListener('visibilitychange', refresh);
+    }
+
+    function connect() {
+        const scheme = window.location.protocol === 'https:' ? 'wss' : 'ws';
+        let retryDelay = 1000;
+        let failedAttempts = 0;
+        let connected = false;
+
+        function open() {
+            const socket = new WebSocket(`${scheme}://${window.location.host}/ws/notifications/`);
+
+            socket.addEventListener('open', () => {
+                connected = true;
+                retryDelay = 1000;
+            });
+            socket.addEventListener('message', (event) => {
+                const data = JSON.parse(event.data);
+                if (data.type === 'notification') {
+                    setUnread(data.unread_count ?? 1);
+                    showNotification(data.notification.title, 'info');
+                } else if (data.type === 'unread_count') {
+                    setUnread(data.unread_count);
+                }
+            });
+            socket.addEventListener('close', () => {
+                // The socket endpoint is not being served; stop retrying
+                if (!connected && ++failedAttempts >= SOCKET_CONNECT_ATTEMPTS) {
+                    poll();
+                    return;
+                }
+                setTimeout(open, retryDelay);
+                retryDelay = Math.min(retryDelay * 2, 60000);
+            });
+        }
+
+        open();
+    }
+
+    if ('push' in badge.dataset && 'WebSocket' in window) {
+        connect();
+    } else {
+        poll();
+    }
+}
+
 // Add CSS animations
 const style = document.createElement('style');
 style.textContent = `
@@ -170,4 +280,7 @@ document.head.appendChild(style);
 // Initialize on page load
 document.addEventListener('DOMContentLoaded', function () {
     console.log('Stock Research Platform initialized');
+    document.querySelectorAll('[data-infinite-scroll]').forEach(initInfiniteScroll);
+    const unreadBadge = document.querySelector('[data-unread-badge]');
+    if (unreadBadge) initUnreadBadge(unreadBadge);
 });